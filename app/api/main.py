@@ -3,14 +3,18 @@ import logging
 import os
 from typing import Annotated
 
-import pandas as pd
 from alembic.config import Config
 from alembic.script import ScriptDirectory
-from core.base_model import ActionMessage, ServerStatus
-from core.dependencies import CurrentAppDep, SessionDep
+from core.base_model import ActionMessage, DatabaseMetrics, HttpMetrics, ServerStatus
+from core.db import async_engine, async_engine_metrics, engine, engine_metrics
+from core.dependencies import AsyncSessionDep, CurrentAppDep, SessionDep
+from core.ingestion import ingest_initial_data
 from core.security import Password, verify_password
+from core.statistics import team_statistics_cache
 from fastapi import APIRouter, HTTPException, Query
-from models import Competition, CompetitionType, MatchStatistics, Team
+from fastapi.responses import PlainTextResponse
+from libs.tracing import PROMETHEUS_CONTENT_TYPE, render_metrics
+from models import Competition, Team
 from sqlalchemy import delete, text
 from sqlalchemy.exc import OperationalError
 from sqlmodel import select
@@ -21,10 +25,14 @@ router = APIRouter()
 
 
 @router.get("/healthcheck")
-def healthcheck(session: SessionDep, current_app: CurrentAppDep) -> ServerStatus:
+async def healthcheck(
+    session: AsyncSessionDep, current_app: CurrentAppDep
+) -> ServerStatus:
     try:
         logger.info("Getting database revisions, to check database is available")
-        revisions = session.exec(text("SELECT version_num FROM alembic_version")).all()  # type: ignore
+        revisions = (
+            await session.execute(text("SELECT version_num FROM alembic_version"))
+        ).all()
     except OperationalError:
         raise HTTPException(
             status_code=500,
@@ -53,6 +61,32 @@ def healthcheck(session: SessionDep, current_app: CurrentAppDep) -> ServerStatus
     return ServerStatus(status="OK")
 
 
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """Requests and their stages durations histograms, in the Prometheus format.
+
+    Series are labelled by worker process, a scrape answered by one of them only: sum
+    them by the other labels once each worker has been scraped.
+    """
+    return PlainTextResponse(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@router.get("/metrics/http")
+def http_metrics(current_app: CurrentAppDep) -> HttpMetrics:
+    """Connections opened and reused by the external APIs clients"""
+    return HttpMetrics(pid=os.getpid(), **current_app.state.http_metrics.snapshot())
+
+
+@router.get("/metrics/db")
+def db_metrics() -> DatabaseMetrics:
+    """Connection pools usage, to size them per worker"""
+    return DatabaseMetrics(
+        pid=os.getpid(),
+        engine=engine_metrics.snapshot(engine.pool),  # type: ignore
+        async_engine=async_engine_metrics.snapshot(async_engine.pool),  # type: ignore
+    )
+
+
 @router.post("/initialize")
 def initialize(
     password: Password,
@@ -84,33 +118,14 @@ def initialize(
         logger.info("Force cleaning database")
         session.exec(delete(Competition))  # type: ignore
         session.exec(delete(Team))  # type: ignore
+        team_statistics_cache.clear()
 
-    league_df = pd.read_json("initial_data/leagues.json")
-    teams_df = pd.read_json("initial_data/teams.json")
-
-    leagues = {}
-    for league in league_df.to_dict(orient="records"):  # call-overload: ignore
-        type_league = CompetitionType(league.pop("type_"))
-        leagues[league["data_id"]] = Competition(type_=type_league, **league)  # type: ignore
-
-    logger.info(f"Adding {len(leagues)} leagues.")
-    teams = []
-    matches = []
-    for data in teams_df.to_dict(orient="records"):
-        leagues_id = data.pop("leagues")
-        match_list = data.pop("matchs")
-        team = Team(**data)
-        team._competitions = [leagues[league_id] for league_id in leagues_id]
-
-        teams.append(team)
-        matches.extend(
-            [MatchStatistics(team=team, **match_data) for match_data in match_list]
-        )
-
-    logger.info(f"Adding {len(teams)} teams.")
-    session.add_all(teams)  # type: ignore
-    logger.info(f"Adding {len(matches)} matches.")
-    session.add_all(matches)  # type: ignore
+    nb_leagues, nb_teams, nb_matches = ingest_initial_data(
+        session, "initial_data/leagues.json", "initial_data/teams.json"
+    )
+    logger.info(
+        f"Added {nb_leagues} leagues, {nb_teams} teams and {nb_matches} matches."
+    )
     session.commit()
 
     return ActionMessage(
@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 
+from .competition_simulations import router as router_competition_simulations
 from .simulations import router as router_simulations
 from .teams import router as router_teams
 
@@ -10,3 +11,7 @@ router = APIRouter()
 
 router.include_router(router_teams, prefix="/teams", tags=["Teams"])
 router.include_router(router_simulations, prefix="/simulations", tags=["Simulations"])
+# Competition listings and creation are not exposed, only their simulations
+router.include_router(
+    router_competition_simulations, prefix="/competitions", tags=["Competitions"]
+)
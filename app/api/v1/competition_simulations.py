@@ -0,0 +1,227 @@
+import logging
+import secrets
+from datetime import datetime
+from typing import Annotated
+
+from core.bracket import bracket_simulation, build_bracket, default_bracket
+from core.dependencies import AsyncSessionDep, CurrentAppDep, TeamStatisticsDep
+from core.prediction_matrix import (
+    build_prediction_matrix,
+    load_prediction_matrix,
+    matrix_version,
+    save_prediction_matrix,
+)
+from core.predictions import teams_data_version
+from core.repository import competition_season_matches, competition_teams
+from core.season import season_simulation, season_table, shared_competitions
+from fastapi import APIRouter, HTTPException, Query
+from libs.tracing import span
+from models import (
+    BracketSimulation,
+    BracketSimulationIN,
+    Competition,
+    CompetitionType,
+    PredictionMatrix,
+    SeasonSimulation,
+)
+
+from .simulations import check_statistics, executor_errors
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+async def _competition(session: AsyncSessionDep, competition_id: int) -> Competition:
+    competition = await session.get(Competition, competition_id)
+    if competition is None:
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "status": "NOT_FOUND",
+                "message": f"Competition {competition_id} not found.",
+            },
+        )
+    return competition
+
+
+@router.get("/{competition_id}/prediction-matrix")
+async def prediction_matrix(
+    competition_id: int,
+    session: AsyncSessionDep,
+    statistics_store: TeamStatisticsDep,
+) -> PredictionMatrix:
+    """Analytic predictions of every ordered pair of teams of the competition.
+
+    The matrix is stored, and computed again once a team has played a new match.
+    """
+    competition = await _competition(session, competition_id)
+    teams = await session.run_sync(competition_teams, competition_id)  # type: ignore
+    team_ids = [team.id for team in teams]
+    versions = await session.run_sync(teams_data_version, team_ids, datetime.now())  # type: ignore
+    version = matrix_version(versions)
+    stored = await session.run_sync(load_prediction_matrix, competition_id, version)  # type: ignore
+    if stored is not None:
+        logger.info(
+            f"Prediction matrix of competition [{competition_id}] is up to date"
+        )
+        return stored
+
+    logger.info(f"Compute prediction matrix of [{len(teams)}] teams")
+    season = competition.start_date.year
+    statistics, stale_teams = await statistics_store.get_teams_statistics(
+        dict.fromkeys(teams, season)
+    )
+    check_statistics(statistics)
+    matrix = build_prediction_matrix(
+        competition_id, teams, statistics, partial=bool(stale_teams)
+    )
+
+    # Partial matrices are not kept, like partial predictions
+    if not stale_teams:
+        await session.run_sync(save_prediction_matrix, matrix, version)  # type: ignore
+    await session.commit()
+    return matrix
+
+
+@router.get("/{competition_id}/season-simulation")
+async def simulate_season(
+    competition_id: int,
+    session: AsyncSessionDep,
+    statistics_store: TeamStatisticsDep,
+    current_app: CurrentAppDep,
+    iterations: Annotated[int, Query(ge=1000, le=200_000)] = 20_000,
+    seed: Annotated[int | None, Query(ge=0)] = None,
+) -> SeasonSimulation:
+    """Final position probabilities of the teams of a league, its remaining matches
+    played ``iterations`` times from the current table"""
+    competition = await _competition(session, competition_id)
+    if competition.type_ != CompetitionType.LEAGUE:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "status": "NOT_A_LEAGUE",
+                "message": f"Competition {competition_id} has no table to simulate.",
+            },
+        )
+
+    teams = await session.run_sync(competition_teams, competition_id)  # type: ignore
+    if shared := shared_competitions(competition_id, teams):
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "status": "SHARED_FIXTURES",
+                "message": f"Teams of competition {competition_id} also play each other in competitions {shared}, its fixtures cannot be told apart.",
+            },
+        )
+    team_ids = [team.id for team in teams]
+    matches = await session.run_sync(competition_season_matches, competition, team_ids)  # type: ignore
+    logger.info(f"Load aggregated statistics of [{len(teams)}] teams")
+    statistics, stale_teams = await statistics_store.get_teams_statistics(
+        dict.fromkeys(teams, competition.start_date.year)
+    )
+    await session.commit()
+    check_statistics(statistics)
+
+    table = season_table(teams, matches, statistics)
+    seed = seed if seed is not None else secrets.randbits(32)
+    logger.info(
+        f"Simulate [{iterations}] seasons of [{table.n_fixtures}] remaining matches"
+    )
+    with executor_errors():
+        positions, points = await current_app.state.simulation_executor.simulate_season(
+            table, iterations, seed
+        )
+    return season_simulation(
+        competition_id,
+        teams,
+        table,
+        positions,
+        points,
+        iterations,
+        seed,
+        partial=bool(stale_teams),
+    )
+
+
+@router.post("/{competition_id}/bracket-simulation")
+async def simulate_bracket(
+    competition_id: int,
+    simulation: BracketSimulationIN,
+    session: AsyncSessionDep,
+    statistics_store: TeamStatisticsDep,
+    current_app: CurrentAppDep,
+) -> BracketSimulation:
+    """Chances of the teams of a cup to win their match of each round of a knockout
+    bracket, draws going to extra time then to penalties"""
+    competition = await _competition(session, competition_id)
+    if competition.type_ != CompetitionType.CUP:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "status": "NOT_A_CUP",
+                "message": f"Competition {competition_id} has no bracket to simulate.",
+            },
+        )
+
+    cup_teams = await session.run_sync(competition_teams, competition_id)  # type: ignore
+    bracket = simulation.bracket or default_bracket(cup_teams)
+    team_ids = [team_id for team_id in bracket if team_id is not None]
+    teams = [team for team in cup_teams if team.id in team_ids]
+    if (
+        len(team_ids) < 2
+        or len(teams) != len(team_ids)
+        or len(set(team_ids)) != len(team_ids)
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "status": "INVALID_BRACKET",
+                "message": f"The bracket must have at least 2 distinct teams of competition {competition_id}.",
+            },
+        )
+
+    logger.info(f"Load aggregated statistics of [{len(teams)}] teams")
+    statistics, stale_teams = await statistics_store.get_teams_statistics(
+        dict.fromkeys(teams, competition.start_date.year)
+    )
+    await session.commit()
+    check_statistics(statistics)
+
+    try:
+        knockout = build_bracket(bracket, teams, statistics)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={"status": "INVALID_BRACKET", "message": str(e)},
+        )
+
+    if simulation.mode == "analytic":
+        with span("simulation"):
+            probabilities = knockout.probabilities()
+        return bracket_simulation(
+            competition_id,
+            bracket,
+            simulation.mode,
+            probabilities,
+            partial=bool(stale_teams),
+        )
+
+    seed = simulation.seed if simulation.seed is not None else secrets.randbits(32)
+    logger.info(f"Simulate [{simulation.iterations}] brackets of [{len(bracket)}]")
+    with executor_errors():
+        wins, iterations = await current_app.state.simulation_executor.simulate_bracket(
+            knockout,
+            simulation.iterations,
+            seed,
+            current_app.state.config.BRACKET_SIMULATION_BUDGET,
+        )
+    return bracket_simulation(
+        competition_id,
+        bracket,
+        simulation.mode,
+        wins / iterations,
+        iterations,
+        seed,
+        partial=bool(stale_teams),
+    )
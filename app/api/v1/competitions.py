@@ -1,39 +1,42 @@
-from core.dependencies import SessionDep
+from core.dependencies import AsyncSessionDep
 from fastapi import APIRouter
 from models import Competition, CompetitionType
+from sqlmodel import select
 
 router = APIRouter()
 
 
 @router.get("/leagues")
-def leagues(session: SessionDep) -> list[Competition]:
-    return (
-        session.query(Competition)
-        .where(Competition.type_ == CompetitionType.LEAGUE.value)  # type: ignore
-        .all()
+async def leagues(session: AsyncSessionDep) -> list[Competition]:
+    competitions = await session.exec(
+        select(Competition).where(
+            Competition.type_ == CompetitionType.LEAGUE.value  # type: ignore
+        )
     )
+    return list(competitions)
 
 
 @router.get("/cups")
-def cups(session: SessionDep) -> list[Competition]:
-    return (
-        session.query(Competition)
-        .where(Competition.type_ == CompetitionType.LEAGUE.value)  # type: ignore
-        .all()
+async def cups(session: AsyncSessionDep) -> list[Competition]:
+    competitions = await session.exec(
+        select(Competition).where(
+            Competition.type_ == CompetitionType.LEAGUE.value  # type: ignore
+        )
     )
+    return list(competitions)
 
 
 @router.post("/leagues")
-def add_league(league: Competition, session: SessionDep) -> Competition:
+async def add_league(league: Competition, session: AsyncSessionDep) -> Competition:
     session.add(league)
-    session.commit()
-    session.refresh(league)
+    await session.commit()
+    await session.refresh(league)
     return league
 
 
 @router.post("/cups")
-def add_cup(cup: Competition, session: SessionDep) -> Competition:
+async def add_cup(cup: Competition, session: AsyncSessionDep) -> Competition:
     session.add(cup)
-    session.commit()
-    session.refresh(cup)
+    await session.commit()
+    await session.refresh(cup)
     return cup
@@ -1,22 +1,107 @@
 import logging
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
 
-import pandas as pd
-from core.dependencies import MatchExtractorDep, SessionDep
-from fastapi import APIRouter, HTTPException
+import numpy as np
+from core.dependencies import AsyncSessionDep, CurrentAppDep, TeamStatisticsDep
+from core.predictions import (
+    prediction_cache,
+    prediction_key,
+    simulation_seed,
+    teams_data_version,
+)
+from core.repository import teams_with_competitions
+from core.simulation_executor import SimulationExecutorSaturated
+from fastapi import APIRouter, FastAPI, HTTPException
+from fastapi.responses import JSONResponse
 from models import PredictionIN, ResultPredictions, Team
-from predictor import Predictor, PredictorError
+from predictor import (
+    GlobalStatistics,
+    Prediction,
+    Predictor,
+    PredictorError,
+    SimulationMode,
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
-@router.post("/")
-def simulate(
-    match: PredictionIN, session: SessionDep, matches_extractor: MatchExtractorDep
-) -> ResultPredictions:
-    home_team = session.get(Team, match.home_team)
-    away_team = session.get(Team, match.away_team)
+def check_statistics(statistics: dict[Team, GlobalStatistics]) -> None:
+    """Teams without any enriched match cannot be predicted until the worker ran"""
+    if pending := [
+        team.id for team, stats in statistics.items() if not stats.matches_played
+    ]:
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "status": "DATA_PENDING",
+                "message": f"Statistics of teams {pending} are being extracted, retry later.",
+            },
+            headers={"Retry-After": "60"},
+        )
+
+
+@contextmanager
+def executor_errors() -> Iterator[None]:
+    """Simulations refused by the saturated process pool, or too slow, as 503s"""
+    try:
+        yield
+    except SimulationExecutorSaturated as e:
+        logger.warning(f"Simulation refused: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "status": "SIMULATIONS_SATURATED",
+                "message": "Too many simulations running, retry later.",
+            },
+            headers={"Retry-After": "1"},
+        )
+    except TimeoutError:
+        raise HTTPException(
+            status_code=503,
+            detail={
+                "status": "SIMULATION_TIMEOUT",
+                "message": "Simulation took too long, retry later.",
+            },
+        )
+
+
+async def _simulate(
+    current_app: FastAPI,
+    predictors: list[Predictor],
+    mode: SimulationMode,
+    tolerance: float,
+) -> list[Prediction]:
+    """Run simulations on the process pool, refusing them while it is saturated"""
+    with executor_errors():
+        return await current_app.state.simulation_executor.simulate(
+            predictors, mode=mode, tolerance=tolerance
+        )
+
+
+@router.post("/", response_model=ResultPredictions)
+async def simulate(
+    match: PredictionIN,
+    session: AsyncSessionDep,
+    statistics_store: TeamStatisticsDep,
+    current_app: CurrentAppDep,
+) -> ResultPredictions | JSONResponse:
+    team_ids = [match.home_team, match.away_team]
+    versions = await session.run_sync(teams_data_version, team_ids, datetime.now())  # type: ignore
+    key = prediction_key(match, versions)
+    if (cached := prediction_cache.get(key)) is not None:
+        logger.info(
+            f"Prediction cache hit for [{match.home_team}] vs [{match.away_team}]"
+        )
+        return JSONResponse(content=cached)
+
+    loaded = await session.run_sync(teams_with_competitions, team_ids)  # type: ignore
+    teams = {team.id: team for team in loaded}
+    home_team = teams.get(match.home_team)
+    away_team = teams.get(match.away_team)
 
     if home_team is None or away_team is None:
         raise HTTPException(
@@ -27,7 +112,10 @@ def simulate(
             },
         )
     try:
-        predictor = Predictor(home_team=home_team, away_team=away_team)
+        seed = simulation_seed(match)
+        predictor = Predictor(
+            home_team=home_team, away_team=away_team, rng=np.random.default_rng(seed)
+        )
     except AssertionError:
         raise HTTPException(
             status_code=400,
@@ -36,44 +124,134 @@ def simulate(
                 "message": "The 2 teams are not in a common league or cup.",
             },
         )
-    logger.info("Extract team matches")
-    home_matches, away_matches = matches_extractor.get_match_data(
-        home_team=home_team,
-        away_team=away_team,
-        season=min(comp.start_date.year for comp in predictor.common_competitions),
-    )
-    if home_matches:
-        logger.info(
-            f"Update [{len(home_matches)}] matches for team [{home_team.short_name}]"
-        )
-        session.add_all(home_matches)
-    if away_matches:
-        logger.info(
-            f"Update [{len(home_matches)}] matches for team [{home_team.short_name}]"
-        )
-        session.add_all(home_matches)
-    session.commit()
-    for m in home_matches + away_matches:
-        session.refresh(m)
-
-    logger.info("Aggregate matches statistics")
-    predictor.enhance_team_statistics(
-        pd.DataFrame([m.model_dump(mode="json") for m in home_matches]),
-        pd.DataFrame([m.model_dump(mode="json") for m in away_matches]),
+    logger.info("Load teams aggregated statistics")
+    season = min(comp.start_date.year for comp in predictor.common_competitions)
+    statistics, stale_teams = await statistics_store.get_teams_statistics(
+        {home_team: season, away_team: season}
     )
+    await session.commit()
+    check_statistics(statistics)
+    predictor.home_stats = statistics[home_team]
+    predictor.away_stats = statistics[away_team]
 
     try:
-        prediction = predictor.simulate()
-        return ResultPredictions(
+        [prediction] = await _simulate(
+            current_app, [predictor], match.mode, match.tolerance
+        )
+        result = ResultPredictions(
             home_team=home_team,
             away_team=away_team,
             home_stats=predictor.home_stats,
             away_stats=predictor.away_stats,
             prediction=prediction,
+            status="PARTIAL" if stale_teams else "COMPLETE",
+            seed=seed,
+        )
+    except PredictorError as e:
+        logger.error(f"Error during prediction: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail={"status": "PREDICTION_ERROR", "message": str(e)},
+        )
+
+    # Teams are stored serialized, ORM instances do not outlive the session.
+    # Partial results are not kept, the data version does not change once enriched
+    if result.status == "COMPLETE":
+        prediction_cache.set(key, result.model_dump(mode="json"))
+    return result
+
+
+@router.post("/batch")
+async def simulate_batch(
+    matches: list[PredictionIN],
+    session: AsyncSessionDep,
+    statistics_store: TeamStatisticsDep,
+    current_app: CurrentAppDep,
+) -> list[ResultPredictions]:
+    team_ids = {m.home_team for m in matches} | {m.away_team for m in matches}
+    logger.info(f"Load [{len(team_ids)}] teams with competitions")
+    loaded = await session.run_sync(teams_with_competitions, team_ids)  # type: ignore
+    teams = {team.id: team for team in loaded}
+    if missing := team_ids - teams.keys():
+        raise HTTPException(
+            status_code=404,
+            detail={
+                "status": "NOT_FOUND",
+                "message": f"Teams {sorted(missing)} not found.",
+            },
         )
+
+    predictors = []
+    seeds = [simulation_seed(match) for match in matches]
+    for match, seed in zip(matches, seeds, strict=True):
+        try:
+            predictors.append(
+                Predictor(
+                    home_team=teams[match.home_team],
+                    away_team=teams[match.away_team],
+                    rng=np.random.default_rng(seed),
+                )
+            )
+        except AssertionError:
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "status": "MATCH_IMPOSSIBLE",
+                    "message": f"The 2 teams {match.home_team} and {match.away_team} are not in a common league or cup.",
+                },
+            )
+
+    # Each team is aggregated once, for the oldest season it is simulated in
+    seasons: dict[Team, int] = {}
+    for predictor in predictors:
+        season = min(comp.start_date.year for comp in predictor.common_competitions)
+        for team in (predictor.home, predictor.away):
+            seasons[team] = min(season, seasons.get(team, season))
+
+    logger.info(f"Load aggregated statistics of [{len(seasons)}] teams")
+    statistics, stale_teams = await statistics_store.get_teams_statistics(seasons)
+    await session.commit()
+
+    check_statistics(statistics)
+    for predictor in predictors:
+        predictor.home_stats = statistics[predictor.home]
+        predictor.away_stats = statistics[predictor.away]
+
+    predictions: list[Prediction | None] = [None] * len(matches)
+    try:
+        for mode, tolerance in {(match.mode, match.tolerance) for match in matches}:
+            indexes = [
+                i
+                for i, match in enumerate(matches)
+                if (match.mode, match.tolerance) == (mode, tolerance)
+            ]
+            batch = await _simulate(
+                current_app, [predictors[i] for i in indexes], mode, tolerance
+            )
+            for i, prediction in zip(indexes, batch, strict=True):
+                predictions[i] = prediction
     except PredictorError as e:
         logger.error(f"Error during prediction: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail={"status": "PREDICTION_ERROR", "message": str(e)},
         )
+
+    return [
+        ResultPredictions(
+            home_team=predictor.home,
+            away_team=predictor.away,
+            home_stats=predictor.home_stats,
+            away_stats=predictor.away_stats,
+            prediction=prediction,
+            status=(
+                "PARTIAL"
+                if {predictor.home, predictor.away} & stale_teams
+                else "COMPLETE"
+            ),
+            seed=seed,
+        )
+        for predictor, prediction, seed in zip(
+            predictors, predictions, seeds, strict=True
+        )
+    ]
@@ -1,4 +1,5 @@
-from core.dependencies import SessionDep
+from core.dependencies import AsyncSessionDep
+from core.repository import teams_with_competitions
 from fastapi import APIRouter
 from models import Team
 
@@ -6,5 +7,5 @@ router = APIRouter()
 
 
 @router.get("/")
-def teams(session: SessionDep) -> list[Team]:
-    return session.query(Team).all()
+async def teams(session: AsyncSessionDep) -> list[Team]:
+    return await session.run_sync(teams_with_competitions)  # type: ignore
@@ -0,0 +1,54 @@
+"""Run the benchmarks, from the ``app`` directory: ``python -m benchmarks``"""
+
+import argparse
+import sys
+
+from benchmarks.cases import CASES
+from benchmarks.runner import compare, load_results, write_results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark the predictor and the simulation routes",
+    )
+    parser.add_argument(
+        "--output", default="benchmarks.json", help="JSON file of the results"
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="few rounds, to check the benchmarks run"
+    )
+    parser.add_argument(
+        "--only", nargs="+", choices=list(CASES), help="groups of benchmarks to run"
+    )
+    parser.add_argument("--compare", help="JSON results to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="median time ratio over which a benchmark regressed",
+    )
+    args = parser.parse_args()
+
+    results = []
+    for group in args.only or CASES:
+        for result in CASES[group](args.quick):
+            print(
+                f"{result.key:<70} {result.median_ms:>10.3f} ms"
+                f" {result.ops_per_sec:>10.2f} ops/s"
+            )
+            results.append(result)
+    write_results(args.output, results)
+    print(f"Results written to {args.output}")
+
+    if args.compare is None:
+        return 0
+    regressions = compare(load_results(args.compare), results, args.threshold)
+    for key, ratio in regressions:
+        print(f"Regression of {key}: x{ratio:.2f}")
+    return 1 if regressions else 0
+
+
+# Simulation processes are spawned, they import this module without running it
+if __name__ == "__main__":
+    sys.exit(main())
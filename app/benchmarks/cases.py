@@ -0,0 +1,433 @@
+"""Benchmarks of the predictor and the simulation routes, by group.
+
+Each group yields its results, run at several simulation iterations and match history
+sizes. The routes run through the whole application, once on an in-memory SQLite
+database and once with the database mocked out.
+"""
+
+import asyncio
+import logging
+import random
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from enum import Enum
+from functools import partial
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from core.config import settings
+from core.dependencies import TeamStatisticsStore
+from core.dependencies.base import get_async_db
+from core.predictions import prediction_cache, teams_data_version
+from core.repository import teams_match_frames, teams_matches, teams_with_competitions
+from core.simulation_executor import SimulationExecutor
+from core.statistics import team_statistics_cache
+from fastapi.testclient import TestClient
+from models import MatchStatistics, Team
+from predictor import (
+    GlobalStatistics,
+    GlobalStatsFrame,
+    Predictor,
+    RunningGlobalStatistics,
+    TeamStatistics,
+)
+from predictor.aggregates import AGGREGATION_COLUMNS
+from predictor.bracket import Bracket, advance_probabilities, simulate_bracket
+from predictor.season import SeasonTable, simulate_season
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from benchmarks.data import (
+    enriched_match,
+    in_memory_teams,
+    sqlite_engine,
+    synthetic_teams,
+)
+from benchmarks.runner import BenchmarkResult, measure
+
+ITERATIONS = (1_000, 10_000, 100_000)
+TOLERANCES = (1.0, 0.5)
+HISTORY_SIZES = (20, 100, 500)
+LEAGUE_SIZES = (20, 500)
+SEASON_SIZES = (20, 100)
+BRACKET_SIZES = (16, 128)
+# A season of a 20 teams league, and the batch of one of its match days
+ROUTE_TEAMS = 20
+ROUTE_MATCHES = 38
+BATCH_SIZE = 10
+
+
+def _predictor(n_matches: int = ROUTE_MATCHES) -> Predictor:
+    teams, statistics = in_memory_teams(2, n_matches)
+    home, away = teams
+    predictor = Predictor(home, away, rng=np.random.default_rng(0))
+    predictor.home_stats = statistics[home.id]  # type: ignore
+    predictor.away_stats = statistics[away.id]  # type: ignore
+    return predictor
+
+
+def _history(n_matches: int) -> list[MatchStatistics]:
+    rng = random.Random(n_matches)
+    return [
+        enriched_match(rng, 1, match)
+        for match in synthetic_teams(1, n_matches)[0]["matchs"]
+    ]
+
+
+def _match_frame(matches: list[MatchStatistics]) -> pd.DataFrame:
+    """Matches as loaded by ``teams_match_frames``, side and result as their values"""
+    return pd.DataFrame.from_records(
+        [
+            [
+                value.value if isinstance(value, Enum) else value
+                for value in (getattr(match, column) for column in AGGREGATION_COLUMNS)
+            ]
+            for match in matches
+        ],
+        columns=list(AGGREGATION_COLUMNS),
+    )
+
+
+def predictor_cases(quick: bool) -> Iterator[BenchmarkResult]:
+    """Simulation of a single match, by mode and iterations or tolerance"""
+    predictor = _predictor()
+    for iterations in ITERATIONS:
+        yield measure(
+            "predictor.simulate",
+            partial(predictor.simulate, iterations, mode="monte_carlo"),
+            quick,
+            mode="monte_carlo",
+            iterations=iterations,
+        )
+    for tolerance in TOLERANCES:
+        yield measure(
+            "predictor.simulate",
+            partial(predictor.simulate, mode="adaptive", tolerance=tolerance),
+            quick,
+            mode="adaptive",
+            tolerance=tolerance,
+        )
+    yield measure(
+        "predictor.simulate",
+        lambda: predictor.simulate(mode="analytic"),
+        quick,
+        mode="analytic",
+    )
+
+
+def executor_cases(quick: bool) -> Iterator[BenchmarkResult]:
+    """Simulation of a match day on the process pool, throughput being matches per
+    second times ``matches``"""
+    executor = SimulationExecutor(
+        settings.SIMULATION_WORKERS,
+        max_pending=settings.SIMULATION_MAX_PENDING,
+        timeout=60,
+    )
+    home_xg = np.linspace(0.8, 2.4, BATCH_SIZE)
+    away_xg = home_xg[::-1].copy()
+
+    def run(iterations: int) -> None:
+        asyncio.run(
+            executor.score_matrices(home_xg, away_xg, iterations, "monte_carlo")
+        )
+
+    try:
+        for iterations in ITERATIONS:
+            yield measure(
+                "executor.score_matrices",
+                partial(run, iterations),
+                quick,
+                matches=BATCH_SIZE,
+                iterations=iterations,
+            )
+    finally:
+        executor.shutdown()
+
+
+def _statistics(
+    aggregate: Callable[[Any], RunningGlobalStatistics], matches: Any
+) -> GlobalStatistics:
+    return aggregate(matches).to_statistics()
+
+
+def _xg(statistics: type[TeamStatistics | GlobalStatistics], dump: dict) -> Any:
+    # ``xg`` is cached on the instance, statistics are built again on each round
+    return statistics(**dump).xg
+
+
+def aggregation_cases(quick: bool) -> Iterator[BenchmarkResult]:
+    """Aggregation of a team matches history, and the expected goals of the result"""
+    for history in HISTORY_SIZES:
+        matches = _history(history)
+        frame = _match_frame(matches)
+        yield measure(
+            "predictor._transform_data",
+            partial(Predictor._transform_data, frame),
+            quick,
+            matches=history,
+        )
+        yield measure(
+            "RunningGlobalStatistics.from_frame",
+            partial(_statistics, RunningGlobalStatistics.from_frame, frame),
+            quick,
+            matches=history,
+        )
+        yield measure(
+            "RunningGlobalStatistics.from_matches",
+            partial(_statistics, RunningGlobalStatistics.from_matches, matches),
+            quick,
+            matches=history,
+        )
+
+        statistics = Predictor._transform_data(frame)
+        dump = statistics.home_statistics.model_dump()
+        yield measure(
+            "TeamStatistics.xg",
+            partial(_xg, TeamStatistics, dump),
+            quick,
+            matches=history,
+        )
+        global_dump = statistics.model_dump()
+        yield measure(
+            "GlobalStatistics.xg",
+            partial(_xg, GlobalStatistics, global_dump),
+            quick,
+            matches=history,
+        )
+
+
+def _league_xg(dumps: list[dict]) -> list[Any]:
+    return [GlobalStatistics(**dump).xg for dump in dumps]
+
+
+def _frame_xg(teams: list[GlobalStatistics]) -> Any:
+    return GlobalStatsFrame.from_statistics(teams).xg
+
+
+def league_xg_cases(quick: bool) -> Iterator[BenchmarkResult]:
+    """xG of every team of a league, per statistics object or as columns"""
+    for n_teams in LEAGUE_SIZES:
+        _, statistics = in_memory_teams(n_teams, ROUTE_MATCHES)
+        dumps = [team.model_dump() for team in statistics.values()]
+        yield measure(
+            "GlobalStatistics.xg",
+            partial(_league_xg, dumps),
+            quick,
+            teams=n_teams,
+        )
+        teams = list(statistics.values())
+        yield measure(
+            "GlobalStatsFrame.xg",
+            partial(_frame_xg, teams),
+            quick,
+            teams=n_teams,
+        )
+
+
+def _season_table(n_teams: int) -> SeasonTable:
+    """League at mid-season, every team still to play all the others once"""
+    rng = np.random.default_rng(n_teams)
+    home, away = np.nonzero(np.triu(np.ones((n_teams, n_teams), dtype=bool), 1))
+    return SeasonTable(
+        points=rng.integers(10, 40, n_teams),
+        goal_difference=rng.integers(-15, 15, n_teams),
+        goals_for=rng.integers(15, 40, n_teams),
+        home=home,
+        away=away,
+        home_xg=rng.uniform(0.6, 2.4, len(home)),
+        away_xg=rng.uniform(0.4, 2.0, len(home)),
+    )
+
+
+def _simulate_season(table: SeasonTable, iterations: int) -> Any:
+    return simulate_season(table, table.chunks(iterations, seed=0))
+
+
+def season_cases(quick: bool) -> Iterator[BenchmarkResult]:
+    """Simulation of the rest of a season, in a single process"""
+    for n_teams in SEASON_SIZES:
+        table = _season_table(n_teams)
+        # A larger league has as many fixtures in a season as 25 seasons of a small one
+        for iterations in ITERATIONS if n_teams == ROUTE_TEAMS else ITERATIONS[:2]:
+            yield measure(
+                "simulate_season",
+                partial(_simulate_season, table, iterations),
+                quick,
+                teams=n_teams,
+                iterations=iterations,
+            )
+
+
+def _simulate_bracket(bracket: Bracket, iterations: int) -> Any:
+    return simulate_bracket(bracket, bracket.chunks(iterations, seed=0))
+
+
+def bracket_cases(quick: bool) -> Iterator[BenchmarkResult]:
+    """Knockout brackets, simulated in a single process or computed exactly"""
+    for n_teams in BRACKET_SIZES:
+        rng = np.random.default_rng(n_teams)
+        bracket = Bracket(
+            range(n_teams),
+            advance_probabilities(
+                rng.uniform(0.6, 2.4, (n_teams, n_teams)),
+                rng.uniform(0.4, 2.0, (n_teams, n_teams)),
+            ),
+        )
+        yield measure(
+            "Bracket.probabilities", bracket.probabilities, quick, teams=n_teams
+        )
+        for iterations in ITERATIONS:
+            yield measure(
+                "simulate_bracket",
+                partial(_simulate_bracket, bracket, iterations),
+                quick,
+                teams=n_teams,
+                iterations=iterations,
+            )
+
+
+def _run_in_session(
+    engine: AsyncEngine, function: Callable[..., Any], *args: Any
+) -> None:
+    async def run() -> None:
+        async with AsyncSession(engine) as session:
+            await session.run_sync(function, *args)
+
+    asyncio.run(run())
+
+
+def repository_cases(quick: bool) -> Iterator[BenchmarkResult]:
+    """Loading matches of a batch of teams, as frames or as ORM instances"""
+    for history in (ROUTE_MATCHES, *HISTORY_SIZES[1:]):
+        engine = asyncio.run(sqlite_engine(BATCH_SIZE, history))
+        team_ids = list(range(1, BATCH_SIZE + 1))
+
+        for name, function in (
+            ("repository.teams_match_frames", teams_match_frames),
+            ("repository.teams_matches", teams_matches),
+        ):
+            yield measure(
+                name,
+                partial(_run_in_session, engine, function, team_ids),
+                quick,
+                teams=BATCH_SIZE,
+                matches=history,
+            )
+        asyncio.run(engine.dispose())
+
+
+class _MockedSession:
+    """Async session answering the queries of the simulation routes from memory"""
+
+    def __init__(self, teams: list[Team]):
+        self.teams = {team.id: team for team in teams}
+
+    async def run_sync(self, function: Callable[..., Any], *args: Any) -> Any:
+        if function is teams_data_version:
+            return dict.fromkeys(args[0], (ROUTE_MATCHES, None))
+        if function is teams_with_competitions:
+            return [self.teams[team_id] for team_id in sorted(args[0])]
+        raise NotImplementedError(function)
+
+    async def commit(self) -> None: ...
+
+
+class _MockedStatisticsStore:
+    def __init__(self, statistics: dict[int, GlobalStatistics]):
+        self.statistics = statistics
+
+    async def get_teams_statistics(
+        self, teams: dict[Team, int]
+    ) -> tuple[dict[Team, GlobalStatistics], set[Team]]:
+        return {team: self.statistics[team.id] for team in teams}, set()  # type: ignore
+
+
+@contextmanager
+def _client() -> Iterator[TestClient]:
+    """Application without its background work, nor any response caching"""
+    settings.ENRICHMENT_WORKER_ENABLED = False
+    settings.RESPONSE_CACHE_ENABLED = False
+    from main import app
+
+    with TestClient(app) as client:
+        # Application logging is configured on startup
+        logging.disable(logging.INFO)
+        try:
+            yield client
+        finally:
+            app.dependency_overrides.clear()
+            logging.disable(logging.NOTSET)
+
+
+def _route_cases(
+    client: TestClient, database: str, quick: bool
+) -> Iterator[BenchmarkResult]:
+    def post(url: str, payload: Any) -> None:
+        # Predictions are cached, every round simulates again
+        prediction_cache.clear()
+        response = client.post(url, json=payload)
+        assert response.status_code == 200, response.text
+
+    match = {"home_team": 1, "away_team": 2, "seed": 0}
+    for mode, params in (
+        ("monte_carlo", {}),
+        *(("adaptive", {"tolerance": tolerance}) for tolerance in TOLERANCES),
+        ("analytic", {}),
+    ):
+        yield measure(
+            "route.simulations",
+            partial(post, "/api/v1/simulations/", match | {"mode": mode} | params),
+            quick,
+            database=database,
+            mode=mode,
+            **params,
+        )
+
+    # A match day, every team playing once
+    batch = [
+        {"home_team": home, "away_team": home + 1, "mode": "monte_carlo", "seed": 0}
+        for home in range(1, 2 * BATCH_SIZE, 2)
+    ]
+    yield measure(
+        "route.simulations_batch",
+        lambda: post("/api/v1/simulations/batch", batch),
+        quick,
+        database=database,
+        matches=len(batch),
+    )
+
+
+def route_cases(quick: bool) -> Iterator[BenchmarkResult]:
+    """Simulation routes end to end, on SQLite then with the database mocked out"""
+    with _client() as client:
+        app = client.app
+        engine = asyncio.run(sqlite_engine(ROUTE_TEAMS, ROUTE_MATCHES))
+
+        async def sqlite_db():
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                yield session
+
+        team_statistics_cache.clear()
+        app.dependency_overrides[get_async_db] = sqlite_db  # type: ignore
+        yield from _route_cases(client, "sqlite", quick)
+        asyncio.run(engine.dispose())
+
+        teams, statistics = in_memory_teams(ROUTE_TEAMS, ROUTE_MATCHES)
+        app.dependency_overrides[get_async_db] = lambda: _MockedSession(teams)  # type: ignore
+        app.dependency_overrides[TeamStatisticsStore] = lambda: _MockedStatisticsStore(  # type: ignore
+            statistics
+        )
+        yield from _route_cases(client, "mocked", quick)
+
+
+CASES: dict[str, Callable[[bool], Iterator[BenchmarkResult]]] = {
+    "predictor": predictor_cases,
+    "executor": executor_cases,
+    "aggregation": aggregation_cases,
+    "league_xg": league_xg_cases,
+    "season": season_cases,
+    "bracket": bracket_cases,
+    "repository": repository_cases,
+    "routes": route_cases,
+}
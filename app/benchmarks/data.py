@@ -0,0 +1,170 @@
+"""Synthetic teams and matches shaped like ``initial_data/teams.json``.
+
+Matches are enriched with random statistics, so they can be aggregated and simulated
+without the external APIs.
+"""
+
+import random
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from models import (
+    Competition,
+    CompetitionType,
+    MatchResult,
+    MatchSide,
+    MatchStatistics,
+    MatchStatus,
+    Team,
+)
+from predictor import GlobalStatistics, RunningGlobalStatistics
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel
+
+LEAGUE: dict[str, Any] = {
+    "type_": "league",
+    "name": "Synthetic League",
+    "data_id": "SYN",
+    "livescore_id": 1,
+    "transfermarkt_id": "SYN1",
+    "place_code": "syn",
+    "place_name": "Synthetica",
+    "start_date": "2024-08-16",
+}
+
+
+def synthetic_teams(
+    n_teams: int, n_matches: int, seed: int = 0
+) -> list[dict[str, Any]]:
+    """Teams of the synthetic league, each one with ``n_matches`` weekly matches"""
+    rng = random.Random(seed)
+    first_match = datetime.fromisoformat(LEAGUE["start_date"]) + timedelta(hours=15)
+    return [
+        {
+            "name": f"Synthetic Team {team} FC",
+            "short_name": f"Synthetic {team}",
+            "tag": f"S{team:02d}",
+            "venue_name": f"Synthetic Stadium {team}",
+            "logo_url": f"https://example.org/crests/{team}.png",
+            "data_id": 1000 + team,
+            "city": "Synthetica",
+            "leagues": [LEAGUE["data_id"]],
+            "livescore_id": 2000 + team,
+            "transfermarkt_id": 3000 + team,
+            "matchs": [
+                {
+                    "date": (first_match + timedelta(weeks=match)).isoformat(
+                        timespec="minutes"
+                    ),
+                    "data_id": 100_000 * (team + 1) + match,
+                    "livescore_id": rng.randint(1_000_000, 9_999_999),
+                    "transfermarkt_id": rng.randint(1_000_000, 9_999_999),
+                }
+                for match in range(n_matches)
+            ],
+        }
+        for team in range(n_teams)
+    ]
+
+
+def enriched_match(
+    rng: random.Random, team_id: int | None, match: dict[str, Any]
+) -> MatchStatistics:
+    goal_for, goal_against = rng.randint(0, 4), rng.randint(0, 4)
+    return MatchStatistics(
+        team_id=team_id,
+        data_id=match["data_id"],
+        livescore_id=match["livescore_id"],
+        transfermarkt_id=match["transfermarkt_id"],
+        date=datetime.fromisoformat(match["date"]),
+        status=MatchStatus.FINISHED,
+        side=rng.choice([MatchSide.HOME, MatchSide.AWAY]),
+        result=(
+            MatchResult.WIN
+            if goal_for > goal_against
+            else MatchResult.DRAW
+            if goal_for == goal_against
+            else MatchResult.LOSE
+        ),
+        goal_for=goal_for,
+        goal_against=goal_against,
+        fouls=rng.randint(5, 20),
+        shots=rng.randint(5, 25),
+        shots_off_goal=rng.randint(0, 10),
+        shots_on_goal=rng.randint(1, 10),
+        possession=rng.randint(30, 70),
+        livescore_xg=rng.uniform(0.2, 3) if rng.random() > 0.1 else None,
+    )
+
+
+def _league() -> Competition:
+    return Competition(
+        **{
+            key: value
+            for key, value in LEAGUE.items()
+            if key not in ("type_", "start_date")
+        },
+        type_=CompetitionType(LEAGUE["type_"]),
+        start_date=date.fromisoformat(LEAGUE["start_date"]),
+    )
+
+
+def _team(team: dict[str, Any]) -> Team:
+    return Team(
+        **{
+            key: value
+            for key, value in team.items()
+            if key not in ("leagues", "matchs")
+        }
+    )
+
+
+def in_memory_teams(
+    n_teams: int, n_matches: int, seed: int = 0
+) -> tuple[list[Team], dict[int, GlobalStatistics]]:
+    """Teams with ids and their aggregated statistics, without any database"""
+    rng = random.Random(seed)
+    league = _league()
+    league.id = 1
+
+    teams, statistics = [], {}
+    for team_id, data in enumerate(synthetic_teams(n_teams, n_matches, seed), 1):
+        team = _team(data)
+        team.id = team_id
+        team._competitions = [league]
+        teams.append(team)
+        statistics[team_id] = RunningGlobalStatistics.from_matches(
+            [enriched_match(rng, team_id, match) for match in data["matchs"]]
+        ).to_statistics()
+    return teams, statistics
+
+
+def _populate(session: Session, n_teams: int, n_matches: int, seed: int) -> None:
+    rng = random.Random(seed)
+    league = _league()
+    for data in synthetic_teams(n_teams, n_matches, seed):
+        team = _team(data)
+        team._competitions = [league]
+        team.matches = [enriched_match(rng, None, match) for match in data["matchs"]]
+        session.add(team)
+    session.commit()
+
+
+async def sqlite_engine(n_teams: int, n_matches: int, seed: int = 0) -> AsyncEngine:
+    """In-memory SQLite stand-in for Postgres, holding the synthetic league"""
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+    async with engine.connect() as connection:
+        await connection.run_sync(
+            lambda sync_connection: _populate(
+                Session(sync_connection), n_teams, n_matches, seed
+            )
+        )
+        await connection.commit()
+    return engine
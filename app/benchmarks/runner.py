@@ -0,0 +1,130 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from collections.abc import Callable, Iterable
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from sqlmodel import SQLModel
+
+# Timing rounds of a benchmark, ``quick`` ones for a smoke run
+MIN_ROUNDS = 5
+MIN_TIME = 0.5
+QUICK_MIN_ROUNDS = 2
+QUICK_MIN_TIME = 0.05
+
+
+class BenchmarkResult(SQLModel):
+    name: str
+    params: dict[str, Any]
+    rounds: int
+    mean_ms: float
+    median_ms: float
+    min_ms: float
+    max_ms: float
+    stdev_ms: float
+    ops_per_sec: float
+
+    @property
+    def key(self) -> str:
+        params = ",".join(f"{name}={value}" for name, value in self.params.items())
+        return f"{self.name}[{params}]"
+
+
+def measure(
+    name: str,
+    function: Callable[[], Any],
+    quick: bool = False,
+    **params: Any,
+) -> BenchmarkResult:
+    """Time ``function`` after a warm-up call, for enough rounds and enough time"""
+    min_rounds, min_time = (
+        (QUICK_MIN_ROUNDS, QUICK_MIN_TIME) if quick else (MIN_ROUNDS, MIN_TIME)
+    )
+    function()
+
+    durations: list[float] = []
+    started = time.perf_counter()
+    while len(durations) < min_rounds or time.perf_counter() - started < min_time:
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+
+    mean = statistics.fmean(durations)
+    return BenchmarkResult(
+        name=name,
+        params=params,
+        rounds=len(durations),
+        mean_ms=round(mean * 1000, 4),
+        median_ms=round(statistics.median(durations) * 1000, 4),
+        min_ms=round(min(durations) * 1000, 4),
+        max_ms=round(max(durations) * 1000, 4),
+        stdev_ms=round(statistics.stdev(durations) * 1000, 4),
+        ops_per_sec=round(1 / mean, 2),
+    )
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadata() -> dict[str, Any]:
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def write_results(path: Path | str, results: Iterable[BenchmarkResult]) -> None:
+    with open(path, "w") as stream:
+        json.dump(
+            {
+                "metadata": metadata(),
+                "results": [result.model_dump() for result in results],
+            },
+            stream,
+            indent=2,
+        )
+
+
+def load_results(path: Path | str) -> dict[str, BenchmarkResult]:
+    with open(path) as stream:
+        results = [BenchmarkResult(**result) for result in json.load(stream)["results"]]
+    return {result.key: result for result in results}
+
+
+def compare(
+    baseline: dict[str, BenchmarkResult],
+    results: Iterable[BenchmarkResult],
+    threshold: float,
+) -> list[tuple[str, float]]:
+    """Median time ratio against the baseline of each benchmark run in both.
+
+    Returns the regressions, the benchmarks more than ``threshold`` times slower.
+    """
+    regressions = []
+    for result in results:
+        if (reference := baseline.get(result.key)) is None:
+            continue
+        ratio = result.median_ms / reference.median_ms
+        print(f"{result.key:<70} {reference.median_ms:>10.3f} ms -> x{ratio:.2f}")
+        if ratio > threshold:
+            regressions.append((result.key, ratio))
+    return regressions
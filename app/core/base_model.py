@@ -7,6 +7,37 @@ class ServerStatus(SQLModel):
     status: Literal["OK", "ERROR"]
 
 
+class HttpMetrics(SQLModel):
+    # Worker process counting the metrics, each one has its own
+    pid: int
+    requests: int
+    connections: int
+    reused: int
+    reuse_ratio: float
+
+
+class ConnectionPoolMetrics(SQLModel):
+    checkouts: int
+    waits: int
+    timeouts: int
+    connections: int
+    invalidations: int
+    in_use: int
+    peak_in_use: int
+    checkout_ms_avg: float
+    checkout_ms_max: float
+    size: int
+    idle: int
+    overflow: int
+
+
+class DatabaseMetrics(SQLModel):
+    # Worker process counting the metrics, each one has its own pools
+    pid: int
+    engine: ConnectionPoolMetrics
+    async_engine: ConnectionPoolMetrics
+
+
 class ActionMessage(SQLModel):
     status: Literal["OK", "ERROR", "NOTHING_DONE"]
     message: str
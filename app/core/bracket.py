@@ -0,0 +1,54 @@
+import numpy as np
+from models import BracketSimulation, Team, TeamBracketOutcome
+from models.predictions import BracketMode
+from predictor import Bracket, GlobalStatistics, Predictor
+from predictor.bracket import advance_probabilities
+
+
+def default_bracket(teams: list[Team]) -> list[int | None]:
+    """Teams by id, the first ones given a bye to fill the bracket"""
+    team_ids: list[int | None] = sorted(team.id for team in teams)  # type: ignore
+    byes = (1 << max(1, (len(teams) - 1).bit_length())) - len(teams)
+    with_byes = [slot for team_id in team_ids[:byes] for slot in (team_id, None)]
+    return with_byes + team_ids[byes:]
+
+
+def build_bracket(
+    bracket: list[int | None],
+    teams: list[Team],
+    statistics: dict[Team, GlobalStatistics],
+) -> Bracket:
+    """Bracket of the teams by id, the chances of every pair of them computed once
+    for all the rounds and iterations"""
+    index = {team.id: i for i, team in enumerate(teams)}
+    home_xg, away_xg = Predictor.xg_grid([statistics[team] for team in teams])
+    return Bracket(
+        [None if team_id is None else index[team_id] for team_id in bracket],
+        advance_probabilities(home_xg, away_xg),
+    )
+
+
+def bracket_simulation(
+    competition_id: int,
+    bracket: list[int | None],
+    mode: BracketMode,
+    probabilities: np.ndarray,
+    iterations: int | None = None,
+    seed: int | None = None,
+    partial: bool = False,
+) -> BracketSimulation:
+    """Outcome of the bracket, ``probabilities`` indexed by ``[slot, round]``"""
+    percentages = np.round(probabilities * 100, 2)
+    return BracketSimulation(
+        competition_id=competition_id,
+        mode=mode,
+        bracket=bracket,
+        iterations=iterations,
+        teams=[
+            TeamBracketOutcome(team_id=team_id, rounds=percentages[slot].tolist())
+            for slot, team_id in enumerate(bracket)
+            if team_id is not None
+        ],
+        status="PARTIAL" if partial else "COMPLETE",
+        seed=seed,
+    )
@@ -39,6 +39,64 @@ class Settings(BaseSettings):
 
     ADMIN_PASSWORD: bytes
 
+    # API worker processes, uvicorn runs as many when started without --workers.
+    # Quotas shared by all of them are split between the processes
+    WEB_CONCURRENCY: int = 1
+
+    # Connection pool of each engine, sync and async, in every worker process.
+    # Timeout and recycle in seconds, a negative overflow is unbounded
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # External APIs rate limits, in requests per second for all the worker processes
+    FOOTBALL_DATA_RATE_LIMIT: float = 10 / 60
+    FOOTBALL_DATA_RATE_BURST: int = 10
+    LIVESCORE_RATE_LIMIT: float = 3
+    LIVESCORE_RATE_BURST: int = 3
+    ENRICHMENT_CONCURRENCY: int = 8
+    ENRICHMENT_WORKER_ENABLED: bool = True
+    # Seconds between two scans of the teams having matches to enrich
+    ENRICHMENT_SCAN_INTERVAL: int = 900
+
+    # Clients shared by every external API call, timeouts in seconds
+    HTTP_TIMEOUT: float = 10
+    HTTP_CONNECT_TIMEOUT: float = 5
+    HTTP_MAX_CONNECTIONS: int = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP2_ENABLED: bool = True
+
+    # Local store of external APIs responses, OFFLINE only replays stored ones
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_PATH: Path = BASE_DIR / ".cache" / "responses.sqlite3"
+    RESPONSE_CACHE_OFFLINE: bool = False
+    # Seconds before finished matches of a running season are requested again
+    RESPONSE_CACHE_SEASON_TTL: int = 12 * 3600
+
+    # Processes running Monte Carlo simulations in each API worker, the cores shared
+    # between the WEB_CONCURRENCY workers when unset. A simulation runs one job per
+    # process at most, jobs past SIMULATION_MAX_PENDING are refused and a simulation
+    # is given SIMULATION_TIMEOUT seconds for all its jobs. Season and bracket simulations draw by chunks within
+    # SIMULATION_CHUNK_MEMORY bytes in each process, brackets stopping after
+    # BRACKET_SIMULATION_BUDGET seconds with the iterations simulated so far
+    SIMULATION_WORKERS: int | None = None
+    SIMULATION_MAX_PENDING: int = 64
+    SIMULATION_TIMEOUT: float = 30
+    SIMULATION_CHUNK_MEMORY: int = 64 * 2**20
+    BRACKET_SIMULATION_BUDGET: float = 1
+
+    # Requests profiled with cProfile at PROFILE_SAMPLE_RATE, between 0 and 1. Profiles
+    # of the ones slower than PROFILE_THRESHOLD seconds are written to PROFILE_DIR
+    PROFILE_SAMPLE_RATE: float = 0
+    PROFILE_THRESHOLD: float = 1
+    PROFILE_DIR: Path = BASE_DIR / ".cache" / "profiles"
+
+    TEAM_STATISTICS_CACHE_SIZE: int = 1024
+    PREDICTION_CACHE_SIZE: int = 2048
+    PREDICTION_CACHE_TTL: int = 3600
+
     @computed_field  # type: ignore
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> MultiHostUrl:
@@ -1,5 +1,64 @@
+import time
+from typing import Any
+
+from libs.tracing import record, span
+from sqlalchemy import Engine, event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlmodel import create_engine
 
 from core.config import settings
+from core.pool import PoolMetrics, metered_pool
+
+
+def _pool_options() -> dict[str, Any]:
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def _trace_queries(engine: Engine) -> None:
+    """Time every statement run on the engine as the ``db`` stage"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        context.query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        record("db", time.perf_counter() - context.query_start)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _trace_relationship_loads(state: ORMExecuteState) -> Any:
+    """Time the loads of relationships, lazy or eager, as ``db.relationship``"""
+    if state.is_relationship_load:
+        with span("db.relationship"):
+            return state.invoke_statement()
+    return None
+
+
+engine_metrics = PoolMetrics()
+async_engine_metrics = PoolMetrics()
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+# Blocking engine of the background threads, scripts and migrations
+engine = create_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=metered_pool(QueuePool, engine_metrics),
+    **_pool_options(),
+)
+# Request handlers run on the event loop, psycopg in its async mode
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=metered_pool(AsyncAdaptedQueuePool, async_engine_metrics),
+    **_pool_options(),
+)
+engine_metrics.listen(engine)
+async_engine_metrics.listen(async_engine.sync_engine)
+_trace_queries(engine)
+_trace_queries(async_engine.sync_engine)
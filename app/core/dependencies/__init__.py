@@ -2,10 +2,12 @@ from typing import Annotated
 
 from fastapi import Depends, FastAPI
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from core.dependencies.base import get_current_app, get_db
-from core.dependencies.matches_data_extraction import MatchesDataExtractor
+from core.dependencies.base import get_async_db, get_current_app, get_db
+from core.dependencies.team_statistics import TeamStatisticsStore
 
 SessionDep = Annotated[Session, Depends(get_db)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
 CurrentAppDep = Annotated[FastAPI, Depends(get_current_app)]
-MatchExtractorDep = Annotated[MatchesDataExtractor, Depends(MatchesDataExtractor)]
+TeamStatisticsDep = Annotated[TeamStatisticsStore, Depends(TeamStatisticsStore)]
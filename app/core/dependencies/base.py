@@ -1,9 +1,10 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 
 from fastapi import Request
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from core.db import engine
+from core.db import async_engine, engine
 
 
 def get_db() -> Generator[Session]:
@@ -11,5 +12,11 @@ def get_db() -> Generator[Session]:
         yield session
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession]:
+    # Attributes are not expired on commit, loading them again would need IO
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
 def get_current_app(request: Request) -> Generator:
     yield request.app
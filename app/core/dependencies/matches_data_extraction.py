@@ -1,23 +1,87 @@
+import asyncio
 import logging
-import time
-from datetime import datetime, timedelta
-from typing import Annotated
+from collections.abc import Awaitable
+from typing import Annotated, Any
 
+import httpx
 import pandas as pd
 from fastapi import Depends, FastAPI
 from libs.football_data_api import FootballDataApiService
 from libs.livescore_api import LiveScoreApiService
+from libs.rate_limiter import TokenBucket
+from libs.tracing import traced
 from models import MatchResult, MatchSide, MatchStatistics, MatchStatus, Team
+from sqlalchemy import update
+from sqlmodel import Session
 
-from core.dependencies.base import get_current_app
+from core.config import settings
+from core.dependencies.base import get_current_app, get_db
+from core.statistics import apply_team_matches
 
 logger = logging.getLogger(__name__)
 
+# football-data.org team matches and LiveScore statistics of the enriched matches
+EnrichmentData = tuple[pd.DataFrame, list[list[dict[str, int]]]]
+
+
+def process_rate_limiter(rate: float, burst: int) -> TokenBucket:
+    """Limiter of this process, its share of a quota of all the worker processes"""
+    workers = settings.WEB_CONCURRENCY
+    return TokenBucket(rate=rate / workers, capacity=max(1, burst // workers))
+
+
+# Shared by every extractor so quotas hold across concurrent requests
+data_api_rate_limiter = process_rate_limiter(
+    settings.FOOTBALL_DATA_RATE_LIMIT, settings.FOOTBALL_DATA_RATE_BURST
+)
+livescore_rate_limiter = process_rate_limiter(
+    settings.LIVESCORE_RATE_LIMIT, settings.LIVESCORE_RATE_BURST
+)
+
+
+def _score(goals: Any) -> int | None:
+    """Goals of a football-data.org score, as a plain integer"""
+    return None if pd.isna(goals) else int(goals)
+
+
+def store_enriched_matches(
+    session: Session, enriched: dict[int, dict[str, Any]]
+) -> set[int]:
+    """Store the columns of enriched matches by id, returning the ids stored.
+
+    A match is only updated while it is still to enrich: one enriched meanwhile by
+    another process is left as it is, its statistics already in the aggregates. The
+    instances of the session are updated along.
+    """
+    stored: set[int] = set()
+    for match_id, values in enriched.items():
+        statement = (
+            update(MatchStatistics)
+            .where(
+                MatchStatistics.id == match_id,  # type: ignore
+                MatchStatistics.status == MatchStatus.NO_DATA,  # type: ignore
+            )
+            .values(**values)
+            .returning(MatchStatistics.id)
+            .execution_options(synchronize_session="fetch")
+        )
+        stored.update(session.execute(statement).scalars())
+    return stored
+
 
 class MatchesDataExtractor:
-    def __init__(self, current_app: Annotated[FastAPI, Depends(get_current_app)]):
+    def __init__(
+        self,
+        current_app: Annotated[FastAPI, Depends(get_current_app)],
+        session: Annotated[Session, Depends(get_db)],
+    ):
+        self.session = session
         self.data_api = FootballDataApiService(
             api_key=current_app.state.config.FOOTBALL_DATA_API_KEY,
+            rate_limiter=data_api_rate_limiter,
+            client=current_app.state.http_client,
+            cache=current_app.state.response_cache,
+            season_ttl=current_app.state.config.RESPONSE_CACHE_SEASON_TTL,
         )
         self.livescore_api = LiveScoreApiService(
             api_key=current_app.state.config.RAPIDAPI_KEY,
@@ -26,88 +90,137 @@ class MatchesDataExtractor:
                 current_app.state.config.RAPIDAPI_KEY_2,
                 current_app.state.config.RAPIDAPI_KEY_3,
             ],
+            rate_limiter=livescore_rate_limiter,
+            client=current_app.state.http_client,
+            cache=current_app.state.response_cache,
         )
 
     @staticmethod
     def _enrichment_match_statistics(
-        match: MatchStatistics,
+        team: Team,
         data_match: pd.Series,
         livescore_match: list[dict[str, int]],
-    ) -> MatchStatistics:
-        match.status = (
-            MatchStatus.FINISHED
-            if data_match["status"] == "FINISHED"
-            else MatchStatus.NOT_STARTED
-        )
-        match.side = (
+    ) -> dict[str, Any]:
+        """Columns of an enriched match of the team, the loaded instance left as it is
+        until they are stored"""
+        side = (
             MatchSide.HOME
-            if data_match["homeTeam.id"] == match.team.data_id
+            if data_match["homeTeam.id"] == team.data_id
             else MatchSide.AWAY
         )
-        match.result = (
-            MatchResult.WIN
-            if data_match["score.winner"] == f"{match.side.name}_TEAM"
-            else MatchResult.DRAW
-            if data_match["score.winner"] == MatchResult.DRAW.name
-            else MatchResult.LOSE
-        )
-        match.goal_for = data_match[f"score.fullTime.{match.side.name.lower()}"]
-        match.goal_against = data_match[
-            f"score.fullTime.{"away" if match.side == MatchSide.HOME else "home"}"
-        ]
-
-        side = 0 if match.side == MatchSide.HOME else 1
-
-        match.fouls = livescore_match[side]["Fls"]
-        match.shots = (
-            livescore_match[side]["Shof"]
-            + livescore_match[side]["Shon"]
-            + livescore_match[side]["Shbl"]
-            + livescore_match[side]["Shwd"]
-        )
-        match.shots_off_goal = livescore_match[side]["Shof"]
-        match.shots_on_goal = livescore_match[side]["Shon"]
-        match.possession = livescore_match[side]["Pss"]
-        match.livescore_xg = livescore_match[side].get("Xg", None)
-
-        return match
+        statistics = livescore_match[0 if side == MatchSide.HOME else 1]
+        return {
+            "status": (
+                MatchStatus.FINISHED
+                if data_match["status"] == "FINISHED"
+                else MatchStatus.NOT_STARTED
+            ),
+            "side": side,
+            "result": (
+                MatchResult.WIN
+                if data_match["score.winner"] == f"{side.name}_TEAM"
+                else MatchResult.DRAW
+                if data_match["score.winner"] == MatchResult.DRAW.name
+                else MatchResult.LOSE
+            ),
+            "goal_for": _score(data_match[f"score.fullTime.{side.name.lower()}"]),
+            "goal_against": _score(
+                data_match[
+                    f"score.fullTime.{"away" if side == MatchSide.HOME else "home"}"
+                ]
+            ),
+            "fouls": statistics["Fls"],
+            "shots": (
+                statistics["Shof"]
+                + statistics["Shon"]
+                + statistics["Shbl"]
+                + statistics["Shwd"]
+            ),
+            "shots_off_goal": statistics["Shof"],
+            "shots_on_goal": statistics["Shon"],
+            "possession": statistics["Pss"],
+            "livescore_xg": statistics.get("Xg", None),
+        }
+
+    async def _fetch_team_data(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        team: Team,
+        season: int,
+        matches: list[MatchStatistics],
+    ) -> EnrichmentData:
+        async def bounded[T](request: Awaitable[T]) -> T:
+            async with semaphore:
+                return await request
 
-    def _retrieve_matches(
-        self, team: Team, season: int, now: datetime
-    ) -> list[MatchStatistics]:
-        matches = [m for m in team.matches if m.date < (now - timedelta(days=1))]
         logger.info(
-            f"Extract [{len(matches)}] matches statistics of team [{team.short_name}]"
+            f"No statistics found for [{len(matches)}] matches of team [{team.short_name}], so extract from api"
         )
-
-        data_df = None
-        if any(m for m in matches if m.status == MatchStatus.NO_DATA):
-            data_df, _ = self.data_api.get_team_matches(team.data_id, season)
-
-        statistics = []
-        for match in matches:
-            if match.status == MatchStatus.NO_DATA:
-                logger.info(
-                    f"No statistics found for match [{match.data_id}] of team [{team.short_name}], so extract from api"
+        (data_df, _), livescore_matches = await asyncio.gather(
+            bounded(self.data_api.async_get_team_matches(client, team.data_id, season)),
+            asyncio.gather(
+                *(
+                    bounded(
+                        self.livescore_api.async_get_match_statistics(
+                            client,
+                            match.livescore_id,  # type: ignore
+                        )
+                    )
+                    for match in matches
                 )
+            ),
+        )
+        return data_df, livescore_matches
+
+    async def fetch_enrichment_data(
+        self,
+        to_enrich: dict[Team, tuple[int, list[MatchStatistics]]],
+        client: httpx.AsyncClient,
+    ) -> dict[Team, EnrichmentData]:
+        """Concurrently fetch what is missing to enrich the given matches of each team,
+        through the application client of the event loop running the call"""
+        semaphore = asyncio.Semaphore(settings.ENRICHMENT_CONCURRENCY)
+        results = await asyncio.gather(
+            *(
+                self._fetch_team_data(client, semaphore, team, season, matches)
+                for team, (season, matches) in to_enrich.items()
+            )
+        )
+        return dict(zip(to_enrich, results, strict=True))
+
+    @traced("enrichment.apply")
+    def apply_enrichment_data(
+        self,
+        to_enrich: dict[Team, tuple[int, list[MatchStatistics]]],
+        data: dict[Team, EnrichmentData],
+    ) -> None:
+        for team, (_, matches) in to_enrich.items():
+            data_df, livescore_matches = data[team]
+            enriched = {}
+            for match, livescore_match in zip(matches, livescore_matches, strict=True):
                 data_match = data_df[data_df["id"] == match.data_id].iloc[0]
-                livescore_match = self.livescore_api.get_match_statistics(
-                    match.livescore_id
+                enriched[match.id] = self._enrichment_match_statistics(
+                    team, data_match, livescore_match
                 )
-                match = self._enrichment_match_statistics(
-                    match, data_match, livescore_match
+            # Aggregates only get the matches stored by this call
+            stored = store_enriched_matches(self.session, enriched)  # type: ignore
+            if stored:
+                apply_team_matches(
+                    self.session,
+                    team.id,  # type: ignore
+                    [match for match in matches if match.id in stored],
                 )
-                time.sleep(0.3)
-
-            statistics.append(match)
-        return statistics
 
-    def get_match_data(
-        self, home_team: Team, away_team: Team, season: int
-    ) -> tuple[list[MatchStatistics], list[MatchStatistics]]:
-        now = datetime.now()
-
-        home_matches = self._retrieve_matches(home_team, season, now)
-        away_matches = self._retrieve_matches(away_team, season, now)
-
-        return home_matches, away_matches
+    @staticmethod
+    def matches_to_enrich(
+        teams: dict[Team, int], matches: dict[Team, list[MatchStatistics]]
+    ) -> dict[Team, tuple[int, list[MatchStatistics]]]:
+        """Season and played matches without statistics of each team having some"""
+        return {
+            team: (season, no_data)
+            for team, season in teams.items()
+            if (
+                no_data := [m for m in matches[team] if m.status == MatchStatus.NO_DATA]
+            )
+        }
@@ -0,0 +1,103 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Annotated
+
+from fastapi import Depends, FastAPI
+from libs.tracing import span
+from models import Team
+from predictor import GlobalStatistics, RunningGlobalStatistics
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.dependencies.base import get_async_db, get_current_app
+from core.repository import (
+    ENRICHED_STATUSES,
+    teams_match_frames,
+    teams_with_pending_matches,
+)
+from core.statistics import (
+    load_team_statistics,
+    save_team_statistics,
+    statistics_key,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class TeamStatisticsStore:
+    """Serve teams aggregated statistics from the database, never waiting on enrichment.
+
+    Teams with played matches still to enrich are served with the statistics stored so
+    far and queued to the background enrichment worker. Queries run on the request
+    async session, the aggregation code being shared with the worker threads.
+    """
+
+    def __init__(
+        self,
+        current_app: Annotated[FastAPI, Depends(get_current_app)],
+        session: Annotated[AsyncSession, Depends(get_async_db)],
+    ):
+        self.enrichment_worker = current_app.state.enrichment_worker
+        self.session = session
+
+    async def get_teams_statistics(
+        self, teams: dict[Team, int]
+    ) -> tuple[dict[Team, GlobalStatistics], set[Team]]:
+        """Aggregated statistics of each team for its season, and the stale teams"""
+        return await self.session.run_sync(self._teams_statistics, teams)  # type: ignore
+
+    async def get_statistics(self, team: Team, season: int) -> GlobalStatistics:
+        return (await self.get_teams_statistics({team: season}))[0][team]
+
+    def _teams_statistics(
+        self, session: Session, teams: dict[Team, int]
+    ) -> tuple[dict[Team, GlobalStatistics], set[Team]]:
+        now = datetime.now()
+
+        pending_ids = teams_with_pending_matches(
+            session,
+            now - timedelta(days=1),
+            team_ids=[team.id for team in teams],  # type: ignore
+        )
+        if pending_ids:
+            logger.info(f"Queue enrichment of stale teams {sorted(pending_ids)}")
+            # Enriched for the season requested, even when no longer played
+            self.enrichment_worker.enqueue(
+                {
+                    team.id: season
+                    for team, season in teams.items()
+                    if team.id in pending_ids
+                }  # type: ignore
+            )
+
+        statistics = {}
+        for team, season in teams.items():
+            if (
+                team_statistics := load_team_statistics(
+                    session, statistics_key(team, season)
+                )
+            ) is not None:
+                statistics[team] = team_statistics
+
+        # Enriched matches of the teams missing an aggregate are loaded together, as
+        # the columns aggregated only
+        cold_teams = [team for team in teams if team not in statistics]
+        matches = teams_match_frames(
+            session,
+            [team.id for team in cold_teams],  # type: ignore
+            before=now - timedelta(days=1),
+            statuses=ENRICHED_STATUSES,
+        )
+        for team in cold_teams:
+            logger.info(f"Aggregate matches statistics of team [{team.short_name}]")
+            with span("aggregation"):
+                running = RunningGlobalStatistics.from_frame(matches[team.id])  # type: ignore
+            if team.id in pending_ids:
+                # Not stored: the worker may enrich the team before this record is
+                # committed, its matches would never be added to it
+                statistics[team] = running.to_statistics()
+            else:
+                statistics[team] = save_team_statistics(
+                    session, statistics_key(team, teams[team]), running
+                )
+        return statistics, {team for team in teams if team.id in pending_ids}
@@ -0,0 +1,249 @@
+import asyncio
+import logging
+from collections.abc import Mapping
+from datetime import date, datetime, timedelta
+
+from fastapi import FastAPI
+from libs.tracing import span, traced
+from models import MatchStatistics, MatchStatus, Team
+from sqlalchemy import Connection, Engine, text
+from sqlmodel import Session
+
+from core.db import engine
+from core.dependencies.matches_data_extraction import (
+    EnrichmentData,
+    MatchesDataExtractor,
+)
+from core.repository import (
+    teams_matches,
+    teams_with_competitions,
+    teams_with_pending_matches,
+)
+
+logger = logging.getLogger(__name__)
+
+ToEnrich = dict[Team, tuple[int, list[MatchStatistics]]]
+# Season of each team to enrich, None for the season of its active competitions
+Seasons = dict[int, int | None]
+
+# First key of the advisory locks of the teams being enriched, the team id the second
+ENRICHMENT_LOCK_KEY = 1
+
+
+def active_competitions_since(now: datetime) -> date:
+    """Competitions started during the last year are the ones still played"""
+    return (now - timedelta(days=365)).date()
+
+
+class TeamLocks:
+    """Teams only enriched by the process holding their lock.
+
+    Every API worker process runs an enrichment worker, a team another process is
+    enriching is left out instead of being requested twice. Postgres advisory locks
+    are held by a connection of their own, across the transactions of the enrichment.
+    Other databases serve a single process, every team is granted.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self._connection: Connection | None = None
+        self.locked: list[int] = []
+
+    def acquire(self, team_ids: list[int]) -> list[int]:
+        """Teams of ``team_ids`` locked, the ones locked by another process left out"""
+        if self.engine.dialect.name != "postgresql":
+            self.locked = list(team_ids)
+            return self.locked
+
+        self._connection = self.engine.connect().execution_options(
+            isolation_level="AUTOCOMMIT"
+        )
+        self.locked = [
+            team_id
+            for team_id in team_ids
+            if self._connection.execute(
+                text("SELECT pg_try_advisory_lock(:key, :team_id)"),
+                {"key": ENRICHMENT_LOCK_KEY, "team_id": team_id},
+            ).scalar()
+        ]
+        return self.locked
+
+    def release(self) -> None:
+        if self._connection is None:
+            return
+        try:
+            for team_id in self.locked:
+                self._connection.execute(
+                    text("SELECT pg_advisory_unlock(:key, :team_id)"),
+                    {"key": ENRICHMENT_LOCK_KEY, "team_id": team_id},
+                )
+        finally:
+            # Locks are released with their connection anyway
+            self._connection.close()
+            self._connection = None
+
+
+class EnrichmentWorker:
+    """Enrich played matches in the background so predictions never wait on external APIs.
+
+    Teams of the active competitions are scanned periodically, teams found stale by a
+    request are refreshed as soon as possible for the season the request needs. Both
+    go through the same queue, a team waiting in it is never queued twice.
+    """
+
+    BATCH_SIZE = 10
+
+    def __init__(self, app: FastAPI, interval: float):
+        self.app = app
+        self.interval = interval
+        self._queue: asyncio.Queue[int] = asyncio.Queue()
+        self._queued: Seasons = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._tasks = [
+            asyncio.create_task(self._scan_periodically()),
+            asyncio.create_task(self._consume()),
+        ]
+        logger.info(f"Enrichment worker started, scanning every [{self.interval}]s")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("Enrichment worker stopped")
+
+    def enqueue(self, seasons: Mapping[int, int]) -> None:
+        """Queue teams for a refresh of their season, callable from any thread"""
+        if self._loop is None or not self.running:
+            return
+        self._loop.call_soon_threadsafe(self._put, dict(seasons))
+
+    def _put(self, seasons: Mapping[int, int | None]) -> None:
+        for team_id, season in seasons.items():
+            if team_id not in self._queued:
+                self._queue.put_nowait(team_id)
+            elif season is None:
+                # Already waiting, maybe for the season a request needs
+                continue
+            self._queued[team_id] = season
+
+    async def _scan_periodically(self) -> None:
+        while True:
+            try:
+                team_ids = await asyncio.to_thread(self._stale_team_ids, datetime.now())
+                logger.info(f"Enrichment scan found [{len(team_ids)}] stale teams")
+                self._put(dict.fromkeys(team_ids))
+            except Exception:
+                logger.exception("Enrichment scan failed")
+            await asyncio.sleep(self.interval)
+
+    async def _consume(self) -> None:
+        while True:
+            team_ids = [await self._queue.get()]
+            while len(team_ids) < self.BATCH_SIZE and not self._queue.empty():
+                team_ids.append(self._queue.get_nowait())
+            seasons = {team_id: self._queued.pop(team_id) for team_id in team_ids}
+            try:
+                await self.refresh_teams(seasons)
+            except Exception:
+                logger.exception(f"Enrichment of teams {team_ids} failed")
+
+    @staticmethod
+    def _stale_team_ids(now: datetime) -> list[int]:
+        """Teams of active competitions having played matches without statistics"""
+        with Session(engine) as session:
+            return sorted(
+                teams_with_pending_matches(
+                    session,
+                    now - timedelta(days=1),
+                    competitions_since=active_competitions_since(now),
+                )
+            )
+
+    async def refresh_teams(self, seasons: Seasons) -> None:
+        """Enrich the played matches of the teams and update their aggregates"""
+        now = datetime.now()
+        locks = TeamLocks(engine)
+        # Database work stays out of the event loop, only requests run on it
+        team_ids = await asyncio.to_thread(locks.acquire, list(seasons))
+        try:
+            if skipped := sorted(seasons.keys() - set(team_ids)):
+                logger.info(f"Teams {skipped} are enriched by another process")
+            if not team_ids:
+                return
+            with Session(engine) as session:
+                extractor = MatchesDataExtractor(current_app=self.app, session=session)
+                to_enrich = await asyncio.to_thread(
+                    self._matches_to_enrich,
+                    session,
+                    extractor,
+                    {team_id: seasons[team_id] for team_id in team_ids},
+                    now,
+                )
+                if not to_enrich:
+                    return
+                with span("enrichment.fetch"):
+                    data = await extractor.fetch_enrichment_data(
+                        to_enrich, self.app.state.async_http_client
+                    )
+                await asyncio.to_thread(
+                    self._apply_enrichment_data, session, extractor, to_enrich, data
+                )
+            logger.info(f"Enriched matches of [{len(to_enrich)}] teams")
+        finally:
+            await asyncio.to_thread(locks.release)
+
+    @staticmethod
+    @traced("enrichment.load")
+    def _matches_to_enrich(
+        session: Session,
+        extractor: MatchesDataExtractor,
+        team_seasons: Seasons,
+        now: datetime,
+    ) -> ToEnrich:
+        teams = teams_with_competitions(session, team_seasons)
+
+        # Teams queued by a scan are only enriched for their active competitions
+        since = active_competitions_since(now)
+        seasons = {}
+        for team in teams:
+            if (season := team_seasons[team.id]) is not None:  # type: ignore
+                seasons[team] = season
+                continue
+            starts = [
+                c.start_date
+                for c in team._competitions
+                if c.start_date is not None and c.start_date >= since
+            ]
+            if starts:
+                seasons[team] = min(starts).year
+
+        # Only the matches still to enrich are loaded
+        matches = teams_matches(
+            session,
+            [team.id for team in seasons],  # type: ignore
+            before=now - timedelta(days=1),
+            statuses=(MatchStatus.NO_DATA,),
+        )
+        return extractor.matches_to_enrich(
+            seasons,
+            {team: matches[team.id] for team in seasons},  # type: ignore
+        )
+
+    @staticmethod
+    def _apply_enrichment_data(
+        session: Session,
+        extractor: MatchesDataExtractor,
+        to_enrich: ToEnrich,
+        data: dict[Team, EnrichmentData],
+    ) -> None:
+        extractor.apply_enrichment_data(to_enrich, data)
+        session.commit()
@@ -0,0 +1,154 @@
+import json
+import logging
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime
+from itertools import batched
+from pathlib import Path
+from typing import Any
+
+from models import (
+    Competition,
+    CompetitionTeamLink,
+    CompetitionType,
+    MatchStatistics,
+    MatchStatus,
+    Team,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session
+
+logger = logging.getLogger(__name__)
+
+# Teams written per statement, with their links and matches
+TEAMS_BATCH_SIZE = 100
+
+
+def iter_json_array(path: Path | str, chunk_size: int = 64 * 1024) -> Iterator[Any]:
+    """Yield the objects of a top-level JSON array, reading the file by chunks"""
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as stream:
+        buffer = stream.read(chunk_size).lstrip()
+        if not buffer.startswith("["):
+            raise ValueError(f"[{path}] does not hold a JSON array")
+        buffer = buffer[1:]
+        eof = False
+        while True:
+            buffer = buffer.lstrip().removeprefix(",").lstrip()
+            if buffer.startswith("]"):
+                return
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                # Item cut by the end of the chunk
+                if eof:
+                    raise
+                chunk = stream.read(chunk_size)
+                eof = not chunk
+                buffer += chunk
+                continue
+            yield item
+            buffer = buffer[end:]
+
+
+def upsert_competitions(
+    session: Session, competitions: Iterable[dict[str, Any]]
+) -> dict[str, int]:
+    """Insert or update competitions by ``data_id``, returning their ids"""
+    rows = [
+        {
+            **competition,
+            "type_": CompetitionType(competition["type_"]).value,
+            "start_date": competition.get("start_date")
+            and date.fromisoformat(competition["start_date"]),
+        }
+        for competition in competitions
+    ]
+    if not rows:
+        return {}
+
+    statement = insert(Competition).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=["data_id"],
+        set_={key: statement.excluded[key] for key in rows[0] if key != "data_id"},
+    )
+    return dict(
+        session.execute(
+            statement.returning(Competition.data_id, Competition.id)  # type: ignore
+        ).all()
+    )
+
+
+def upsert_teams(
+    session: Session, teams: list[dict[str, Any]], competition_ids: dict[str, int]
+) -> int:
+    """Insert or update teams by ``data_id`` with their links and matches.
+
+    Matches are upserted on ``(team_id, data_id)``, only their schedule is updated
+    so statistics already enriched are kept. Returns the number of matches.
+    """
+    team_rows = [
+        {key: value for key, value in team.items() if key not in ("leagues", "matchs")}
+        for team in teams
+    ]
+    statement = insert(Team).values(team_rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=["data_id"],
+        set_={key: statement.excluded[key] for key in team_rows[0] if key != "data_id"},
+    )
+    team_ids: dict[int, int] = dict(
+        session.execute(statement.returning(Team.data_id, Team.id)).all()  # type: ignore
+    )
+
+    links = [
+        {"team_id": team_ids[team["data_id"]], "competition_id": competition_ids[code]}
+        for team in teams
+        for code in team["leagues"]
+    ]
+    if links:
+        session.execute(insert(CompetitionTeamLink).on_conflict_do_nothing(), links)
+
+    matches = [
+        {
+            "team_id": team_ids[team["data_id"]],
+            "data_id": match["data_id"],
+            "livescore_id": match["livescore_id"],
+            "transfermarkt_id": match["transfermarkt_id"],
+            "date": datetime.fromisoformat(match["date"]),
+            "status": MatchStatus.NO_DATA,
+        }
+        for team in teams
+        for match in team["matchs"]
+    ]
+    if matches:
+        statement = insert(MatchStatistics)
+        session.execute(
+            statement.on_conflict_do_update(
+                index_elements=["team_id", "data_id"],
+                set_={
+                    key: statement.excluded[key]
+                    for key in ("livescore_id", "transfermarkt_id", "date")
+                },
+            ),
+            matches,
+        )
+    return len(matches)
+
+
+def ingest_initial_data(
+    session: Session, leagues_path: Path | str, teams_path: Path | str
+) -> tuple[int, int, int]:
+    """Stream the initial data files into the database, by batches of teams.
+
+    Only one batch of teams is held in memory, running it again updates the rows
+    in place. Returns the number of competitions, teams and matches written.
+    """
+    competition_ids = upsert_competitions(session, iter_json_array(leagues_path))
+    logger.info(f"Upserted [{len(competition_ids)}] leagues.")
+
+    nb_teams = nb_matches = 0
+    for teams in batched(iter_json_array(teams_path), TEAMS_BATCH_SIZE):
+        nb_matches += upsert_teams(session, list(teams), competition_ids)
+        nb_teams += len(teams)
+        logger.info(f"Upserted [{nb_teams}] teams and [{nb_matches}] matches.")
+
+    return len(competition_ids), nb_teams, nb_matches
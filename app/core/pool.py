@@ -0,0 +1,105 @@
+import time
+from threading import Lock
+from typing import Any
+
+from sqlalchemy import Engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool, QueuePool
+
+
+class PoolMetrics:
+    """Checkouts of an engine connection pool, their latency and the full pool waits
+
+    Connections and checkins are counted by pool listeners, checkout latency is timed
+    around ``Pool.connect`` by the pool class built with ``metered_pool``. A checkout
+    waits when all the connections the pool may open are already in use.
+    """
+
+    def __init__(self):
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.connections = 0
+        self.invalidations = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.checkout_time = 0.0
+        self.max_checkout_time = 0.0
+        self._lock = Lock()
+
+    def listen(self, engine: Engine) -> None:
+        """Install the listeners, kept on the pools the engine recreates"""
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, *args: Any) -> None:
+        with self._lock:
+            self.connections += 1
+
+    def _on_checkout(self, *args: Any) -> None:
+        with self._lock:
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def _on_checkin(self, *args: Any) -> None:
+        with self._lock:
+            self.in_use -= 1
+
+    def _on_invalidate(self, *args: Any) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def record_checkout(self, duration: float, waited: bool, timed_out: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.waits += waited
+            self.timeouts += timed_out
+            self.checkout_time += duration
+            self.max_checkout_time = max(self.max_checkout_time, duration)
+
+    def snapshot(self, pool: Pool) -> dict[str, int | float]:
+        with self._lock:
+            checkouts = self.checkouts
+            statistics: dict[str, int | float] = {
+                "checkouts": checkouts,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "connections": self.connections,
+                "invalidations": self.invalidations,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "checkout_ms_avg": (
+                    round(self.checkout_time / checkouts * 1000, 3)
+                    if checkouts
+                    else 0.0
+                ),
+                "checkout_ms_max": round(self.max_checkout_time * 1000, 3),
+            }
+        if isinstance(pool, QueuePool):
+            statistics |= {
+                "size": pool.size(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+            }
+        return statistics
+
+
+def metered_pool(pool_class: type[QueuePool], metrics: PoolMetrics) -> type[QueuePool]:
+    """Subclass of a queue pool timing its checkouts into ``metrics``"""
+
+    class MeteredPool(pool_class):  # type: ignore
+        def connect(self):
+            # A negative overflow limit lets the pool open connections without bound
+            full = 0 <= self._max_overflow <= self.checkedout() - self.size()
+            start = time.perf_counter()
+            try:
+                connection = super().connect()
+            except PoolTimeoutError:
+                metrics.record_checkout(time.perf_counter() - start, full, True)
+                raise
+            metrics.record_checkout(time.perf_counter() - start, full, False)
+            return connection
+
+    return MeteredPool
@@ -0,0 +1,84 @@
+import json
+from datetime import datetime
+
+import numpy as np
+from libs.tracing import span
+from models import PredictionMatrix, PredictionMatrixRecord, Team
+from models.predictions import PercentageMatrix
+from predictor import GlobalStatistics, Predictor
+from predictor.engine import outcome_percentages, poisson_score_matrix
+from sqlmodel import Session
+
+from core.predictions import DataVersion
+
+
+def matrix_version(versions: dict[int, DataVersion]) -> str:
+    """Data versions of all the teams, changing with any of them"""
+    return json.dumps(sorted(versions.items()))
+
+
+def load_prediction_matrix(
+    session: Session, competition_id: int, version: str
+) -> PredictionMatrix | None:
+    """Stored matrix of the competition, when computed from the same team data"""
+    record = session.get(PredictionMatrixRecord, competition_id)
+    if record is None or record.data_version != version:
+        return None
+    return PredictionMatrix.model_validate(record.matrix)
+
+
+def save_prediction_matrix(
+    session: Session, matrix: PredictionMatrix, version: str
+) -> None:
+    record = session.get(
+        PredictionMatrixRecord, matrix.competition_id
+    ) or PredictionMatrixRecord(
+        competition_id=matrix.competition_id,
+        data_version=version,
+        matrix={},
+        updated_at=matrix.updated_at,
+    )
+    record.data_version = version
+    record.matrix = matrix.model_dump(mode="json")
+    record.updated_at = matrix.updated_at
+    session.add(record)
+
+
+def _percentage_matrix(values: np.ndarray, defined: np.ndarray) -> PercentageMatrix:
+    return [
+        [
+            int(value) if is_defined else None
+            for value, is_defined in zip(*row, strict=True)
+        ]
+        for row in zip(values.tolist(), defined.tolist(), strict=True)
+    ]
+
+
+def build_prediction_matrix(
+    competition_id: int,
+    teams: list[Team],
+    statistics: dict[Team, GlobalStatistics],
+    partial: bool = False,
+) -> PredictionMatrix:
+    """Exact analytic predictions of every ordered pair of teams, all computed
+    together over the grid of their xG"""
+    home_xg, away_xg = Predictor.xg_grid([statistics[team] for team in teams])
+    # A team does not play itself, and Poisson goals need a positive xG
+    with np.errstate(invalid="ignore"):
+        defined = (home_xg >= 0) & (away_xg >= 0) & ~np.eye(len(teams), dtype=bool)
+    home_xg, away_xg = np.where(defined, home_xg, 0), np.where(defined, away_xg, 0)
+
+    with span("simulation"):
+        percentages = outcome_percentages(
+            poisson_score_matrix(home_xg, away_xg, Predictor.MAX_GOALS)
+        )
+    return PredictionMatrix(
+        competition_id=competition_id,
+        teams=[team.id for team in teams],  # type: ignore
+        **{
+            outcome: _percentage_matrix(values, defined)
+            for outcome, values in percentages.items()
+        },
+        status="PARTIAL" if partial else "COMPLETE",
+        updated_at=datetime.now(),
+    )
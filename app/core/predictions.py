@@ -0,0 +1,63 @@
+import secrets
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+from typing import Any
+
+from models import MatchStatistics, PredictionIN
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from core.cache import LRUCache
+from core.config import settings
+
+# Played matches count and highest match id of a team
+DataVersion = tuple[int, int | None]
+PredictionKey = tuple[int, int, str, int | None, float, DataVersion, DataVersion]
+
+prediction_cache: LRUCache[PredictionKey, dict[str, Any]] = LRUCache(
+    maxsize=settings.PREDICTION_CACHE_SIZE, ttl=settings.PREDICTION_CACHE_TTL
+)
+
+
+def teams_data_version(
+    session: Session, team_ids: Iterable[int], now: datetime
+) -> dict[int, DataVersion]:
+    """Stamp changing whenever a team has a new played match to take into account"""
+    team_ids = set(team_ids)
+    rows = session.exec(
+        select(
+            MatchStatistics.team_id,
+            func.count(MatchStatistics.id),  # type: ignore
+            func.max(MatchStatistics.id),
+        )
+        .where(
+            MatchStatistics.team_id.in_(team_ids),  # type: ignore
+            MatchStatistics.date < (now - timedelta(days=1)),
+        )
+        .group_by(MatchStatistics.team_id)  # type: ignore
+    ).all()
+
+    versions: dict[int, DataVersion] = dict.fromkeys(team_ids, (0, None))
+    versions.update({team_id: (count, max_id) for team_id, count, max_id in rows})  # type: ignore
+    return versions
+
+
+def prediction_key(
+    match: PredictionIN, versions: dict[int, DataVersion]
+) -> PredictionKey:
+    return (
+        match.home_team,
+        match.away_team,
+        match.mode,
+        match.seed,
+        match.tolerance,
+        versions[match.home_team],
+        versions[match.away_team],
+    )
+
+
+def simulation_seed(match: PredictionIN) -> int | None:
+    """Seed of the Monte Carlo draws of a match, drawn when not requested"""
+    if match.mode == "analytic":
+        return None
+    return match.seed if match.seed is not None else secrets.randbits(32)
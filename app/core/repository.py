@@ -0,0 +1,194 @@
+"""Purpose-built queries, loading up front the relationships their callers use.
+
+Each function runs a fixed number of statements whatever the number of teams, the
+lazy relationships of the returned instances are not meant to be touched.
+"""
+
+from collections import defaultdict
+from collections.abc import Collection
+from datetime import date, datetime, time
+
+import pandas as pd
+from libs.tracing import span
+from models import Competition, CompetitionTeamLink, MatchStatistics, MatchStatus, Team
+from predictor.aggregates import AGGREGATION_COLUMNS
+from sqlalchemy import Select
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, select
+
+# Matches completed by the enrichment, the ones aggregated in teams statistics
+ENRICHED_STATUSES = (MatchStatus.FINISHED, MatchStatus.NOT_STARTED)
+
+
+def teams_with_competitions(
+    session: Session, team_ids: Collection[int] | None = None
+) -> list[Team]:
+    """Teams, all of them without ids, with their competitions"""
+    statement = select(Team).options(selectinload(Team._competitions))  # type: ignore
+    if team_ids is not None:
+        statement = statement.where(Team.id.in_(team_ids))  # type: ignore
+    statement = statement.order_by(Team.id)  # type: ignore
+    return list(session.exec(statement))
+
+
+def competition_teams(session: Session, competition_id: int) -> list[Team]:
+    """Teams of a competition, with all their competitions"""
+    statement = (
+        select(Team)
+        .join(CompetitionTeamLink)
+        .where(CompetitionTeamLink.competition_id == competition_id)
+        .options(selectinload(Team._competitions))  # type: ignore
+        .order_by(Team.id)  # type: ignore
+    )
+    return list(session.exec(statement))
+
+
+def season_window(competition: Competition) -> tuple[datetime, datetime]:
+    """Dates of the season of a competition, a year from its start"""
+    start = datetime.combine(competition.start_date, time())
+    if (start.month, start.day) == (2, 29):
+        # No 29th of February the next year
+        return start, start.replace(year=start.year + 1, day=28)
+    return start, start.replace(year=start.year + 1)
+
+
+def _filter_matches(
+    statement: Select,
+    team_ids: Collection[int],
+    before: datetime | None,
+    since: datetime | None,
+    statuses: Collection[MatchStatus] | None,
+    competition: Competition | None,
+) -> Select:
+    if competition is not None and competition.start_date is not None:
+        season_start, season_end = season_window(competition)
+        since = max(since, season_start) if since is not None else season_start
+        before = min(before, season_end) if before is not None else season_end
+
+    statement = statement.where(MatchStatistics.team_id.in_(team_ids))  # type: ignore
+    if before is not None:
+        statement = statement.where(MatchStatistics.date < before)  # type: ignore
+    if since is not None:
+        statement = statement.where(MatchStatistics.date >= since)  # type: ignore
+    if statuses is not None:
+        statement = statement.where(MatchStatistics.status.in_(statuses))  # type: ignore
+    return statement.order_by(MatchStatistics.team_id, MatchStatistics.date)  # type: ignore
+
+
+def teams_matches(
+    session: Session,
+    team_ids: Collection[int],
+    before: datetime | None = None,
+    since: datetime | None = None,
+    statuses: Collection[MatchStatus] | None = None,
+    competition: Competition | None = None,
+) -> dict[int, list[MatchStatistics]]:
+    """Matches of each team played in ``[since, before)`` with one of the statuses.
+
+    Matches do not reference their competition, ``competition`` restricts them to its
+    season. Filters are pushed to the database and rows come in the order of the
+    ``(team_id, date)`` index.
+    """
+    statement = _filter_matches(
+        select(MatchStatistics), team_ids, before, since, statuses, competition
+    )
+    matches: dict[int, list[MatchStatistics]] = defaultdict(list)
+    for match in session.exec(statement):  # type: ignore
+        matches[match.team_id].append(match)  # type: ignore
+    return {team_id: matches[team_id] for team_id in team_ids}
+
+
+def teams_match_frames(
+    session: Session,
+    team_ids: Collection[int],
+    before: datetime | None = None,
+    since: datetime | None = None,
+    statuses: Collection[MatchStatus] | None = None,
+    competition: Competition | None = None,
+) -> dict[int, pd.DataFrame]:
+    """Aggregation columns of the matches of each team, filtered as ``teams_matches``.
+
+    Only the columns aggregated are selected and rows go straight into a DataFrame,
+    without building ``MatchStatistics`` instances, side and result as their values.
+    """
+    columns = [getattr(MatchStatistics, column) for column in AGGREGATION_COLUMNS]
+    statement = _filter_matches(
+        select(MatchStatistics.team_id, *columns),  # type: ignore
+        team_ids,
+        before,
+        since,
+        statuses,
+        competition,
+    )
+    result = session.execute(statement)
+    with span("frames"):
+        frame = pd.DataFrame.from_records(
+            result.tuples().all(), columns=list(result.keys())
+        )
+        frames = dict(tuple(frame.groupby("team_id", sort=False)))
+    empty = frame.iloc[:0]
+    return {team_id: frames.get(team_id, empty) for team_id in team_ids}
+
+
+def competition_season_matches(
+    session: Session, competition: Competition, team_ids: Collection[int]
+) -> pd.DataFrame:
+    """Schedule and score of the season matches of the teams of a competition.
+
+    Matches do not reference their competition, those between two of its teams are
+    the ones sharing their ``data_id``, one row per team. They are only the fixtures
+    of the competition when its teams share no other one, see
+    ``core.season.shared_competitions``.
+    """
+    columns = ("team_id", "data_id", "status", "side", "goal_for", "goal_against")
+    statement = _filter_matches(
+        select(*(getattr(MatchStatistics, column) for column in columns)),
+        team_ids,
+        None,
+        None,
+        None,
+        competition,
+    )
+    result = session.execute(statement)
+    return pd.DataFrame.from_records(result.tuples().all(), columns=list(result.keys()))
+
+
+def team_matches(
+    session: Session,
+    team_id: int,
+    before: datetime | None = None,
+    since: datetime | None = None,
+    statuses: Collection[MatchStatus] | None = None,
+    competition: Competition | None = None,
+) -> list[MatchStatistics]:
+    return teams_matches(session, [team_id], before, since, statuses, competition)[
+        team_id
+    ]
+
+
+def teams_with_pending_matches(
+    session: Session,
+    before: datetime,
+    team_ids: Collection[int] | None = None,
+    competitions_since: date | None = None,
+) -> set[int]:
+    """Ids of the teams with matches played before a date still to be enriched.
+
+    ``competitions_since`` keeps the teams of competitions started since that date.
+    """
+    statement = select(MatchStatistics.team_id).where(
+        MatchStatistics.status == MatchStatus.NO_DATA,
+        MatchStatistics.date < before,
+    )
+    if team_ids is not None:
+        statement = statement.where(MatchStatistics.team_id.in_(team_ids))  # type: ignore
+    if competitions_since is not None:
+        statement = (
+            statement.join(
+                CompetitionTeamLink,
+                CompetitionTeamLink.team_id == MatchStatistics.team_id,  # type: ignore
+            )
+            .join(Competition)
+            .where(Competition.start_date >= competitions_since)  # type: ignore
+        )
+    return set(session.exec(statement.distinct()).all())  # type: ignore
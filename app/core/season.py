@@ -0,0 +1,150 @@
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+from models import (
+    MatchSide,
+    MatchStatus,
+    SeasonSimulation,
+    Team,
+    TeamSeasonOutcome,
+)
+from predictor import GlobalStatistics, Predictor, SeasonTable
+from predictor.season import DRAW_POINTS, WIN_POINTS
+
+
+def shared_competitions(competition_id: int, teams: list[Team]) -> list[int]:
+    """Other competitions played by at least two of the teams of a competition.
+
+    Matches do not reference their competition, those between two teams sharing
+    another competition cannot be told apart from the fixtures of this one.
+    """
+    teams_by_competition = Counter(
+        competition.id
+        for team in teams
+        for competition in team._competitions
+        if competition.id != competition_id
+    )
+    return sorted(
+        competition  # type: ignore
+        for competition, count in teams_by_competition.items()
+        if count > 1
+    )
+
+
+def _paired_matches(teams: list[Team], matches: pd.DataFrame) -> pd.DataFrame:
+    """Matches between two of the teams, each row with the index of its team and of
+    the opponent"""
+    index = pd.Series(range(len(teams)), index=[team.id for team in teams])
+    matches = matches[matches["data_id"].notna()]
+    matches = matches[matches.groupby("data_id")["team_id"].transform("size") == 2]
+    # Both rows of a match, the opponent of a team is the team of the other one
+    opponents = (
+        matches.groupby("data_id")["team_id"].transform("sum") - matches["team_id"]
+    )
+    return matches.assign(
+        team=index[matches["team_id"]].to_numpy(),
+        opponent=index[opponents].to_numpy(),
+    )
+
+
+def _table(n_teams: int, played: pd.DataFrame) -> tuple[np.ndarray, ...]:
+    """Points, goal difference and goals scored of each team after the matches"""
+    teams = np.concatenate([played["team"], played["opponent"]]).astype(np.int64)
+    goals_for = np.concatenate([played["goal_for"], played["goal_against"]]).astype(
+        float
+    )
+    goals_against = np.concatenate([played["goal_against"], played["goal_for"]]).astype(
+        float
+    )
+    points = np.where(
+        goals_for > goals_against,
+        WIN_POINTS,
+        (goals_for == goals_against) * DRAW_POINTS,
+    )
+    return tuple(
+        np.bincount(teams, weights=values, minlength=n_teams).astype(np.int64)
+        for values in (points, goals_for - goals_against, goals_for)
+    )
+
+
+def season_table(
+    teams: list[Team],
+    matches: pd.DataFrame,
+    statistics: dict[Team, GlobalStatistics],
+) -> SeasonTable:
+    """Current table of the teams, from the matches they played against each other,
+    and the xG of the ones left to play.
+
+    Future matches are not enriched, so their side is unknown until the enrichment
+    went through them: those are played on neutral ground, with the mean xG of both
+    teams playing at home and away.
+    """
+    paired = _paired_matches(teams, matches)
+    played = paired[
+        (paired["status"] == MatchStatus.FINISHED)
+        & paired["goal_for"].notna()
+        & paired["goal_against"].notna()
+    ].drop_duplicates("data_id")
+    points, goal_difference, goals_for = _table(len(teams), played)
+
+    remaining = paired[~paired["data_id"].isin(played["data_id"])]
+    sided = remaining[remaining["side"].notna()].drop_duplicates("data_id")
+    neutral = (
+        remaining[~remaining["data_id"].isin(sided["data_id"])]
+        .sort_values("team_id")
+        .drop_duplicates("data_id")
+    )
+    at_home = (sided["side"] == MatchSide.HOME).to_numpy()
+    home = np.concatenate(
+        [np.where(at_home, sided["team"], sided["opponent"]), neutral["team"]]
+    ).astype(np.int64)
+    away = np.concatenate(
+        [np.where(at_home, sided["opponent"], sided["team"]), neutral["opponent"]]
+    ).astype(np.int64)
+
+    home_grid, away_grid = Predictor.xg_grid([statistics[team] for team in teams])
+    home_xg, away_xg = home_grid[home, away], away_grid[home, away]
+    is_neutral = np.arange(len(home)) >= len(sided)
+    home_xg = np.where(is_neutral, (home_xg + away_grid[away, home]) / 2, home_xg)
+    away_xg = np.where(is_neutral, (away_xg + home_grid[away, home]) / 2, away_xg)
+    # Poisson goals need a positive xG, teams without a sensible one do not score
+    with np.errstate(invalid="ignore"):
+        home_xg = np.where(home_xg >= 0, home_xg, 0)
+        away_xg = np.where(away_xg >= 0, away_xg, 0)
+
+    return SeasonTable(points, goal_difference, goals_for, home, away, home_xg, away_xg)
+
+
+def season_simulation(
+    competition_id: int,
+    teams: list[Team],
+    table: SeasonTable,
+    positions: np.ndarray,
+    points: np.ndarray,
+    iterations: int,
+    seed: int,
+    partial: bool = False,
+) -> SeasonSimulation:
+    """Outcome of the simulated seasons, ``positions`` and ``points`` as returned by
+    ``simulate_season``"""
+    standings = np.lexsort((-table.goals_for, -table.goal_difference, -table.points))
+    percentages = np.round(positions / iterations * 100, 2)
+    expected_points = np.round(points / iterations, 2)
+    return SeasonSimulation(
+        competition_id=competition_id,
+        iterations=iterations,
+        remaining_matches=table.n_fixtures,
+        teams=[
+            TeamSeasonOutcome(
+                team_id=teams[i].id,  # type: ignore
+                points=table.points[i],
+                goal_difference=table.goal_difference[i],
+                expected_points=expected_points[i],
+                positions=percentages[i].tolist(),
+            )
+            for i in standings
+        ],
+        status="PARTIAL" if partial else "COMPLETE",
+        seed=seed,
+    )
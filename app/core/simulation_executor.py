@@ -0,0 +1,207 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import numpy as np
+from core.config import settings
+from libs.tracing import span
+from predictor import Bracket, Prediction, Predictor, SeasonTable, SimulationMode
+from predictor.bracket import simulate_bracket
+from predictor.engine import (
+    CHUNK_MEMORY,
+    DEFAULT_TOLERANCE,
+    MAX_GOALS,
+    IterationChunk,
+    build_prediction,
+    score_matrices,
+)
+from predictor.season import simulate_season
+
+logger = logging.getLogger(__name__)
+
+
+class SimulationExecutorSaturated(Exception): ...
+
+
+class SimulationExecutor:
+    """Process pool running Monte Carlo simulations outside of the event loop.
+
+    Jobs only carry xG pairs, the number of iterations and the random generators,
+    batches are split in one chunk per process. Generators are sent to the processes
+    as copies, the ones given are left untouched. Once ``max_pending`` jobs are queued
+    new simulations are refused instead of piling up, it must allow a simulation
+    split between every process. ``timeout`` covers a whole simulation, all of its
+    jobs together: past it the jobs not started yet are cancelled, running ones
+    finish in their process but their results are dropped and they stay pending
+    until then. Analytic simulations are cheap enough to run in place.
+
+    Without ``max_workers``, the cores are shared between the API worker processes,
+    within ``max_pending``.
+
+    Seasons and brackets are simulated by chunks of iterations drawing within
+    ``chunk_memory``, one chunk at a time in each process.
+    """
+
+    def __init__(
+        self,
+        max_workers: int | None,
+        max_pending: int,
+        timeout: float,
+        chunk_memory: int = CHUNK_MEMORY,
+    ) -> None:
+        if max_workers is None:
+            cores = (os.cpu_count() or 1) // settings.WEB_CONCURRENCY
+            max_workers = max(1, min(cores, max_pending))
+        elif max_pending < max_workers:
+            raise ValueError(
+                f"[{max_pending}] pending jobs refuse simulations split between "
+                f"[{max_workers}] processes"
+            )
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.chunk_memory = chunk_memory
+        self.pending = 0
+        # Jobs are released by the threads of the executor
+        self._pending_lock = threading.Lock()
+        # Processes are spawned, forking the threads of the application is unsafe
+        self._executor = ProcessPoolExecutor(
+            self.max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    async def score_matrices(
+        self,
+        home_xg: np.ndarray,
+        away_xg: np.ndarray,
+        iterations: int,
+        mode: SimulationMode,
+        rngs: Sequence[np.random.Generator] | None = None,
+        tolerance: float = DEFAULT_TOLERANCE,
+    ) -> np.ndarray:
+        """Score matrices of xG pairs, one per pair on the leading axis.
+
+        Each pair draws from its generator in ``rngs``. Without them every chunk gets
+        an independent stream, spawned from a fresh ``SeedSequence``.
+        """
+        if mode == "analytic":
+            return score_matrices(home_xg, away_xg, iterations, mode)
+
+        chunks = np.array_split(np.arange(len(home_xg)), self.max_workers)
+        chunks = [chunk for chunk in chunks if len(chunk)]
+        chunk_rngs: list[np.random.Generator | list[np.random.Generator]] = (
+            [[rngs[i] for i in chunk] for chunk in chunks]
+            if rngs is not None
+            else [
+                np.random.default_rng(seed)
+                for seed in np.random.SeedSequence().spawn(len(chunks))
+            ]
+        )
+        scores = await self._run(
+            score_matrices,
+            [
+                (
+                    home_xg[chunk],
+                    away_xg[chunk],
+                    iterations,
+                    mode,
+                    MAX_GOALS,
+                    rng,
+                    tolerance,
+                )
+                for chunk, rng in zip(chunks, chunk_rngs, strict=True)
+            ],
+        )
+        return np.concatenate(scores)
+
+    async def simulate_season(
+        self, table: SeasonTable, iterations: int, seed: int | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Same as ``simulate_season`` over all the chunks of ``iterations``, shared
+        between the processes. Results do not depend on the number of processes."""
+        shards = self._shards(table.chunks(iterations, seed, self.chunk_memory))
+        with span("simulation"):
+            results = await self._run(
+                simulate_season, [(table, shard) for shard in shards]
+            )
+        positions, points = zip(*results, strict=True)
+        return np.sum(positions, axis=0), np.sum(points, axis=0)
+
+    async def simulate_bracket(
+        self,
+        bracket: Bracket,
+        iterations: int,
+        seed: int | None = None,
+        budget: float | None = None,
+    ) -> tuple[np.ndarray, int]:
+        """Same as ``simulate_bracket`` over all the chunks of ``iterations``, shared
+        between the processes, each one stopping after ``budget`` seconds. Results
+        only depend on the number of processes when the budget cut them short."""
+        shards = self._shards(bracket.chunks(iterations, seed, self.chunk_memory))
+        with span("simulation"):
+            results = await self._run(
+                simulate_bracket, [(bracket, shard, budget) for shard in shards]
+            )
+        wins, simulated = zip(*results, strict=True)
+        return np.sum(wins, axis=0), sum(simulated)
+
+    def _shards(self, chunks: list[IterationChunk]) -> list[list[IterationChunk]]:
+        """Chunks split between the processes"""
+        return [
+            [chunks[i] for i in shard]
+            for shard in np.array_split(np.arange(len(chunks)), self.max_workers)
+            if len(shard)
+        ]
+
+    async def _run(
+        self, function: Callable[..., np.ndarray | tuple], jobs: list[tuple]
+    ) -> list:
+        """Results of ``function`` called with the arguments of each job, refused
+        when too many jobs are pending"""
+        if self.pending + len(jobs) > self.max_pending:
+            raise SimulationExecutorSaturated(
+                f"[{self.pending}] simulation jobs pending, [{len(jobs)}] refused"
+            )
+
+        with self._pending_lock:
+            self.pending += len(jobs)
+        futures = []
+        for args in jobs:
+            future = self._executor.submit(function, *args)
+            # Once the job is done in its process, not when its result is dropped
+            future.add_done_callback(self._release)
+            futures.append(asyncio.wrap_future(future))
+        return await asyncio.wait_for(asyncio.gather(*futures), self.timeout)
+
+    def _release(self, future: Future) -> None:
+        with self._pending_lock:
+            self.pending -= 1
+
+    async def simulate(
+        self,
+        predictors: list[Predictor],
+        iterations: int = 10000,
+        mode: SimulationMode = "monte_carlo",
+        tolerance: float = DEFAULT_TOLERANCE,
+    ) -> list[Prediction]:
+        """Same as ``Predictor.simulate_batch``, the sampling done by the processes"""
+        if not predictors:
+            return []
+
+        xg = Predictor.batch_simulation_xg(predictors, mode)
+        with span("simulation"):
+            scores = await self.score_matrices(
+                xg[:, 0],
+                xg[:, 1],
+                iterations,
+                mode,
+                [predictor.rng for predictor in predictors],
+                tolerance,
+            )
+        return [build_prediction(match_scores) for match_scores in scores]
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
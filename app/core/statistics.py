@@ -0,0 +1,106 @@
+import logging
+from datetime import datetime
+
+from models import MatchStatistics, Team, TeamStatisticsRecord
+from predictor import GlobalStatistics, RunningGlobalStatistics
+from sqlmodel import Session, select
+
+from core.cache import LRUCache
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+StatisticsKey = tuple[int, int, str]
+
+# Statistics with the update time of the record they were read from. Any process may
+# update a record, entries are only served while the record is unchanged
+team_statistics_cache: LRUCache[StatisticsKey, tuple[datetime, GlobalStatistics]] = (
+    LRUCache(maxsize=settings.TEAM_STATISTICS_CACHE_SIZE)
+)
+
+
+def statistics_key(team: Team, season: int) -> StatisticsKey:
+    competitions_ids = sorted(c.id for c in team._competitions if c.id is not None)
+    competitions = ",".join(str(c_id) for c_id in competitions_ids)
+    return team.id, season, competitions  # type: ignore
+
+
+def _record_filter(key: StatisticsKey) -> tuple:
+    team_id, season, competitions = key
+    return (
+        TeamStatisticsRecord.team_id == team_id,
+        TeamStatisticsRecord.season == season,
+        TeamStatisticsRecord.competitions == competitions,
+    )
+
+
+def _record_query(key: StatisticsKey):
+    return select(TeamStatisticsRecord).where(*_record_filter(key))
+
+
+def load_team_statistics(
+    session: Session, key: StatisticsKey
+) -> GlobalStatistics | None:
+    """Stored statistics of a team, from the cache while the record was not updated
+    since it was read. Only the update time is queried then, not the aggregate"""
+    updated_at = session.exec(
+        select(TeamStatisticsRecord.updated_at).where(*_record_filter(key))
+    ).first()
+    if updated_at is None:
+        return None
+    cached = team_statistics_cache.get(key)
+    if cached is not None and cached[0] == updated_at:
+        return cached[1]
+
+    record = session.exec(_record_query(key)).first()
+    if record is None:
+        return None
+
+    statistics = RunningGlobalStatistics.model_validate(
+        record.statistics
+    ).to_statistics()
+    team_statistics_cache.set(key, (record.updated_at, statistics))
+    return statistics
+
+
+def save_team_statistics(
+    session: Session, key: StatisticsKey, running: RunningGlobalStatistics
+) -> GlobalStatistics:
+    team_id, season, competitions = key
+    now = datetime.now()
+    record = session.exec(_record_query(key)).first() or TeamStatisticsRecord(
+        team_id=team_id, season=season, competitions=competitions, updated_at=now
+    )
+    record.statistics = running.model_dump(mode="json")
+    record.updated_at = now
+    session.add(record)
+
+    statistics = running.to_statistics()
+    # Served again only once this update is committed, or it never matches the record
+    team_statistics_cache.set(key, (now, statistics))
+    return statistics
+
+
+def apply_team_matches(
+    session: Session, team_id: int, matches: list[MatchStatistics]
+) -> None:
+    """Add newly enriched matches to every stored aggregate of a team.
+
+    Records are locked until the transaction ends, the matches applied by another
+    process never overwritten.
+    """
+    records = session.exec(
+        select(TeamStatisticsRecord)
+        .where(TeamStatisticsRecord.team_id == team_id)
+        .with_for_update()
+    ).all()
+    logger.info(
+        f"Apply [{len(matches)}] matches to [{len(records)}] aggregates of team [{team_id}]"
+    )
+    for record in records:
+        running = RunningGlobalStatistics.model_validate(record.statistics)
+        for match in matches:
+            running.add_match(match)
+        save_team_statistics(
+            session, (team_id, record.season, record.competitions), running
+        )
@@ -4,6 +4,9 @@ from typing import Literal
 
 import httpx
 import pandas as pd
+from libs.rate_limiter import TokenBucket
+from libs.response_cache import ResponseCache
+from libs.tracing import span
 
 API_URL = "https://api.football-data.org/v4/"
 LeagueType = Literal[
@@ -21,14 +24,41 @@ logger = logging.getLogger(__name__)
 
 
 class FootballDataApiService:
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        client: httpx.Client,
+        rate_limiter: TokenBucket | None = None,
+        cache: ResponseCache | None = None,
+        season_ttl: float = 12 * 3600,
+    ):
         self._api_key = api_key
+        self._rate_limiter = rate_limiter
+        # Shared by the application, closed along with it
+        self._client = client
+        self._cache = cache
+        self._season_ttl = season_ttl
 
     def _requests(self, uri) -> dict:
-        response = httpx.get(
-            f"{API_URL}/{uri}",
-            headers={"X-Auth-Token": self._api_key},
-        )
+        with span("football_data"):
+            response = self._client.get(
+                f"{API_URL}/{uri}",
+                headers={"X-Auth-Token": self._api_key},
+            )
+        return self._parse_response(response)
+
+    async def _async_requests(self, client: httpx.AsyncClient, uri) -> dict:
+        if self._rate_limiter is not None:
+            await self._rate_limiter.acquire()
+        with span("football_data"):
+            response = await client.get(
+                f"{API_URL}/{uri}",
+                headers={"X-Auth-Token": self._api_key},
+            )
+        return self._parse_response(response)
+
+    @staticmethod
+    def _parse_response(response: httpx.Response) -> dict:
         if response.status_code != 200:
             logger.error(f"Request failed [{response.status_code}] : {response.json()}")
             raise Exception(
@@ -55,14 +85,8 @@ class FootballDataApiService:
             for team in response["teams"]
         ]
 
-    def get_team_matches(
-        self, team_id: int, season: int
-    ) -> tuple[pd.DataFrame, dict[str, str | int]]:
-        logger.info(f"Getting matches for team [{team_id}] for season [{season}]")
-        response = self._requests(
-            f"teams/{team_id}/matches?season={season}&status=FINISHED",
-        )
-
+    @staticmethod
+    def _team_matches(response: dict) -> tuple[pd.DataFrame, dict[str, str | int]]:
         df = pd.DataFrame(pd.json_normalize(response["matches"]))
         df = df.filter(
             [
@@ -80,3 +104,23 @@ class FootballDataApiService:
             axis=1,
         )
         return df, response["resultSet"]
+
+    def _cache_team_matches(self, uri: str, season: int, response: dict) -> None:
+        if self._cache is not None:
+            # Finished matches of a past season are final, the current one still grows
+            finished = season < datetime.now().year - 1
+            self._cache.set(
+                uri, None, response, ttl=None if finished else self._season_ttl
+            )
+
+    async def async_get_team_matches(
+        self, client: httpx.AsyncClient, team_id: int, season: int
+    ) -> tuple[pd.DataFrame, dict[str, str | int]]:
+        logger.info(f"Getting matches for team [{team_id}] for season [{season}]")
+        uri = f"teams/{team_id}/matches?season={season}&status=FINISHED"
+        if self._cache is not None and (cached := self._cache.get(uri)) is not None:
+            return self._team_matches(cached)
+
+        response = await self._async_requests(client, uri)
+        self._cache_team_matches(uri, season, response)
+        return self._team_matches(response)
@@ -0,0 +1,91 @@
+import importlib.util
+import logging
+from threading import Lock
+from typing import Any
+
+import httpx
+
+# HTTP/2 needs the optional h2 package (httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionMetrics:
+    """Count requests sent and connections opened by the clients tracing into it
+
+    Events come from the httpcore trace extension, installed on every request by
+    an event hook. Clients of several threads and event loops can share it.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.connections = 0
+        self._lock = Lock()
+
+    def _record(self, event_name: str) -> None:
+        with self._lock:
+            if event_name == "connection.connect_tcp.complete":
+                self.connections += 1
+            elif event_name.endswith(".send_request_headers.started"):
+                self.requests += 1
+
+    def trace(self, event_name: str, info: dict[str, Any]) -> None:
+        self._record(event_name)
+
+    async def async_trace(self, event_name: str, info: dict[str, Any]) -> None:
+        self._record(event_name)
+
+    def snapshot(self) -> dict[str, int | float]:
+        with self._lock:
+            requests, connections = self.requests, self.connections
+        reused = max(requests - connections, 0)
+        return {
+            "requests": requests,
+            "connections": connections,
+            "reused": reused,
+            "reuse_ratio": round(reused / requests, 4) if requests else 0.0,
+        }
+
+
+def _client_options(
+    timeout: float,
+    connect_timeout: float,
+    max_connections: int,
+    max_keepalive_connections: int,
+    http2: bool,
+) -> dict[str, Any]:
+    if http2 and not HTTP2_AVAILABLE:
+        logger.warning("HTTP/2 requested but h2 is not installed, using HTTP/1.1")
+    return {
+        "timeout": httpx.Timeout(timeout, connect=connect_timeout),
+        "limits": httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        ),
+        "http2": http2 and HTTP2_AVAILABLE,
+    }
+
+
+def create_http_client(metrics: ConnectionMetrics, **options: Any) -> httpx.Client:
+    """Pooled client meant to live as long as the application"""
+
+    def trace_request(request: httpx.Request) -> None:
+        request.extensions["trace"] = metrics.trace
+
+    return httpx.Client(
+        event_hooks={"request": [trace_request]}, **_client_options(**options)
+    )
+
+
+def create_async_http_client(
+    metrics: ConnectionMetrics, **options: Any
+) -> httpx.AsyncClient:
+    """Pooled async client, bound to the event loop it is first used in"""
+
+    async def trace_request(request: httpx.Request) -> None:
+        request.extensions["trace"] = metrics.async_trace
+
+    return httpx.AsyncClient(
+        event_hooks={"request": [trace_request]}, **_client_options(**options)
+    )
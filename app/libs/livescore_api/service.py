@@ -1,30 +1,47 @@
 import logging
 
 import httpx
+from libs.rate_limiter import TokenBucket
+from libs.response_cache import ResponseCache
+from libs.tracing import span
 
 logger = logging.getLogger(__name__)
 
+STATISTICS_URI = "matches/v2/get-statistics"
+
 
 class LiveScoreApiService:
-    def __init__(self, api_key: str, host: str, api_keys_spare: list[str] = None):
+    def __init__(
+        self,
+        api_key: str,
+        host: str,
+        client: httpx.Client,
+        api_keys_spare: list[str] = None,
+        rate_limiter: TokenBucket | None = None,
+        cache: ResponseCache | None = None,
+    ):
         self._api_key = api_key
         self._host = host
-        self._retry_count = 0
         self._api_keys_spare = api_keys_spare
+        self._rate_limiter = rate_limiter
+        # Shared by the application, closed along with it
+        self._client = client
+        self._cache = cache
 
     def _request(
         self,
         uri: str,
         filters: dict[str, str | int] | None = None,
     ):
-        response = httpx.get(
-            f"https://{self._host}/{uri}",
-            headers={
-                "x-rapidapi-key": self._api_key,
-                "x-rapidapi-host": self._host,
-            },
-            params=filters,
-        )
+        with span("livescore"):
+            response = self._client.get(
+                f"https://{self._host}/{uri}",
+                headers={
+                    "x-rapidapi-key": self._api_key,
+                    "x-rapidapi-host": self._host,
+                },
+                params=filters,
+            )
         if response.status_code == 429:
             logger.info("Maximum requests reached, rotating API key.")
             for key in [self._api_key, *self._api_keys_spare]:
@@ -40,22 +57,84 @@ class LiveScoreApiService:
             )
         return response.json()
 
+    def _rotate_api_key(self, exhausted: set[str]) -> bool:
+        """Switch to a key not known to be over quota, False when none is left"""
+        if self._api_key not in exhausted:
+            # Already rotated by a concurrent request
+            return True
+        for key in [self._api_key, *(self._api_keys_spare or [])]:
+            if key not in exhausted:
+                logger.info("Choosing new API key")
+                self._api_key = key
+                return True
+        return False
+
+    async def _async_request(
+        self,
+        client: httpx.AsyncClient,
+        uri: str,
+        filters: dict[str, str | int] | None = None,
+    ):
+        exhausted: set[str] = set()
+        while True:
+            if self._rate_limiter is not None:
+                await self._rate_limiter.acquire()
+            api_key = self._api_key
+            with span("livescore"):
+                response = await client.get(
+                    f"https://{self._host}/{uri}",
+                    headers={
+                        "x-rapidapi-key": api_key,
+                        "x-rapidapi-host": self._host,
+                    },
+                    params=filters,
+                )
+            if response.status_code != 429:
+                break
+
+            logger.info("Maximum requests reached, rotating API key.")
+            exhausted.add(api_key)
+            if not self._rotate_api_key(exhausted):
+                break
+
+        if response.status_code != 200:
+            raise Exception(
+                f"Request failed [{response.status_code}] : {response.json()}"
+            )
+        return response.json()
+
     def get_teams_details(self, team_id: int):
         response = self._request("teams/detail", filters={"ID": str(team_id)})
         return response
 
-    def get_match_statistics(self, match_id: int) -> list[dict[str, int]]:
-        try:
-            response = self._request(
-                "matches/v2/get-statistics",
-                filters={"Eid": f"{match_id}", "Category": "soccer"},
-            )
-            self._retry_count = 0
-            return response["Stat"]
-        except httpx.ReadTimeout:
-            if self._retry_count < 3:
+    def _cached_statistics(self, filters: dict) -> list[dict[str, int]] | None:
+        if self._cache is None:
+            return None
+        cached = self._cache.get(STATISTICS_URI, filters)
+        return None if cached is None else cached["Stat"]
+
+    def _cache_statistics(self, filters: dict, response: dict) -> None:
+        # Statistics are only requested for played matches, once out they never change
+        if self._cache is not None and response.get("Stat"):
+            self._cache.set(STATISTICS_URI, filters, response)
+
+    async def async_get_match_statistics(
+        self, client: httpx.AsyncClient, match_id: int
+    ) -> list[dict[str, int]]:
+        filters: dict[str, str | int] = {"Eid": f"{match_id}", "Category": "soccer"}
+        if (cached := self._cached_statistics(filters)) is not None:
+            return cached
+
+        retry_count = 0
+        while True:
+            try:
+                response = await self._async_request(
+                    client, STATISTICS_URI, filters=filters
+                )
+                self._cache_statistics(filters, response)
+                return response["Stat"]
+            except httpx.ReadTimeout:
+                if retry_count >= 3:
+                    raise Exception("Request timed out 3 times")
                 logger.info("Request timed out, retrying")
-                self._retry_count += 1
-                return self.get_match_statistics(match_id)
-            else:
-                raise Exception("Request timed out 3 times")
+                retry_count += 1
@@ -0,0 +1,35 @@
+import asyncio
+import time
+from threading import Lock
+
+from libs.tracing import span
+
+
+class TokenBucket:
+    """Rate limiter allowing ``rate`` requests per second, with bursts of ``capacity``
+
+    It can be shared by coroutines of several event loops, tokens are reserved
+    under a thread lock and only the wait happens in the loop.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = Lock()
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    async def acquire(self) -> None:
+        if (delay := self._reserve()) > 0:
+            with span("rate_limit"):
+                await asyncio.sleep(delay)
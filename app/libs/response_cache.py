@@ -0,0 +1,86 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCacheMiss(Exception):
+    pass
+
+
+class ResponseCache:
+    """SQLite store of compressed API responses, addressed by endpoint and parameters
+
+    Entries without expiry are kept forever, for responses that can no longer change.
+    In offline mode expired entries are still served and a miss raises instead of
+    letting the request reach the network, so replays are deterministic.
+    """
+
+    def __init__(self, path: Path | str, offline: bool = False):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, endpoint TEXT NOT NULL, body BLOB NOT NULL, "
+                "fetched_at REAL NOT NULL, expires_at REAL)"
+            )
+
+    @staticmethod
+    def key(endpoint: str, params: dict[str, Any] | None = None) -> str:
+        canonical = json.dumps(
+            [endpoint, params or {}], sort_keys=True, separators=(",", ":")
+        )
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def get(self, endpoint: str, params: dict[str, Any] | None = None) -> Any | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT body, expires_at FROM responses WHERE key = ?",
+                (self.key(endpoint, params),),
+            ).fetchone()
+
+        if row is not None and (self.offline or row[1] is None or row[1] > time.time()):
+            self.hits += 1
+            return json.loads(zlib.decompress(row[0]))
+
+        self.misses += 1
+        if self.offline:
+            raise ResponseCacheMiss(f"No cached response for [{endpoint}] {params}")
+        return None
+
+    def set(
+        self,
+        endpoint: str,
+        params: dict[str, Any] | None,
+        body: Any,
+        ttl: float | None = None,
+    ) -> None:
+        """Store a response, for ``ttl`` seconds or forever"""
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (
+                    self.key(endpoint, params),
+                    endpoint,
+                    zlib.compress(json.dumps(body).encode()),
+                    now,
+                    None if ttl is None else now + ttl,
+                ),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
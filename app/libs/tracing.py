@@ -0,0 +1,267 @@
+import cProfile
+import inspect
+import logging
+import os
+import random
+import re
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Upper bounds of the histogram buckets, in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class Histogram:
+    """Durations observed by label values, rendered in the Prometheus text format"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...],
+        buckets: tuple[float, ...] = BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        # Per label values: count of each bucket, then the sum and the total count
+        self._series: dict[tuple[str, ...], tuple[list[int], float, int]] = {}
+        self._lock = Lock()
+
+    def observe(self, duration: float, *label_values: str) -> None:
+        with self._lock:
+            counts, total, count = self._series.get(
+                label_values, ([0] * len(self.buckets), 0.0, 0)
+            )
+            for i, bound in enumerate(self.buckets):
+                if duration <= bound:
+                    counts[i] += 1
+            self._series[label_values] = (counts, total + duration, count + 1)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def _labels(self, label_values: tuple[str, ...], **extra: str) -> str:
+        pairs = [*zip(self.labels, label_values, strict=True), *extra.items()]
+        escaped = (
+            (name, value.replace("\\", "\\\\").replace('"', '\\"'))
+            for name, value in pairs
+        )
+        return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+    def render(self, **constant_labels: str) -> list[str]:
+        """Series in the text format, ``constant_labels`` added to every one"""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = sorted(self._series.items())
+        for label_values, (counts, total, count) in series:
+            for bound, bucket_count in zip(self.buckets, counts, strict=True):
+                labels = self._labels(label_values, **constant_labels, le=f"{bound:g}")
+                lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+            labels = self._labels(label_values, **constant_labels, le="+Inf")
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = self._labels(label_values, **constant_labels)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class RequestTrace:
+    """Time spent in each stage while serving a request.
+
+    Stages running concurrently, like the API calls gathered together, add up to
+    more than the time the request took.
+    """
+
+    def __init__(self):
+        self.stages: dict[str, tuple[float, int]] = {}
+        self._lock = Lock()
+
+    def add(self, stage: str, duration: float) -> None:
+        with self._lock:
+            total, count = self.stages.get(stage, (0.0, 0))
+            self.stages[stage] = (total + duration, count + 1)
+
+    def server_timing(self, total: float) -> str:
+        """``Server-Timing`` header value, durations in milliseconds"""
+        with self._lock:
+            stages = list(self.stages.items())
+        return ", ".join(
+            [
+                f'{stage};dur={duration * 1000:.1f};desc="x{count}"'
+                for stage, (duration, count) in stages
+            ]
+            + [f"total;dur={total * 1000:.1f}"]
+        )
+
+
+stage_duration = Histogram(
+    "stage_duration_seconds",
+    "Time spent in each stage of the requests and of the background work",
+    ("stage",),
+)
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time taken to serve the requests, by route",
+    ("method", "route", "status"),
+)
+
+# Trace of the request being served, copied into the tasks and threads it starts
+_current_trace: ContextVar[RequestTrace | None] = ContextVar(
+    "current_trace", default=None
+)
+
+
+def record(stage: str, duration: float) -> None:
+    stage_duration.observe(duration, stage)
+    if (trace := _current_trace.get()) is not None:
+        trace.add(stage, duration)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time the block as ``stage``, into the histograms and the request trace"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - start)
+
+
+def traced[F: Callable[..., Any]](stage: str) -> Callable[[F], F]:
+    """Decorator timing each call of a function or coroutine function as ``stage``"""
+
+    def decorator(function: F) -> F:
+        if inspect.iscoroutinefunction(function):
+
+            @wraps(function)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with span(stage):
+                    return await function(*args, **kwargs)
+
+            return async_wrapper  # type: ignore
+
+        @wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(stage):
+                return function(*args, **kwargs)
+
+        return wrapper  # type: ignore
+
+    return decorator
+
+
+def render_metrics() -> str:
+    """Histograms of this process, their series labelled by its ``pid``.
+
+    Each worker process only counts what it served: the series of one worker never
+    go backwards, whichever worker answers the scrape.
+    """
+    pid = str(os.getpid())
+    return "\n".join(
+        [*stage_duration.render(pid=pid), *request_duration.render(pid=pid), ""]
+    )
+
+
+class TimingMiddleware:
+    """Trace each HTTP request, answered with a ``Server-Timing`` header.
+
+    Requests are profiled with cProfile at ``profile_sample_rate``, and the profiles
+    of the ones slower than ``profile_threshold`` seconds dumped in ``profile_dir``.
+    The profiler sees everything the event loop runs meanwhile, so only one request
+    is profiled at a time.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        profile_dir: Path | None = None,
+        profile_sample_rate: float = 0,
+        profile_threshold: float = 1,
+    ):
+        self.app = app
+        self.profile_dir = profile_dir
+        self.profile_sample_rate = profile_sample_rate
+        self.profile_threshold = profile_threshold
+        self._profiling = Lock()
+
+    def _start_profiler(self) -> cProfile.Profile | None:
+        if (
+            self.profile_dir is None
+            or random.random() >= self.profile_sample_rate
+            or not self._profiling.acquire(blocking=False)
+        ):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already running in this process
+            self._profiling.release()
+            return None
+        return profiler
+
+    def _stop_profiler(
+        self, profiler: cProfile.Profile, scope: Scope, duration: float
+    ) -> None:
+        profiler.disable()
+        self._profiling.release()
+        if duration < self.profile_threshold or self.profile_dir is None:
+            return
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        path = re.sub(r"[^\w-]+", "_", scope["path"]).strip("_") or "root"
+        destination = self.profile_dir / (
+            f"{datetime.now():%Y%m%d-%H%M%S}-{scope['method']}-{path}"
+            f"-{duration * 1000:.0f}ms.prof"
+        )
+        profiler.dump_stats(destination)
+        logger.info(f"Slow request profile written to [{destination}]")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace()
+        token = _current_trace.set(trace)
+        profiler = self._start_profiler()
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", trace.server_timing(time.perf_counter() - start)
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            duration = time.perf_counter() - start
+            _current_trace.reset(token)
+            if profiler is not None:
+                self._stop_profiler(profiler, scope, duration)
+            # Route templates only, paths would make a series per team id
+            route = getattr(scope.get("route"), "path", "unmatched")
+            request_duration.observe(duration, scope["method"], route, str(status))
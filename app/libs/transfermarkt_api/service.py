@@ -1,24 +1,28 @@
 import httpx
+from libs.tracing import span
 
 
 class TransfermarktApiService:
-    def __init__(self, api_key: str, host: str):
+    def __init__(self, api_key: str, host: str, client: httpx.Client):
         self._api_key = api_key
         self._host = host
+        # Shared by the application, closed along with it
+        self._client = client
 
     def _request(self, uri: str, filters: dict[str, str | int] | None = None):
         params = {"locale": "FR"}
         if filters:
             params.update(filters)
 
-        response = httpx.get(
-            f"https://{self._host}/{uri}",
-            headers={
-                "x-rapidapi-key": self._api_key,
-                "x-rapidapi-host": self._host,
-            },
-            params=params,
-        )
+        with span("transfermarkt"):
+            response = self._client.get(
+                f"https://{self._host}/{uri}",
+                headers={
+                    "x-rapidapi-key": self._api_key,
+                    "x-rapidapi-host": self._host,
+                },
+                params=params,
+            )
         if response.status_code != 200:
             raise Exception(
                 f"Request failed [{response.status_code}] : {response.json()}"
@@ -5,7 +5,17 @@ from logging.config import dictConfig
 import yaml
 from api import main, v1
 from core.config import settings
+from core.db import async_engine
+from core.enrichment import EnrichmentWorker
+from core.simulation_executor import SimulationExecutor
 from fastapi import FastAPI
+from libs.http_client import (
+    ConnectionMetrics,
+    create_async_http_client,
+    create_http_client,
+)
+from libs.response_cache import ResponseCache
+from libs.tracing import TimingMiddleware
 
 
 @asynccontextmanager
@@ -21,8 +31,54 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
         logging_config = yaml.safe_load(stream)
         dictConfig(logging_config)
 
+    # HTTP CLIENTS
+    http_options = {
+        "timeout": settings.HTTP_TIMEOUT,
+        "connect_timeout": settings.HTTP_CONNECT_TIMEOUT,
+        "max_connections": settings.HTTP_MAX_CONNECTIONS,
+        "max_keepalive_connections": settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        "http2": settings.HTTP2_ENABLED,
+    }
+    app.state.http_metrics = ConnectionMetrics()
+    app.state.http_client = create_http_client(app.state.http_metrics, **http_options)
+    app.state.async_http_client = create_async_http_client(
+        app.state.http_metrics, **http_options
+    )
+
+    # EXTERNAL APIS RESPONSES CACHE
+    app.state.response_cache = (
+        ResponseCache(
+            settings.RESPONSE_CACHE_PATH, offline=settings.RESPONSE_CACHE_OFFLINE
+        )
+        if settings.RESPONSE_CACHE_ENABLED
+        else None
+    )
+
+    # SIMULATIONS PROCESS POOL
+    app.state.simulation_executor = SimulationExecutor(
+        max_workers=settings.SIMULATION_WORKERS,
+        max_pending=settings.SIMULATION_MAX_PENDING,
+        timeout=settings.SIMULATION_TIMEOUT,
+        chunk_memory=settings.SIMULATION_CHUNK_MEMORY,
+    )
+
+    # BACKGROUND ENRICHMENT
+    app.state.enrichment_worker = EnrichmentWorker(
+        app, interval=settings.ENRICHMENT_SCAN_INTERVAL
+    )
+    if settings.ENRICHMENT_WORKER_ENABLED:
+        app.state.enrichment_worker.start()
+
     yield
 
+    await app.state.enrichment_worker.stop()
+    app.state.simulation_executor.shutdown()
+    app.state.http_client.close()
+    await app.state.async_http_client.aclose()
+    if app.state.response_cache is not None:
+        app.state.response_cache.close()
+    await async_engine.dispose()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -31,3 +87,9 @@ app = FastAPI(
     version=settings.VERSION,
     lifespan=lifespan,
 )
+app.add_middleware(
+    TimingMiddleware,
+    profile_dir=settings.PROFILE_DIR,
+    profile_sample_rate=settings.PROFILE_SAMPLE_RATE,
+    profile_threshold=settings.PROFILE_THRESHOLD,
+)
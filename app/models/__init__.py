@@ -2,7 +2,17 @@ from sqlmodel import SQLModel
 
 from models.competitions import Competition, CompetitionTeamLink, CompetitionType
 from models.matchs import MatchResult, MatchSide, MatchStatistics, MatchStatus
-from models.predictions import PredictionIN, ResultPredictions
+from models.predictions import (
+    BracketSimulation,
+    BracketSimulationIN,
+    PredictionIN,
+    PredictionMatrix,
+    ResultPredictions,
+    SeasonSimulation,
+    TeamBracketOutcome,
+    TeamSeasonOutcome,
+)
+from models.statistics import PredictionMatrixRecord, TeamStatisticsRecord
 from models.teams import Team, TeamCreate
 
 __all__ = [
@@ -14,8 +24,16 @@ __all__ = [
     "TeamCreate",
     "PredictionIN",
     "ResultPredictions",
+    "PredictionMatrix",
+    "SeasonSimulation",
+    "TeamSeasonOutcome",
+    "BracketSimulationIN",
+    "BracketSimulation",
+    "TeamBracketOutcome",
     "MatchStatistics",
     "MatchStatus",
     "MatchSide",
     "MatchResult",
+    "TeamStatisticsRecord",
+    "PredictionMatrixRecord",
 ]
@@ -1,7 +1,7 @@
 import datetime
 import enum
 
-from sqlalchemy import Column, Enum
+from sqlalchemy import Column, Enum, Index, UniqueConstraint
 from sqlmodel import Field, Relationship, SQLModel
 
 from models.teams import Team
@@ -25,6 +25,15 @@ class MatchResult(enum.IntEnum):
 
 
 class MatchStatistics(SQLModel, table=True):
+    # Upsert target of the ingestion, and matches of a team read by date or status
+    __table_args__ = (
+        UniqueConstraint(
+            "team_id", "data_id", name="uq_matchstatistics_team_id_data_id"
+        ),
+        Index("ix_matchstatistics_team_id_date", "team_id", "date"),
+        Index("ix_matchstatistics_team_id_status", "team_id", "status"),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     team_id: int | None = Field(default=None, foreign_key="team.id", ondelete="CASCADE")
     data_id: int | None
@@ -1,5 +1,9 @@
-from predictor.models import GlobalStatistics, Prediction
-from sqlmodel import SQLModel
+import datetime
+from typing import Literal
+
+from predictor.engine import DEFAULT_TOLERANCE
+from predictor.models import GlobalStatistics, Prediction, SimulationMode
+from sqlmodel import Field, SQLModel
 
 from models.teams import Team
 
@@ -7,6 +11,11 @@ from models.teams import Team
 class PredictionIN(SQLModel):
     home_team: int
     away_team: int
+    mode: SimulationMode = "monte_carlo"
+    # Same seed, same Monte Carlo draws. Drawn at random when not given
+    seed: int | None = Field(default=None, ge=0)
+    # Standard error targeted by the adaptive mode, in percentage points
+    tolerance: float = Field(default=DEFAULT_TOLERANCE, ge=0.05, le=10)
 
 
 class ResultPredictions(SQLModel):
@@ -15,3 +24,82 @@ class ResultPredictions(SQLModel):
     home_stats: GlobalStatistics
     away_stats: GlobalStatistics
     prediction: Prediction
+    # PARTIAL when played matches of a team were still waiting for their statistics
+    status: Literal["COMPLETE", "PARTIAL"] = "COMPLETE"
+    # Seed of the Monte Carlo draws, to simulate the match again identically
+    seed: int | None = None
+
+
+# Percentages of every ordered pair of teams, rows being the home team and columns
+# the away one. None for a team against itself, or without enough statistics
+PercentageMatrix = list[list[int | None]]
+
+
+class PredictionMatrix(SQLModel):
+    competition_id: int
+    # Ids of the teams, in the order of the rows and columns
+    teams: list[int]
+    home_win: PercentageMatrix
+    draw: PercentageMatrix
+    away_win: PercentageMatrix
+    btts: PercentageMatrix
+    over_2_5: PercentageMatrix
+    status: Literal["COMPLETE", "PARTIAL"] = "COMPLETE"
+    updated_at: datetime.datetime
+
+
+class TeamSeasonOutcome(SQLModel):
+    team_id: int
+    # Current table, from the matches already played
+    points: int
+    goal_difference: int
+    expected_points: float
+    # Percentage of the simulated seasons finished at each position, first one first
+    positions: list[float]
+
+
+class SeasonSimulation(SQLModel):
+    competition_id: int
+    iterations: int
+    remaining_matches: int
+    # Teams by their position in the current table
+    teams: list[TeamSeasonOutcome]
+    # PARTIAL when played matches of a team were still waiting for their statistics
+    status: Literal["COMPLETE", "PARTIAL"] = "COMPLETE"
+    # Seed of the simulations, to simulate the season again identically
+    seed: int
+
+
+BracketMode = Literal["monte_carlo", "analytic"]
+
+
+class BracketSimulationIN(SQLModel):
+    # Team ids in the order of the draw, None for a bye. The winners of two
+    # consecutive slots meet in the next round. Teams of the cup by id when not given
+    bracket: list[int | None] | None = Field(default=None, min_length=2)
+    mode: BracketMode = "monte_carlo"
+    iterations: int = Field(default=100_000, ge=1000, le=1_000_000)
+    # Same seed, same Monte Carlo draws. Drawn at random when not given
+    seed: int | None = Field(default=None, ge=0)
+
+
+class TeamBracketOutcome(SQLModel):
+    team_id: int
+    # Percentage of the simulations the team won its match of each round, the last
+    # one being the final
+    rounds: list[float]
+
+
+class BracketSimulation(SQLModel):
+    competition_id: int
+    mode: BracketMode
+    bracket: list[int | None]
+    # Brackets simulated, fewer than requested when they took too long. None when
+    # the probabilities are exact
+    iterations: int | None = None
+    # Teams in the order of the bracket
+    teams: list[TeamBracketOutcome]
+    # PARTIAL when played matches of a team were still waiting for their statistics
+    status: Literal["COMPLETE", "PARTIAL"] = "COMPLETE"
+    # Seed of the Monte Carlo draws, to simulate the bracket again identically
+    seed: int | None = None
@@ -0,0 +1,32 @@
+import datetime
+
+from sqlalchemy import JSON, Column, UniqueConstraint
+from sqlmodel import Field, SQLModel
+
+
+class TeamStatisticsRecord(SQLModel, table=True):
+    """Materialized ``GlobalStatistics`` of a team, see ``core.statistics``"""
+
+    __tablename__ = "team_statistics"
+    __table_args__ = (UniqueConstraint("team_id", "season", "competitions"),)
+
+    id: int | None = Field(default=None, primary_key=True)
+    team_id: int = Field(foreign_key="team.id", ondelete="CASCADE", index=True)
+    season: int
+    competitions: str
+    statistics: dict = Field(sa_column=Column(JSON, nullable=False))
+    updated_at: datetime.datetime
+
+
+class PredictionMatrixRecord(SQLModel, table=True):
+    """Persisted ``PredictionMatrix`` of a competition, see ``core.prediction_matrix``"""
+
+    __tablename__ = "prediction_matrix"
+
+    competition_id: int = Field(
+        foreign_key="competition.id", ondelete="CASCADE", primary_key=True
+    )
+    # Data versions of the teams the matrix was computed from
+    data_version: str
+    matrix: dict = Field(sa_column=Column(JSON, nullable=False))
+    updated_at: datetime.datetime
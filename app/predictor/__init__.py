@@ -1,10 +1,21 @@
-from .models import GlobalStatistics, Prediction, TeamStatistics
+from .aggregates import RunningGlobalStatistics, RunningTeamStatistics
+from .bracket import Bracket
+from .frames import GlobalStatsFrame, TeamStatsFrame
+from .models import GlobalStatistics, Prediction, SimulationMode, TeamStatistics
 from .predictor import Predictor, PredictorError
+from .season import SeasonTable
 
 __all__ = [
     "Predictor",
     "PredictorError",
     "GlobalStatistics",
     "Prediction",
+    "SimulationMode",
     "TeamStatistics",
+    "GlobalStatsFrame",
+    "TeamStatsFrame",
+    "RunningGlobalStatistics",
+    "RunningTeamStatistics",
+    "SeasonTable",
+    "Bracket",
 ]
@@ -0,0 +1,170 @@
+import math
+from collections.abc import Iterable
+
+import pandas as pd
+from models.matchs import MatchResult, MatchSide, MatchStatistics
+from sqlmodel import Field, SQLModel
+
+from predictor.models import GlobalStatistics, TeamStatistics
+
+# TeamStatistics sums and the MatchStatistics column they are made of
+SUMMED_FIELDS = {
+    "goals_for": "goal_for",
+    "goals_against": "goal_against",
+    "fouls": "fouls",
+    "shots": "shots",
+    "shots_off_goal": "shots_off_goal",
+    "shots_on_goal": "shots_on_goal",
+}
+RESULT_FIELDS = {
+    MatchResult.WIN: "wins",
+    MatchResult.DRAW: "draws",
+    MatchResult.LOSE: "losses",
+}
+# MatchStatistics columns needed to aggregate matches, side and result as their values
+AGGREGATION_COLUMNS = (
+    "side",
+    "result",
+    *SUMMED_FIELDS.values(),
+    "possession",
+    "livescore_xg",
+)
+
+
+class RunningTeamStatistics(SQLModel):
+    """Sums and counts behind ``TeamStatistics``, updated one match at a time"""
+
+    matches_played: int = 0
+    wins: int = 0
+    draws: int = 0
+    losses: int = 0
+    goals_for: int = 0
+    goals_against: int = 0
+    fouls: int = 0
+    shots: int = 0
+    shots_off_goal: int = 0
+    shots_on_goal: int = 0
+    possession_sum: float = 0
+    possession_count: int = 0
+    external_xg_sum: float = 0
+    external_xg_count: int = 0
+
+    def _apply(self, match: MatchStatistics, sign: int) -> None:
+        self.matches_played += sign
+        if match.result is not None:
+            result = RESULT_FIELDS[MatchResult(match.result)]
+            setattr(self, result, getattr(self, result) + sign)
+
+        for field, column in SUMMED_FIELDS.items():
+            if (value := getattr(match, column)) is not None:
+                setattr(self, field, getattr(self, field) + sign * int(value))
+
+        # Means are kept as sum / count, missing values being skipped
+        if match.possession is not None:
+            self.possession_sum += sign * float(match.possession)
+            self.possession_count += sign
+        if match.livescore_xg is not None:
+            self.external_xg_sum += sign * float(match.livescore_xg)
+            self.external_xg_count += sign
+
+    @classmethod
+    def from_frame(cls, matches: pd.DataFrame) -> "RunningTeamStatistics":
+        """Aggregate matches of ``AGGREGATION_COLUMNS`` at once, missing values skipped"""
+        return cls(
+            matches_played=len(matches),
+            **{
+                field: int((matches["result"] == result.value).sum())
+                for result, field in RESULT_FIELDS.items()
+            },
+            **{
+                field: int(matches[column].sum())
+                for field, column in SUMMED_FIELDS.items()
+            },
+            possession_sum=float(matches["possession"].sum()),
+            possession_count=int(matches["possession"].count()),
+            external_xg_sum=float(matches["livescore_xg"].sum()),
+            external_xg_count=int(matches["livescore_xg"].count()),
+        )
+
+    def add_match(self, match: MatchStatistics) -> None:
+        self._apply(match, 1)
+
+    def remove_match(self, match: MatchStatistics) -> None:
+        self._apply(match, -1)
+
+    def to_statistics(self) -> TeamStatistics:
+        return TeamStatistics(
+            matches_played=self.matches_played,
+            wins=self.wins,
+            draws=self.draws,
+            losses=self.losses,
+            goals_for=self.goals_for,
+            goals_against=self.goals_against,
+            fouls=self.fouls,
+            shots=self.shots,
+            shots_off_goal=self.shots_off_goal,
+            shots_on_goal=self.shots_on_goal,
+            possession=(
+                self.possession_sum / self.possession_count / 100
+                if self.possession_count
+                else math.nan
+            ),
+            external_xg=(
+                self.external_xg_sum / self.external_xg_count
+                if self.external_xg_count
+                else None
+            ),
+        )
+
+
+class RunningGlobalStatistics(SQLModel):
+    """Home and away running aggregates of a team"""
+
+    home_statistics: RunningTeamStatistics = Field(
+        default_factory=RunningTeamStatistics
+    )
+    away_statistics: RunningTeamStatistics = Field(
+        default_factory=RunningTeamStatistics
+    )
+
+    @classmethod
+    def from_matches(
+        cls, matches: Iterable[MatchStatistics]
+    ) -> "RunningGlobalStatistics":
+        statistics = cls()
+        for match in matches:
+            statistics.add_match(match)
+        return statistics
+
+    @classmethod
+    def from_frame(cls, matches: pd.DataFrame) -> "RunningGlobalStatistics":
+        return cls(
+            home_statistics=RunningTeamStatistics.from_frame(
+                matches[matches["side"] == MatchSide.HOME.value]
+            ),
+            away_statistics=RunningTeamStatistics.from_frame(
+                matches[matches["side"] == MatchSide.AWAY.value]
+            ),
+        )
+
+    def _side(self, match: MatchStatistics) -> RunningTeamStatistics | None:
+        if match.side == MatchSide.HOME:
+            return self.home_statistics
+        if match.side == MatchSide.AWAY:
+            return self.away_statistics
+        # Matches never enriched have no side, like the DataFrame filters ignore them
+        return None
+
+    def add_match(self, match: MatchStatistics) -> None:
+        if (side := self._side(match)) is not None:
+            side.add_match(match)
+
+    def remove_match(self, match: MatchStatistics) -> None:
+        if (side := self._side(match)) is not None:
+            side.remove_match(match)
+
+    def to_statistics(self) -> GlobalStatistics:
+        return GlobalStatistics(
+            home_statistics=self.home_statistics.to_statistics(),
+            away_statistics=self.away_statistics.to_statistics(),
+        )
@@ -0,0 +1,146 @@
+import time
+from collections.abc import Sequence
+
+import numpy as np
+
+from predictor.engine import CHUNK_MEMORY, IterationChunk, iteration_chunks
+
+# Extra time is a third of a match, and penalty shootouts a coin toss
+EXTRA_TIME_SHARE = 1 / 3
+PENALTY_WIN = 0.5
+# Goals counted for the probability of a draw, the ones above are negligible
+KNOCKOUT_MAX_GOALS = 15
+
+
+def _outcomes(team_xg: np.ndarray, opponent_xg: np.ndarray) -> tuple[np.ndarray, ...]:
+    """Probabilities of a win and of a draw for independent Poisson goals"""
+    goals = np.arange(KNOCKOUT_MAX_GOALS + 1)
+    factorials = np.cumprod(np.maximum(goals, 1))
+
+    def poisson(xg: np.ndarray) -> np.ndarray:
+        return np.exp(-xg[..., None]) * xg[..., None] ** goals / factorials
+
+    team, opponent = poisson(team_xg), poisson(opponent_xg)
+    # Probability of the opponent scoring less than each number of goals
+    below = np.cumsum(opponent, axis=-1) - opponent
+    return (team * below).sum(axis=-1), (team * opponent).sum(axis=-1)
+
+
+def advance_probabilities(home_xg: np.ndarray, away_xg: np.ndarray) -> np.ndarray:
+    """Probability for the team of each row to get through a knockout match against
+    the one of each column, from the ``Predictor.xg_grid`` of the teams.
+
+    Matches are played on neutral ground, with the mean xG of both teams playing at
+    home and away. Draws go to extra time, then to penalties.
+    """
+    team_xg = (home_xg + away_xg.T) / 2
+    opponent_xg = (away_xg + home_xg.T) / 2
+    # Poisson goals need a positive xG, teams without a sensible one do not score
+    with np.errstate(invalid="ignore"):
+        team_xg = np.where(team_xg >= 0, team_xg, 0)
+        opponent_xg = np.where(opponent_xg >= 0, opponent_xg, 0)
+
+    win, draw = _outcomes(team_xg, opponent_xg)
+    extra_win, extra_draw = _outcomes(
+        team_xg * EXTRA_TIME_SHARE, opponent_xg * EXTRA_TIME_SHARE
+    )
+    return win + draw * (extra_win + extra_draw * PENALTY_WIN)
+
+
+class Bracket:
+    """Knockout draw, the winners of two consecutive slots meeting in the next round.
+
+    ``advance`` gives the probability for the team of each slot to get through a
+    match against the team of each other slot. A team drawn against an empty slot, a
+    bye, goes through without playing.
+    """
+
+    def __init__(self, teams: Sequence[int | None], advance: np.ndarray):
+        self.n_slots = len(teams)
+        self.n_rounds = self.n_slots.bit_length() - 1
+        if self.n_slots < 2 or self.n_slots != 2**self.n_rounds:
+            raise ValueError(f"[{self.n_slots}] slots is not a power of 2")
+
+        byes = np.array([team is None for team in teams])
+        indexes = np.array([0 if team is None else team for team in teams])
+        self.advance = advance[indexes[:, None], indexes[None, :]]
+        self.advance[:, byes] = 1
+        self.advance[byes, :] = 0
+        # Both slots empty, the bye of the first one goes through
+        both = np.outer(byes, byes)
+        self.advance[both] = np.triu(np.ones(self.advance.shape), 1)[both]
+
+    def chunk_size(self, memory: int = CHUNK_MEMORY) -> int:
+        """Brackets simulated together within ``memory``, about 32 bytes per slot"""
+        return max(1, memory // (32 * self.n_slots))
+
+    def chunks(
+        self,
+        iterations: int,
+        seed: int | None = None,
+        memory: int = CHUNK_MEMORY,
+    ) -> list[IterationChunk]:
+        """``iteration_chunks`` of brackets fitting in ``memory``"""
+        return iteration_chunks(iterations, self.chunk_size(memory), seed)
+
+    def probabilities(self) -> np.ndarray:
+        """Exact probability for the team of each slot to win its match of each
+        round, indexed by ``[slot, round]``"""
+        reach = np.ones(self.n_slots)
+        wins = np.zeros((self.n_slots, self.n_rounds))
+        for round_ in range(self.n_rounds):
+            # Slots by match of the round, the ones of each side of the match
+            slots = np.arange(self.n_slots).reshape(-1, 2, 2**round_)
+            first, second = slots[:, 0], slots[:, 1]
+            first_wins = self.advance[first[:, :, None], second[:, None, :]]
+            second_wins = self.advance[second[:, :, None], first[:, None, :]]
+            reach = np.stack(
+                [
+                    reach[first] * (first_wins @ reach[second][..., None])[..., 0],
+                    reach[second] * (second_wins @ reach[first][..., None])[..., 0],
+                ],
+                axis=1,
+            ).ravel()
+            wins[:, round_] = reach
+        return wins
+
+
+def simulate_bracket_chunk(
+    bracket: Bracket, iterations: int, rng: np.random.Generator
+) -> np.ndarray:
+    """Play the bracket ``iterations`` times at once, the matches of a round all
+    resolved together. Returns how many times the team of each slot won its match
+    of each round, indexed by ``[slot, round]``."""
+    wins = np.zeros((bracket.n_slots, bracket.n_rounds), dtype=np.int64)
+    # Single precision is plenty to compare probabilities, and halves the traffic
+    advance = bracket.advance.astype(np.float32)
+    # Slot of the team still in at each place of the bracket
+    remaining = np.broadcast_to(
+        np.arange(bracket.n_slots, dtype=np.int32), (iterations, bracket.n_slots)
+    )
+    for round_ in range(bracket.n_rounds):
+        first, second = remaining[:, 0::2], remaining[:, 1::2]
+        first_wins = rng.random(first.shape, dtype=np.float32) < advance[first, second]
+        remaining = np.where(first_wins, first, second)
+        wins[:, round_] = np.bincount(remaining.ravel(), minlength=bracket.n_slots)
+    return wins
+
+
+def simulate_bracket(
+    bracket: Bracket, chunks: Sequence[IterationChunk], budget: float | None = None
+) -> tuple[np.ndarray, int]:
+    """Sum of ``simulate_bracket_chunk`` over the chunks, each one drawing from its
+    seed, with the number of iterations simulated.
+
+    Past ``budget`` seconds the remaining chunks are left out, at least one is
+    simulated. Only takes plain values so it can run as a job of another process.
+    """
+    start = time.perf_counter()
+    wins = np.zeros((bracket.n_slots, bracket.n_rounds), dtype=np.int64)
+    simulated = 0
+    for iterations, seed in chunks:
+        if simulated and budget is not None and time.perf_counter() - start > budget:
+            break
+        wins += simulate_bracket_chunk(bracket, iterations, np.random.default_rng(seed))
+        simulated += iterations
+    return wins, simulated
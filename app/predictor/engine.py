@@ -0,0 +1,279 @@
+from collections.abc import Sequence
+from functools import cache
+
+import numpy as np
+
+from predictor.models import ExactScore, Prediction, SimulationMode, ThresholdGoal
+
+MAX_GOALS = 5
+THRESHOLDS = (0.5, 1.5, 2.5, 3.5)
+# Adaptive simulations draw scores by chunks until their standard error, in
+# percentage points, is within the tolerance
+DEFAULT_TOLERANCE = 0.5
+ADAPTIVE_CHUNK_SIZE = 1000
+ADAPTIVE_MAX_ITERATIONS = 1_000_000
+# Memory given to the draws of a chunk of simulated seasons or brackets
+CHUNK_MEMORY = 64 * 2**20
+
+# Iterations simulated together, and the seed of their draws
+IterationChunk = tuple[int, np.random.SeedSequence]
+
+
+def simulate_scores(
+    home_xg: float | np.ndarray,
+    away_xg: float | np.ndarray,
+    iterations: int,
+    max_goals: int = MAX_GOALS,
+    rng: np.random.Generator | None = None,
+) -> np.ndarray:
+    """Draw all scores at once from ``rng`` and return their histogram.
+
+    The result is a (max_goals + 1)² matrix of counts indexed by
+    ``[home_goals, away_goals]``, goals above ``max_goals`` being capped.
+    Array inputs are simulated together, giving one matrix per xG pair on
+    the leading axes. Without generator a freshly seeded one is used.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    home_xg, away_xg = np.broadcast_arrays(
+        np.asarray(home_xg, dtype=float), np.asarray(away_xg, dtype=float)
+    )
+    shape = home_xg.shape
+    size = max_goals + 1
+
+    home_goals = np.minimum(
+        rng.poisson(home_xg[..., None], shape + (iterations,)), max_goals
+    )
+    away_goals = np.minimum(
+        rng.poisson(away_xg[..., None], shape + (iterations,)), max_goals
+    )
+    # Offset each pair so a single bincount builds every histogram
+    offsets = np.arange(home_xg.size).reshape(shape + (1,)) * size**2
+
+    return np.bincount(
+        (offsets + home_goals * size + away_goals).ravel(),
+        minlength=home_xg.size * size**2,
+    ).reshape(shape + (size, size))
+
+
+def iteration_chunks(
+    iterations: int, size: int, seed: int | None = None
+) -> list[IterationChunk]:
+    """Iterations split in chunks of at most ``size``, each one drawing from its own
+    stream.
+
+    Streams are spawned from ``seed``, the same seed gives the same draws whatever
+    the chunks are simulated by.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(-(-iterations // size))
+    return [
+        (min(size, iterations - i * size), chunk_seed)
+        for i, chunk_seed in enumerate(seeds)
+    ]
+
+
+@cache
+def _tracked_events(size: int) -> np.ndarray:
+    """Masks of the score matrix for the 1X2 outcomes and each threshold overs"""
+    home_goals, away_goals = np.indices((size, size))
+    total_goals = home_goals + away_goals
+    return np.array(
+        [home_goals > away_goals, home_goals == away_goals, home_goals < away_goals]
+        + [
+            goals > threshold
+            for goals in (total_goals, home_goals, away_goals)
+            for threshold in THRESHOLDS
+        ]
+    )
+
+
+def standard_error(scores: np.ndarray) -> np.ndarray:
+    """Largest standard error of the 1X2 and thresholds percentages of score counts
+
+    ``below`` being the complement of ``over``, they share the same error.
+    """
+    iterations = scores.sum(axis=(-2, -1))[..., None]
+    events = _tracked_events(scores.shape[-1])
+    probabilities = (scores[..., None, :, :] * events).sum(axis=(-2, -1)) / iterations
+    errors = np.sqrt(probabilities * (1 - probabilities) / iterations)
+    return errors.max(axis=-1) * 100
+
+
+def simulate_scores_adaptive(
+    home_xg: float,
+    away_xg: float,
+    tolerance: float = DEFAULT_TOLERANCE,
+    max_goals: int = MAX_GOALS,
+    rng: np.random.Generator | None = None,
+    max_iterations: int = ADAPTIVE_MAX_ITERATIONS,
+) -> np.ndarray:
+    """Draw scores by chunks until ``standard_error`` is within ``tolerance``
+
+    Each chunk is sized from the error reached so far, a looser tolerance draws fewer
+    scores and a tighter one more, never more than ``max_iterations``.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    scores = simulate_scores(home_xg, away_xg, ADAPTIVE_CHUNK_SIZE, max_goals, rng)
+    while (iterations := int(scores.sum())) < max_iterations and (
+        error := float(standard_error(scores))
+    ) > tolerance:
+        # The error falls as 1 / sqrt(n): draw what the current estimate still needs
+        needed = int(iterations * (error / tolerance) ** 2) - iterations
+        scores += simulate_scores(
+            home_xg,
+            away_xg,
+            min(max(needed, ADAPTIVE_CHUNK_SIZE), max_iterations - iterations),
+            max_goals,
+            rng,
+        )
+    return scores
+
+
+def _capped_poisson(xg: float | np.ndarray, max_goals: int) -> np.ndarray:
+    """Poisson probabilities of 0..max_goals goals, the tail folded on max_goals"""
+    goals = np.arange(max_goals)
+    factorials = np.cumprod(np.maximum(goals, 1))
+    xg = np.asarray(xg, dtype=float)[..., None]
+
+    probabilities = np.exp(-xg) * xg**goals / factorials
+    tail = np.clip(1 - probabilities.sum(axis=-1, keepdims=True), 0, None)
+    return np.concatenate([probabilities, tail], axis=-1)
+
+
+def poisson_score_matrix(
+    home_xg: float | np.ndarray,
+    away_xg: float | np.ndarray,
+    max_goals: int = MAX_GOALS,
+) -> np.ndarray:
+    """Exact probability of every score for independent capped Poisson goals.
+
+    Like ``simulate_scores`` the matrix is indexed by ``[home_goals, away_goals]``,
+    array inputs give one matrix per xG pair on the leading axes.
+    """
+    home = _capped_poisson(home_xg, max_goals)
+    away = _capped_poisson(away_xg, max_goals)
+    return home[..., :, None] * away[..., None, :]
+
+
+def score_matrices(
+    home_xg: float | np.ndarray,
+    away_xg: float | np.ndarray,
+    iterations: int,
+    mode: SimulationMode,
+    max_goals: int = MAX_GOALS,
+    rng: np.random.Generator | Sequence[np.random.Generator] | None = None,
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> np.ndarray:
+    """Score matrices of xG pairs, sampled or exact depending on ``mode``.
+
+    ``iterations`` is ignored by the ``analytic`` and ``adaptive`` modes, the latter
+    sampling each pair until ``tolerance``. With a sequence of generators each pair
+    of a 1-d batch draws from its own stream, its scores do not depend on the pairs
+    simulated with it. Only takes plain values so it can run as a job of another
+    process.
+    """
+    if mode == "analytic":
+        return poisson_score_matrix(home_xg, away_xg, max_goals)
+    if mode == "monte_carlo" and (rng is None or isinstance(rng, np.random.Generator)):
+        return simulate_scores(home_xg, away_xg, iterations, max_goals, rng)
+
+    home_xg, away_xg = np.broadcast_arrays(
+        np.asarray(home_xg, dtype=float), np.asarray(away_xg, dtype=float)
+    )
+    if rng is None or isinstance(rng, np.random.Generator):
+        # Pairs drawn one after the other from the same stream
+        rng = [rng if rng is not None else np.random.default_rng()] * home_xg.size
+
+    def pair_scores(
+        pair_home_xg: float, pair_away_xg: float, pair_rng: np.random.Generator
+    ) -> np.ndarray:
+        if mode == "adaptive":
+            return simulate_scores_adaptive(
+                pair_home_xg, pair_away_xg, tolerance, max_goals, pair_rng
+            )
+        return simulate_scores(
+            pair_home_xg, pair_away_xg, iterations, max_goals, pair_rng
+        )
+
+    return np.stack(
+        [
+            pair_scores(pair_home_xg, pair_away_xg, pair_rng)
+            for pair_home_xg, pair_away_xg, pair_rng in zip(
+                home_xg.ravel(), away_xg.ravel(), rng, strict=True
+            )
+        ]
+    ).reshape(home_xg.shape + (max_goals + 1, max_goals + 1))
+
+
+def _percentage(part: float, total: float) -> int:
+    return round((float(part) / float(total)) * 100)
+
+
+def _threshold_goals(distribution: np.ndarray, total: float) -> list[ThresholdGoal]:
+    goals = np.arange(distribution.shape[0])
+    return [
+        ThresholdGoal(
+            threshold=threshold,
+            below=_percentage(distribution[goals < threshold].sum(), total),
+            over=_percentage(distribution[goals > threshold].sum(), total),
+        )
+        for threshold in THRESHOLDS
+    ]
+
+
+def outcome_percentages(scores: np.ndarray) -> dict[str, np.ndarray]:
+    """1X2, both teams to score and over 2.5 goals percentages of score matrices on
+    the trailing axes, for any number of leading axes"""
+    home_goals, away_goals = np.indices(scores.shape[-2:])
+    total = scores.sum(axis=(-2, -1))
+
+    def percentage(event: np.ndarray) -> np.ndarray:
+        with np.errstate(invalid="ignore"):
+            return np.rint(scores[..., event].sum(axis=-1) / total * 100)
+
+    return {
+        "home_win": percentage(home_goals > away_goals),
+        "draw": percentage(home_goals == away_goals),
+        "away_win": percentage(home_goals < away_goals),
+        "btts": percentage((home_goals > 0) & (away_goals > 0)),
+        "over_2_5": percentage(home_goals + away_goals > 2.5),
+    }
+
+
+def build_prediction(scores: np.ndarray) -> Prediction:
+    """Reduce a score matrix (counts or probabilities) to a ``Prediction``"""
+    sampled = np.issubdtype(scores.dtype, np.integer)
+    total = scores.sum()
+    size = scores.shape[0]
+
+    total_goals = np.add.outer(np.arange(size), np.arange(size))
+    total_distribution = np.bincount(
+        total_goals.ravel(), weights=scores.ravel(), minlength=2 * size - 1
+    )
+
+    # Keep the 3 most likely scores, ties resolved in score order
+    flat_scores = scores.ravel()
+    most_common = [
+        index
+        for index in np.argsort(-flat_scores, kind="stable")[:3]
+        if flat_scores[index] > 0
+    ]
+    nb_score = flat_scores[most_common].sum()
+
+    return Prediction(
+        home_win=_percentage(np.tril(scores, -1).sum(), total),
+        draw=_percentage(np.trace(scores), total),
+        away_win=_percentage(np.triu(scores, 1).sum(), total),
+        btts=_percentage(scores[1:, 1:].sum(), total),
+        global_threshold_goals=_threshold_goals(total_distribution, total),
+        home_threshold_goals=_threshold_goals(scores.sum(axis=1), total),
+        away_threshold_goals=_threshold_goals(scores.sum(axis=0), total),
+        exact_score=[
+            ExactScore(
+                score=f"{index // size}-{index % size}",
+                probability=_percentage(flat_scores[index], nb_score),
+            )
+            for index in most_common
+        ],
+        iterations=int(total) if sampled else None,
+        standard_error=(round(float(standard_error(scores)), 3) if sampled else None),
+    )
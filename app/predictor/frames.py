@@ -0,0 +1,225 @@
+from collections.abc import Callable, Sequence
+from functools import cached_property
+
+import numpy as np
+
+from predictor.models import GlobalStatistics, TeamStatistics
+
+# TeamStatistics fields given for each team, the other metrics derive from them
+STATISTICS_FIELDS = (
+    "matches_played",
+    "wins",
+    "draws",
+    "losses",
+    "goals_for",
+    "goals_against",
+    "fouls",
+    "shots",
+    "shots_off_goal",
+    "shots_on_goal",
+    "possession",
+    "external_xg",
+)
+SUMMED_FIELDS = STATISTICS_FIELDS[:-1]
+# Scaled values this close to a rounding boundary, or too large for their ulp to be
+# below it, are rounded from the exact value: NumPy and the math module exponentials
+# and logarithms may differ by an ulp
+ROUNDING_MARGIN = 1e-6
+
+
+def round_as_python(
+    values: np.ndarray, digits: int, exact: Callable[[int], float]
+) -> np.ndarray:
+    """Round each value as ``round`` would, ``exact`` giving the value at an index
+    when it is too close to a rounding boundary to trust the vectorized one"""
+    with np.errstate(invalid="ignore", over="ignore"):
+        rounded = np.round(values, digits)
+        scaled = values * 10**digits
+        ambiguous = np.isfinite(scaled) & (
+            (np.abs(scaled - np.floor(scaled) - 0.5) < ROUNDING_MARGIN)
+            | (np.abs(scaled) * np.finfo(float).eps >= ROUNDING_MARGIN)
+        )
+    for i in np.flatnonzero(ambiguous):
+        rounded[i] = round(exact(i), digits)
+    return rounded
+
+
+class TeamStatsFrame:
+    """Statistics of several teams as columns, each ``TeamStatistics`` metric
+    computed for all of them at once.
+
+    Metrics are the same as the per team properties, to the last bit. Teams the
+    properties fail on, like the ones without matches, get NaN or infinities.
+    """
+
+    def __init__(
+        self,
+        matches_played: np.ndarray,
+        wins: np.ndarray,
+        draws: np.ndarray,
+        losses: np.ndarray,
+        goals_for: np.ndarray,
+        goals_against: np.ndarray,
+        fouls: np.ndarray,
+        shots: np.ndarray,
+        shots_off_goal: np.ndarray,
+        shots_on_goal: np.ndarray,
+        possession: np.ndarray,
+        external_xg: np.ndarray | None = None,
+    ):
+        self.matches_played = np.asarray(matches_played, dtype=float)
+        self.wins = np.asarray(wins, dtype=float)
+        self.draws = np.asarray(draws, dtype=float)
+        self.losses = np.asarray(losses, dtype=float)
+        self.goals_for = np.asarray(goals_for, dtype=float)
+        self.goals_against = np.asarray(goals_against, dtype=float)
+        self.fouls = np.asarray(fouls, dtype=float)
+        self.shots = np.asarray(shots, dtype=float)
+        self.shots_off_goal = np.asarray(shots_off_goal, dtype=float)
+        self.shots_on_goal = np.asarray(shots_on_goal, dtype=float)
+        self.possession = np.asarray(possession, dtype=float)
+        # NaN for the teams without any external xG
+        self.external_xg = (
+            np.full_like(self.matches_played, np.nan)
+            if external_xg is None
+            else np.asarray(external_xg, dtype=float)
+        )
+
+    @classmethod
+    def from_statistics(cls, statistics: Sequence[TeamStatistics]) -> "TeamStatsFrame":
+        return cls(
+            **{
+                field: np.array(
+                    [
+                        np.nan if (value := getattr(team, field)) is None else value
+                        for team in statistics
+                    ],
+                    dtype=float,
+                )
+                for field in STATISTICS_FIELDS
+            }
+        )
+
+    def __len__(self) -> int:
+        return len(self.matches_played)
+
+    def team(self, i: int) -> TeamStatistics:
+        return TeamStatistics(
+            **{field: getattr(self, field)[i].item() for field in SUMMED_FIELDS},
+            external_xg=(
+                None if np.isnan(self.external_xg[i]) else self.external_xg[i].item()
+            ),
+        )
+
+    @cached_property
+    def goal_per_match(self) -> np.ndarray:
+        return _divide(self.goals_for, self.matches_played)
+
+    @cached_property
+    def shot_per_match(self) -> np.ndarray:
+        return _divide(self.shots, self.matches_played)
+
+    @cached_property
+    def shots_on_goal_per_match(self) -> np.ndarray:
+        return _divide(self.shots_on_goal, self.matches_played)
+
+    @cached_property
+    def shots_on_goal_for_goal(self) -> np.ndarray:
+        return _divide(self.shots_on_goal, self.goals_for)
+
+    @cached_property
+    def shot_accuracy(self) -> np.ndarray:
+        return _divide(self.shots_on_goal, self.shots)
+
+    @cached_property
+    def shot_quality(self) -> np.ndarray:
+        return _divide(self.goals_for, self.shots_on_goal)
+
+    @cached_property
+    def attack_efficiency_ratio(self) -> np.ndarray:
+        return (self.goals_for * self.goal_per_match) / 100
+
+    @cached_property
+    def probability_of_goal_per_shot(self) -> np.ndarray:
+        return (
+            _divide(
+                self.shot_per_match * self.shot_quality,
+                self.shots_on_goal_for_goal * self.shot_accuracy,
+            )
+            / 100
+        )
+
+    @cached_property
+    def unrounded_xg(self) -> np.ndarray:
+        xg_per_shot = _divide(
+            self.shots_on_goal * self.probability_of_goal_per_shot,
+            self.matches_played,
+        )
+
+        possession_weight = 1 + (self.possession - 0.5)
+        shot_accuracy_weight = 1 + (self.shot_accuracy - 0.3)
+
+        probability_of_multiple_goal = (
+            (self.shots_on_goal_per_match * self.shots_on_goal_for_goal)
+            * (self.goal_per_match - 1)
+            / 100
+        )
+
+        with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+            xg = np.exp2(
+                xg_per_shot * shot_accuracy_weight
+                + self.attack_efficiency_ratio * possession_weight
+            ) * (1 + probability_of_multiple_goal)
+            log_xg = np.log(xg)
+            # Without external xG, blended with 1.3 goals instead
+            external_xg = np.where(np.isnan(self.external_xg), 1.3, self.external_xg)
+            return (xg * (1 - log_xg)) + (external_xg * log_xg)
+
+    @cached_property
+    def xg(self) -> np.ndarray:
+        return round_as_python(
+            self.unrounded_xg, 2, lambda i: self.team(i).unrounded_xg
+        )
+
+
+class GlobalStatsFrame:
+    """Home and away statistics of several teams, ``GlobalStatistics`` as columns"""
+
+    def __init__(
+        self, home_statistics: TeamStatsFrame, away_statistics: TeamStatsFrame
+    ):
+        self.home_statistics = home_statistics
+        self.away_statistics = away_statistics
+
+    @classmethod
+    def from_statistics(
+        cls, statistics: Sequence[GlobalStatistics]
+    ) -> "GlobalStatsFrame":
+        return cls(
+            TeamStatsFrame.from_statistics(
+                [team.home_statistics for team in statistics]
+            ),
+            TeamStatsFrame.from_statistics(
+                [team.away_statistics for team in statistics]
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self.home_statistics)
+
+    def __getattr__(self, field: str) -> np.ndarray:
+        """Sums of the home and away statistics, like ``GlobalStatistics`` fields"""
+        if field not in SUMMED_FIELDS:
+            raise AttributeError(field)
+        return getattr(self.home_statistics, field) + getattr(
+            self.away_statistics, field
+        )
+
+    @cached_property
+    def xg(self) -> np.ndarray:
+        return (self.home_statistics.xg + self.away_statistics.xg) / 2
+
+
+def _divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return numerator / denominator
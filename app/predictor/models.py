@@ -1,5 +1,6 @@
 import math
 from functools import cached_property
+from typing import Literal
 
 from pydantic import computed_field
 from sqlmodel import SQLModel
@@ -62,9 +63,8 @@ class TeamStatistics(SQLModel):
             / (self.shots_on_goal_for_goal * self.shot_accuracy)
         ) / 100
 
-    @computed_field  # type: ignore[prop-decorator]
     @cached_property
-    def xg(self) -> float:
+    def unrounded_xg(self) -> float:
         xg_per_shot = (
             self.shots_on_goal * self.probability_of_goal_per_shot
         ) / self.matches_played
@@ -87,7 +87,12 @@ class TeamStatistics(SQLModel):
             xg = (xg * (1 - math.log(xg))) + (self.external_xg * math.log(xg))
         else:
             xg = (xg * (1 - math.log(xg))) + (1.3 * math.log(xg))
-        return round(xg, 2)
+        return xg
+
+    @computed_field  # type: ignore[prop-decorator]
+    @cached_property
+    def xg(self) -> float:
+        return round(self.unrounded_xg, 2)
 
 
 class GlobalStatistics(SQLModel):
@@ -155,6 +160,9 @@ class GlobalStatistics(SQLModel):
         return (self.home_statistics.xg + self.away_statistics.xg) / 2
 
 
+SimulationMode = Literal["monte_carlo", "analytic", "adaptive"]
+
+
 class ThresholdGoal(SQLModel):
     threshold: float
     below: int
@@ -175,3 +183,7 @@ class Prediction(SQLModel):
     home_threshold_goals: list[ThresholdGoal] = []
     away_threshold_goals: list[ThresholdGoal] = []
     exact_score: list[ExactScore] = []
+    # Scores drawn and largest standard error of the 1X2 and thresholds percentages,
+    # in percentage points. None for the exact analytic predictions
+    iterations: int | None = None
+    standard_error: float | None = None
@@ -1,17 +1,24 @@
 import logging
-from collections import Counter
+from collections.abc import Sequence
 
 import numpy as np
 import pandas as pd
+from libs.tracing import span, traced
 from models.matchs import MatchResult, MatchSide
 from models.teams import Team
 
+from predictor.engine import (
+    DEFAULT_TOLERANCE,
+    MAX_GOALS,
+    build_prediction,
+    score_matrices,
+)
+from predictor.frames import GlobalStatsFrame
 from predictor.models import (
-    ExactScore,
     GlobalStatistics,
     Prediction,
+    SimulationMode,
     TeamStatistics,
-    ThresholdGoal,
 )
 
 logger = logging.getLogger(__name__)
@@ -21,13 +28,20 @@ class PredictorError(Exception): ...
 
 
 class Predictor:
-    MAX_GOALS = 5
+    MAX_GOALS = MAX_GOALS
     home_stats: GlobalStatistics
     away_stats: GlobalStatistics
 
-    def __init__(self, home_team: Team, away_team: Team):
+    def __init__(
+        self,
+        home_team: Team,
+        away_team: Team,
+        rng: np.random.Generator | None = None,
+    ):
         self.home = home_team
         self.away = away_team
+        # Stream of the Monte Carlo draws, seed it for reproducible simulations
+        self.rng = rng if rng is not None else np.random.default_rng()
 
         common_competitions = set(home_team._competitions) & set(
             away_team._competitions
@@ -53,6 +67,7 @@ class Predictor:
         )
 
     @staticmethod
+    @traced("aggregation")
     def _transform_data(matches_df: pd.DataFrame) -> GlobalStatistics:
         home_matches = matches_df[matches_df["side"] == MatchSide.HOME.value]
         away_matches = matches_df[matches_df["side"] == MatchSide.AWAY.value]
@@ -66,6 +81,8 @@ class Predictor:
     def enhance_team_statistics(
         self, home_matches: pd.DataFrame, away_matches: pd.DataFrame
     ):
+        """Aggregate the matches of both teams, frames of ``AGGREGATION_COLUMNS`` as
+        loaded by ``core.repository.teams_match_frames``"""
         logger.info(f"Aggregating team matches statistics for [{self.home.short_name}]")
         self.home_stats = self._transform_data(home_matches)
         logger.info(f"Aggregating team matches statistics for [{self.away.short_name}]")
@@ -87,8 +104,8 @@ class Predictor:
         ) * (0.9 - advantage)
         return home_xg, away_xg
 
-    def simulate(self, iterations: int = 10000) -> Prediction:
-        """Use Monte Carlo simulation with poisson probability calculation"""
+    @traced("xg")
+    def simulation_xg(self, mode: SimulationMode) -> tuple[float, float]:
         if self.home_stats is None or self.away_stats is None:
             raise PredictorError(
                 "Team statistics not aggregated yet, please run enhance_team_statistics"
@@ -96,104 +113,121 @@ class Predictor:
 
         home_xg, away_xg = self._adjust_xg()
         logging.info(
-            f"Simulating for {self.home.short_name}({home_xg}) vs {self.away.short_name}({away_xg})"
+            f"Simulating [{mode}] for {self.home.short_name}({home_xg}) vs {self.away.short_name}({away_xg})"
+        )
+        return home_xg, away_xg
+
+    @staticmethod
+    def _frame_xg(
+        frame: GlobalStatsFrame, home: np.ndarray, away: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """``_adjust_xg`` of the teams at the ``home`` indexes of the frame against
+        the ones at the ``away`` indexes, broadcast together"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            win_rate = frame.wins / frame.matches_played
+            advantage = (
+                (win_rate[home] - win_rate[away])
+                / (win_rate[home] + win_rate[away])
+                * 0.5
+            )
+            home_xg = (frame.xg[home] * 0.2 + frame.home_statistics.xg[home] * 0.8) * (
+                1 + advantage
+            )
+            away_xg = (frame.xg[away] * 0.2 + frame.away_statistics.xg[away] * 0.8) * (
+                0.9 - advantage
+            )
+        return home_xg, away_xg
+
+    @classmethod
+    @traced("xg")
+    def xg_grid(
+        cls, statistics: Sequence[GlobalStatistics]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Home and away xG of every ordered pair of teams, rows being the home team.
+
+        Pairs the statistics of a team cannot give an xG for are NaN.
+        """
+        teams = np.arange(len(statistics))
+        return cls._frame_xg(
+            GlobalStatsFrame.from_statistics(statistics),
+            teams[:, None],
+            teams[None, :],
         )
-        home_win = 0
-        draw = 0
-        away_win = 0
-        btts = 0
-        exact_scores = []
-        goals = {
-            0.5: {
-                "global": {"below": 0, "over": 0},
-                "home": {"below": 0, "over": 0},
-                "away": {"below": 0, "over": 0},
-            },
-            1.5: {
-                "global": {"below": 0, "over": 0},
-                "home": {"below": 0, "over": 0},
-                "away": {"below": 0, "over": 0},
-            },
-            2.5: {
-                "global": {"below": 0, "over": 0},
-                "home": {"below": 0, "over": 0},
-                "away": {"below": 0, "over": 0},
-            },
-            3.5: {
-                "global": {"below": 0, "over": 0},
-                "home": {"below": 0, "over": 0},
-                "away": {"below": 0, "over": 0},
-            },
-        }
-        for _ in range(iterations):
-            home_goals = min(np.random.poisson(home_xg), self.MAX_GOALS)
-            away_goals = min(np.random.poisson(away_xg), self.MAX_GOALS)
-
-            # Track Wins probability
-            if home_goals > away_goals:
-                home_win += 1
-            elif home_goals == away_goals:
-                draw += 1
-            else:
-                away_win += 1
-
-            # Track goals BTTS probability
-            btts += 1 if home_goals > 0 and away_goals > 0 else 0
-
-            for threshold in goals.keys():
-                goals[threshold]["global"]["below"] += (
-                    1 if home_goals + away_goals < threshold else 0
-                )
-                goals[threshold]["global"]["over"] += (
-                    1 if home_goals + away_goals > threshold else 0
-                )
-                goals[threshold]["home"]["below"] += 1 if home_goals < threshold else 0
-                goals[threshold]["home"]["over"] += 1 if home_goals > threshold else 0
-                goals[threshold]["away"]["below"] += 1 if away_goals < threshold else 0
-                goals[threshold]["away"]["over"] += 1 if away_goals > threshold else 0
-
-            # Track exact score
-            exact_scores.append((home_goals, away_goals))
-
-        most_commonn_score = Counter(exact_scores).most_common()[:3]
-        nb_score = sum(count for _, count in most_commonn_score)
-
-        return Prediction(
-            home_win=round((home_win / iterations) * 100),
-            draw=round((draw / iterations) * 100),
-            away_win=round((away_win / iterations) * 100),
-            btts=round((btts / iterations) * 100),
-            global_threshold_goals=[
-                ThresholdGoal(
-                    threshold=threshold,
-                    below=round(
-                        (goals[threshold]["global"]["below"] / iterations) * 100
-                    ),
-                    over=round((goals[threshold]["global"]["over"] / iterations) * 100),
-                )
-                for threshold in goals.keys()
-            ],
-            home_threshold_goals=[
-                ThresholdGoal(
-                    threshold=threshold,
-                    below=round((goals[threshold]["home"]["below"] / iterations) * 100),
-                    over=round((goals[threshold]["home"]["over"] / iterations) * 100),
-                )
-                for threshold in goals.keys()
-            ],
-            away_threshold_goals=[
-                ThresholdGoal(
-                    threshold=threshold,
-                    below=round((goals[threshold]["away"]["below"] / iterations) * 100),
-                    over=round((goals[threshold]["away"]["over"] / iterations) * 100),
-                )
-                for threshold in goals.keys()
-            ],
-            exact_score=[
-                ExactScore(
-                    score=f"{score[0]}-{score[1]}",
-                    probability=round((count / nb_score) * 100),
-                )
-                for score, count in most_commonn_score
-            ],
+
+    @classmethod
+    @traced("xg")
+    def batch_simulation_xg(
+        cls, predictors: list["Predictor"], mode: SimulationMode
+    ) -> np.ndarray:
+        """``simulation_xg`` of each predictor as a row, computed for all at once"""
+        if any(p.home_stats is None or p.away_stats is None for p in predictors):
+            raise PredictorError(
+                "Team statistics not aggregated yet, please run enhance_team_statistics"
+            )
+
+        frame = GlobalStatsFrame.from_statistics(
+            [p.home_stats for p in predictors] + [p.away_stats for p in predictors]
         )
+        matches = np.arange(len(predictors))
+        xg = np.column_stack(cls._frame_xg(frame, matches, matches + len(predictors)))
+
+        # Statistics the per match computation fails on raise the same errors
+        for i in np.flatnonzero(~np.isfinite(xg).all(axis=1)):
+            xg[i] = predictors[i].simulation_xg(mode)
+        logging.info(f"Simulating [{mode}] for [{len(predictors)}] matches")
+        return xg
+
+    def simulate(
+        self,
+        iterations: int = 10000,
+        mode: SimulationMode = "monte_carlo",
+        tolerance: float = DEFAULT_TOLERANCE,
+    ) -> Prediction:
+        """Use vectorized Monte Carlo simulation with poisson probability calculation
+
+        With the ``analytic`` mode the exact score probabilities are computed
+        instead of sampled, so ``iterations`` is ignored. The ``adaptive`` mode
+        samples until the standard error of the percentages is within ``tolerance``
+        percentage points instead.
+        """
+        home_xg, away_xg = self.simulation_xg(mode)
+        with span("simulation"):
+            scores = score_matrices(
+                home_xg,
+                away_xg,
+                iterations,
+                mode,
+                self.MAX_GOALS,
+                self.rng,
+                tolerance,
+            )
+        return build_prediction(scores)
+
+    @classmethod
+    def simulate_batch(
+        cls,
+        predictors: list["Predictor"],
+        iterations: int = 10000,
+        mode: SimulationMode = "monte_carlo",
+        tolerance: float = DEFAULT_TOLERANCE,
+    ) -> list[Prediction]:
+        """Simulate several matches together, each one from its own generator
+
+        Predictions are returned in the same order as ``predictors``, the same as
+        simulating each predictor alone.
+        """
+        if not predictors:
+            return []
+
+        xg = cls.batch_simulation_xg(predictors, mode)
+        with span("simulation"):
+            scores = score_matrices(
+                xg[:, 0],
+                xg[:, 1],
+                iterations,
+                mode,
+                cls.MAX_GOALS,
+                [predictor.rng for predictor in predictors],
+                tolerance,
+            )
+        return [build_prediction(match_scores) for match_scores in scores]
@@ -0,0 +1,160 @@
+from collections.abc import Sequence
+
+import numpy as np
+
+from predictor.engine import CHUNK_MEMORY, IterationChunk, iteration_chunks
+
+WIN_POINTS = 3
+DRAW_POINTS = 1
+# Largest fixtures by teams matrix summing the fixtures of each team with a product,
+# bigger leagues count them instead
+MAX_INCIDENCE_SIZE = 2**22
+
+
+class SeasonTable:
+    """Current table of a league and its remaining fixtures, teams by their index.
+
+    Fixtures are given by the indexes of their home and away teams, with the xG of
+    each side.
+    """
+
+    def __init__(
+        self,
+        points: np.ndarray,
+        goal_difference: np.ndarray,
+        goals_for: np.ndarray,
+        home: np.ndarray,
+        away: np.ndarray,
+        home_xg: np.ndarray,
+        away_xg: np.ndarray,
+    ):
+        self.points = np.asarray(points, dtype=np.int64)
+        self.goal_difference = np.asarray(goal_difference, dtype=np.int64)
+        self.goals_for = np.asarray(goals_for, dtype=np.int64)
+        self.home = np.asarray(home, dtype=np.int64)
+        self.away = np.asarray(away, dtype=np.int64)
+        self.home_xg = np.asarray(home_xg, dtype=float)
+        self.away_xg = np.asarray(away_xg, dtype=float)
+        # Team of each side of the fixtures, home ones first then away ones
+        self.sides = np.concatenate([self.home, self.away])
+        self.incidence: np.ndarray | None = None
+        if len(self.sides) * self.n_teams <= MAX_INCIDENCE_SIZE:
+            self.incidence = np.zeros((len(self.sides), self.n_teams), np.float32)
+            self.incidence[np.arange(len(self.sides)), self.sides] = 1
+
+    @property
+    def n_teams(self) -> int:
+        return len(self.points)
+
+    @property
+    def n_fixtures(self) -> int:
+        return len(self.home)
+
+    def chunk_size(self, memory: int = CHUNK_MEMORY) -> int:
+        """Seasons simulated together so their arrays of 8 bytes values fit in
+        ``memory``, about a dozen per fixture and half a dozen per team"""
+        return max(1, memory // (8 * (12 * self.n_fixtures + 6 * self.n_teams)))
+
+    def chunks(
+        self,
+        iterations: int,
+        seed: int | None = None,
+        memory: int = CHUNK_MEMORY,
+    ) -> list[IterationChunk]:
+        """``iteration_chunks`` of seasons fitting in ``memory``"""
+        return iteration_chunks(iterations, self.chunk_size(memory), seed)
+
+
+def draw_goals(xg: np.ndarray, iterations: int, rng: np.random.Generator) -> np.ndarray:
+    """Poisson goals for each xG, ``iterations`` times, indexed by ``[row, xg]``.
+
+    Goals are drawn by inverting the cumulative distributions, one pass over the
+    uniforms per goal scored in the highest scoring match: a few passes far cheaper
+    than as many ``rng.poisson`` draws.
+    """
+    uniforms = rng.random((iterations, len(xg)))
+    goals = np.zeros(uniforms.shape, dtype=np.int16)
+    above = np.empty(uniforms.shape, dtype=bool)
+    with np.errstate(under="ignore"):
+        probability = np.exp(-xg)
+        cumulated = probability.copy()
+        scored = 0
+        # Probabilities underflowing to 0 end the passes, whatever the rounding
+        while np.greater(uniforms, cumulated, out=above).any() and probability.any():
+            goals += above
+            scored += 1
+            probability = probability * xg / scored
+            cumulated = cumulated + probability
+    return goals
+
+
+def _per_team(table: SeasonTable, home: np.ndarray, away: np.ndarray) -> np.ndarray:
+    """Sum of the home and away values of the fixtures for each team, one row per
+    simulated season"""
+    values = np.concatenate([home, away], axis=1)
+    if table.incidence is not None:
+        # Exact, the sums of a season are far below the float32 integers limit
+        return values.astype(np.float32) @ table.incidence
+    offsets = np.arange(len(values))[:, None] * table.n_teams
+    return np.bincount(
+        (offsets + table.sides).ravel(),
+        weights=values.ravel(),
+        minlength=len(values) * table.n_teams,
+    ).reshape(len(values), table.n_teams)
+
+
+def simulate_season_chunk(
+    table: SeasonTable, iterations: int, rng: np.random.Generator
+) -> tuple[np.ndarray, np.ndarray]:
+    """Play the remaining fixtures ``iterations`` times at once.
+
+    Returns how many times each team finished at each position, indexed by
+    ``[team, position]``, and the sum of its final points. Teams level on points
+    are ranked by goal difference, then goals scored, then drawn at random.
+    """
+    home_goals = draw_goals(table.home_xg, iterations, rng)
+    away_goals = draw_goals(table.away_xg, iterations, rng)
+
+    # Booleans seen as int8 keep the points arrays small
+    draws = (home_goals == away_goals).view(np.int8) * np.int8(DRAW_POINTS)
+    home_points = (home_goals > away_goals).view(np.int8) * np.int8(WIN_POINTS) + draws
+    away_points = (home_goals < away_goals).view(np.int8) * np.int8(WIN_POINTS) + draws
+
+    points = table.points + _per_team(table, home_points, away_points)
+    goals_for = _per_team(table, home_goals, away_goals)
+    goal_difference = (
+        table.goal_difference + goals_for - _per_team(table, away_goals, home_goals)
+    )
+    goals_for += table.goals_for
+
+    # Teams of each season from the first to the last position
+    ranking = np.lexsort(
+        (
+            rng.random((iterations, table.n_teams)),
+            -goals_for,
+            -goal_difference,
+            -points,
+        ),
+        axis=-1,
+    )
+    positions = np.bincount(
+        (ranking * table.n_teams + np.arange(table.n_teams)).ravel(),
+        minlength=table.n_teams**2,
+    ).reshape(table.n_teams, table.n_teams)
+    return positions, points.sum(axis=0)
+
+
+def simulate_season(
+    table: SeasonTable, chunks: Sequence[IterationChunk]
+) -> tuple[np.ndarray, np.ndarray]:
+    """Sum of ``simulate_season_chunk`` over the chunks, each one drawing from its
+    seed. Only takes plain values so it can run as a job of another process."""
+    positions = np.zeros((table.n_teams, table.n_teams), dtype=np.int64)
+    points = np.zeros(table.n_teams)
+    for iterations, seed in chunks:
+        chunk_positions, chunk_points = simulate_season_chunk(
+            table, iterations, np.random.default_rng(seed)
+        )
+        positions += chunk_positions
+        points += chunk_points
+    return positions, points
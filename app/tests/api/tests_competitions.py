@@ -0,0 +1,61 @@
+import asyncio
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models import Competition, CompetitionTeamLink, CompetitionType
+
+URL = "/api/v1/competitions"
+
+
+def test_competition_simulations_are_served(sqlite_client: TestClient) -> None:
+    response = sqlite_client.get(f"{URL}/1/prediction-matrix")
+
+    assert response.status_code == 200, response.text
+    assert response.json()["competition_id"] == 1
+
+
+@pytest.mark.parametrize(
+    ("method", "path"),
+    [("POST", "/leagues"), ("POST", "/cups"), ("GET", "/leagues"), ("GET", "/cups")],
+)
+def test_competitions_are_not_created_through_the_api(
+    sqlite_client: TestClient, method: str, path: str
+) -> None:
+    response = sqlite_client.request(method, f"{URL}{path}", json={"name": "Cup"})
+
+    assert response.status_code == 404
+
+
+def test_season_of_teams_sharing_another_league_is_refused(
+    sqlite_client: TestClient, database: AsyncEngine
+) -> None:
+    url = f"{URL}/1/season-simulation?iterations=1000&seed=0"
+    assert sqlite_client.get(url).status_code == 200
+
+    async def add_league() -> None:
+        async with AsyncSession(database) as session:
+            league = Competition(
+                name="Synthetic Europe",
+                data_id="SYE",
+                type_=CompetitionType.LEAGUE,
+                place_code="eur",
+                place_name="Europe",
+                start_date=date(2024, 9, 17),
+            )
+            session.add(league)
+            await session.flush()
+            session.add_all(
+                CompetitionTeamLink(competition_id=league.id, team_id=team_id)
+                for team_id in (1, 2)
+            )
+            await session.commit()
+
+    asyncio.run(add_league())
+    response = sqlite_client.get(url)
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["status"] == "SHARED_FIXTURES"
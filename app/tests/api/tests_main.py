@@ -1,3 +1,5 @@
+import os
+
 from fastapi.testclient import TestClient
 
 
@@ -6,3 +8,11 @@ def test_healthcheck(client: TestClient) -> None:
 
     assert response.status_code == 200
     assert response.json() == "OK"
+
+
+def test_metrics_name_the_worker_process(sqlite_client: TestClient) -> None:
+    pid = os.getpid()
+
+    for url in ("/metrics/db", "/metrics/http"):
+        assert sqlite_client.get(url).json()["pid"] == pid
+    assert f'pid="{pid}"' in sqlite_client.get("/metrics").text
@@ -0,0 +1,89 @@
+import asyncio
+from typing import Any
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models import Team
+
+BATCH_URL = "/api/v1/simulations/batch"
+
+
+def _add_team_without_competition(database: AsyncEngine) -> int:
+    async def add() -> int:
+        async with AsyncSession(database) as session:
+            team = Team(
+                name="Lonely FC",
+                short_name="Lonely",
+                tag="LON",
+                city="Nowhere",
+                venue_name="Lonely Park",
+                logo_url="https://example.org/crests/lonely.png",
+                data_id=999,
+                livescore_id=999,
+                transfermarkt_id=999,
+            )
+            session.add(team)
+            await session.flush()
+            team_id = team.id
+            await session.commit()
+            return team_id  # type: ignore
+
+    return asyncio.run(add())
+
+
+def test_simulate_batch_matches_single_simulations(sqlite_client: TestClient) -> None:
+    matches: list[dict[str, Any]] = [
+        {"home_team": 1, "away_team": 2, "seed": 0},
+        {"home_team": 3, "away_team": 4, "mode": "analytic"},
+        {"home_team": 2, "away_team": 5, "mode": "adaptive", "seed": 3},
+    ]
+
+    response = sqlite_client.post(BATCH_URL, json=matches)
+
+    assert response.status_code == 200
+    results = response.json()
+    assert len(results) == len(matches)
+    for match, result in zip(matches, results, strict=True):
+        single = sqlite_client.post("/api/v1/simulations/", json=match)
+        assert single.status_code == 200
+        assert result == single.json()
+        assert result["status"] == "COMPLETE"
+        assert (result["home_team"]["id"], result["away_team"]["id"]) == (
+            match["home_team"],
+            match["away_team"],
+        )
+
+
+def test_simulate_batch_unknown_teams(sqlite_client: TestClient) -> None:
+    response = sqlite_client.post(
+        BATCH_URL,
+        json=[
+            {"home_team": 1, "away_team": 2},
+            {"home_team": 98, "away_team": 99},
+        ],
+    )
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == {
+        "status": "NOT_FOUND",
+        "message": "Teams [98, 99] not found.",
+    }
+
+
+def test_simulate_batch_teams_without_common_competition(
+    sqlite_client: TestClient, database: AsyncEngine
+) -> None:
+    lonely = _add_team_without_competition(database)
+
+    response = sqlite_client.post(
+        BATCH_URL,
+        json=[
+            {"home_team": 1, "away_team": 2},
+            {"home_team": 1, "away_team": lonely},
+        ],
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["status"] == "MATCH_IMPOSSIBLE"
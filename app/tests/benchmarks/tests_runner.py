@@ -0,0 +1,59 @@
+import asyncio
+import random
+from pathlib import Path
+
+from models import MatchResult, MatchStatistics
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from benchmarks.data import enriched_match, sqlite_engine, synthetic_teams
+from benchmarks.runner import compare, load_results, measure, write_results
+
+
+def test_synthetic_teams_are_shaped_like_the_initial_data() -> None:
+    teams = synthetic_teams(3, 5)
+
+    assert len(teams) == 3
+    assert {len(team["matchs"]) for team in teams} == {5}
+    assert set(teams[0]) >= {"name", "data_id", "leagues", "matchs"}
+    assert len({match["data_id"] for team in teams for match in team["matchs"]}) == 15
+
+
+def test_enriched_matches_result_follows_the_score() -> None:
+    rng = random.Random(0)
+    for match in synthetic_teams(1, 50)[0]["matchs"]:
+        statistics = enriched_match(rng, 1, match)
+        assert statistics.result == (
+            MatchResult.WIN
+            if statistics.goal_for > statistics.goal_against  # type: ignore
+            else MatchResult.DRAW
+            if statistics.goal_for == statistics.goal_against
+            else MatchResult.LOSE
+        )
+
+
+def test_sqlite_engine_holds_the_synthetic_league() -> None:
+    async def count() -> int:
+        engine = await sqlite_engine(2, 4)
+        async with AsyncSession(engine) as session:
+            matches = (
+                await session.exec(select(func.count()).select_from(MatchStatistics))
+            ).one()
+        await engine.dispose()
+        return matches
+
+    assert asyncio.run(count()) == 8
+
+
+def test_compare_reports_regressions(tmp_path: Path) -> None:
+    baseline = measure("noop", lambda: None, quick=True, size=1).model_copy(
+        update={"median_ms": 1.0}
+    )
+    write_results(tmp_path / "baseline.json", [baseline])
+    slower = baseline.model_copy(update={"median_ms": 3.0})
+    faster = baseline.model_copy(update={"median_ms": 0.5})
+
+    loaded = load_results(tmp_path / "baseline.json")
+    assert list(loaded) == ["noop[size=1]"]
+    assert compare(loaded, [faster], threshold=1.2) == []
+    assert compare(loaded, [slower], threshold=1.2) == [("noop[size=1]", 3.0)]
@@ -1,12 +1,55 @@
-from collections.abc import Generator
+import asyncio
+from collections.abc import AsyncGenerator, Generator
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from benchmarks.data import sqlite_engine
+from core.config import settings
+from core.dependencies.base import get_async_db
+from core.predictions import prediction_cache
+from core.statistics import team_statistics_cache
 from main import app
 
+# Synthetic league of the database tests, a full season of matches for each team
+SQLITE_TEAMS = 6
+SQLITE_MATCHES = 38
+
 
 @pytest.fixture
 def client() -> Generator[TestClient, None, None]:
     with TestClient(app) as client:
         yield client
+
+
+@pytest.fixture
+def database() -> Generator[AsyncEngine]:
+    """In-memory SQLite holding the synthetic league"""
+    engine = asyncio.run(sqlite_engine(SQLITE_TEAMS, SQLITE_MATCHES))
+    yield engine
+    asyncio.run(engine.dispose())
+
+
+@pytest.fixture
+def sqlite_client(
+    database: AsyncEngine, monkeypatch: pytest.MonkeyPatch
+) -> Generator[TestClient]:
+    """Application on the ``database``, without background enrichment nor any
+    caching across tests"""
+    monkeypatch.setattr(settings, "ENRICHMENT_WORKER_ENABLED", False)
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", False)
+    prediction_cache.clear()
+    team_statistics_cache.clear()
+
+    async def sqlite_db() -> AsyncGenerator[AsyncSession]:
+        async with AsyncSession(database, expire_on_commit=False) as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = sqlite_db
+    try:
+        with TestClient(app) as client:
+            yield client
+    finally:
+        app.dependency_overrides.clear()
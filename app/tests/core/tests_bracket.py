@@ -0,0 +1,26 @@
+import numpy as np
+
+from benchmarks.data import in_memory_teams
+from core.bracket import bracket_simulation, build_bracket, default_bracket
+
+
+def test_default_bracket_gives_byes_to_the_first_teams() -> None:
+    teams, _ = in_memory_teams(5, 10)
+
+    assert default_bracket(teams[::-1]) == [1, None, 2, None, 3, None, 4, 5]
+    assert default_bracket(teams[:4]) == [1, 2, 3, 4]
+    assert default_bracket(teams[:2]) == [1, 2]
+
+
+def test_bracket_simulation_skips_the_byes() -> None:
+    teams, statistics = in_memory_teams(3, 10)
+    team_statistics = {team: statistics[team.id] for team in teams}  # type: ignore
+    bracket = [3, None, 1, 2]
+
+    knockout = build_bracket(bracket, teams, team_statistics)
+    simulation = bracket_simulation(1, bracket, "analytic", knockout.probabilities())
+
+    assert [team.team_id for team in simulation.teams] == [3, 1, 2]
+    assert simulation.teams[0].rounds[0] == 100
+    assert simulation.iterations is None
+    assert np.isclose(sum(team.rounds[-1] for team in simulation.teams), 100, atol=0.02)
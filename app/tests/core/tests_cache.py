@@ -0,0 +1,39 @@
+import time
+
+import pytest
+
+from core.cache import LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used() -> None:
+    cache: LRUCache[str, int] = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_lru_cache_expires_entries(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now)
+    cache: LRUCache[str, int] = LRUCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_lru_cache_evict_by_key() -> None:
+    cache: LRUCache[tuple[int, int], int] = LRUCache(maxsize=10)
+    for key in [(1, 2024), (1, 2025), (2, 2024)]:
+        cache.set(key, 0)
+
+    assert cache.evict(lambda key: key[0] == 1) == 2
+    assert len(cache) == 1
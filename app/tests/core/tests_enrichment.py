@@ -0,0 +1,129 @@
+import asyncio
+from collections.abc import Callable
+from datetime import datetime
+from typing import TypeVar
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import Session, select
+
+from core.config import settings
+from core.dependencies.matches_data_extraction import (
+    MatchesDataExtractor,
+    store_enriched_matches,
+)
+from core.enrichment import EnrichmentWorker, TeamLocks
+from models import MatchStatistics, MatchStatus
+from tests.conftest import SQLITE_MATCHES
+
+T = TypeVar("T")
+
+
+def test_enrichment_worker_batches_queued_teams_once() -> None:
+    refreshed: list[dict[int, int | None]] = []
+
+    async def run() -> None:
+        worker = EnrichmentWorker(FastAPI(), interval=3600)
+
+        async def no_scan() -> None:
+            await asyncio.Event().wait()
+
+        async def refresh_teams(seasons: dict[int, int | None]) -> None:
+            refreshed.append(seasons)
+
+        worker._scan_periodically = no_scan  # type: ignore[method-assign]
+        worker.refresh_teams = refresh_teams  # type: ignore[method-assign]
+
+        worker.enqueue({1: 2024})
+        worker.start()
+        # Queued by scans, through the loop as the requests
+        loop = asyncio.get_running_loop()
+        loop.call_soon(worker._put, {1: None, 4: None})
+        worker.enqueue({1: 2023, 2: 2024})
+        worker.enqueue({2: 2023, 3: 2024})
+        loop.call_soon(worker._put, {3: None})
+        await asyncio.sleep(0.01)
+        worker.enqueue({1: 2024})
+        await asyncio.sleep(0.01)
+        await worker.stop()
+
+    asyncio.run(run())
+
+    # Teams queued before the start are ignored, a team waiting is never queued twice.
+    # Its latest season requested is kept, a scan never drops it
+    assert refreshed == [{1: 2023, 4: None, 2: 2023, 3: 2024}, {1: 2024}]
+
+
+def _run_sync(database: AsyncEngine, function: Callable[[Session], T]) -> T:
+    """Run ``function`` with a synchronous session on the ``database``"""
+
+    async def run() -> T:
+        async with database.connect() as connection:
+            result = await connection.run_sync(lambda sync: function(Session(sync)))
+            await connection.commit()
+            return result
+
+    return asyncio.run(run())
+
+
+def _no_data(session: Session, team_ids: list[int]) -> None:
+    session.exec(
+        update(MatchStatistics)  # type: ignore
+        .where(MatchStatistics.team_id.in_(team_ids))  # type: ignore
+        .values(status=MatchStatus.NO_DATA)
+    )
+    session.commit()
+
+
+def test_requested_teams_are_enriched_for_their_season(database: AsyncEngine) -> None:
+    app = FastAPI()
+    app.state.config = settings
+    app.state.response_cache = None
+
+    def to_enrich(session: Session) -> dict[int, tuple[int, int]]:
+        _no_data(session, [2, 3])
+        extractor = MatchesDataExtractor(current_app=app, session=session)
+        # The synthetic league started in 2024, long before this scan
+        teams = EnrichmentWorker._matches_to_enrich(
+            session, extractor, {2: 2024, 3: None}, datetime(2030, 1, 1)
+        )
+        return {
+            team.id: (season, len(matches))  # type: ignore
+            for team, (season, matches) in teams.items()
+        }
+
+    with httpx.Client() as app.state.http_client:
+        teams = _run_sync(database, to_enrich)
+
+    # Requested teams no matter their season, scanned ones for active competitions
+    assert teams == {2: (2024, SQLITE_MATCHES)}
+
+
+def test_enriched_matches_are_stored_once(database: AsyncEngine) -> None:
+    def store_twice(session: Session) -> tuple[set[int], set[int], MatchStatus]:
+        _no_data(session, [1])
+        match = session.exec(
+            select(MatchStatistics).where(MatchStatistics.team_id == 1)
+        ).first()
+        enriched = {match.id: {"status": MatchStatus.FINISHED}}  # type: ignore
+        # Another process enriched the match meanwhile
+        stored = store_enriched_matches(session, enriched)  # type: ignore
+        stored_again = store_enriched_matches(session, enriched)  # type: ignore
+        return stored, stored_again, match.status  # type: ignore
+
+    stored, stored_again, status = _run_sync(database, store_twice)
+
+    assert len(stored) == 1 and stored_again == set()
+    # The instances of the session are updated along
+    assert status == MatchStatus.FINISHED
+
+
+def test_team_locks_grant_every_team_without_postgres() -> None:
+    engine = create_engine("sqlite://")
+    locks = TeamLocks(engine)
+
+    assert locks.acquire([1, 2]) == [1, 2]
+    locks.release()
+    engine.dispose()
@@ -0,0 +1,26 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from core.ingestion import iter_json_array
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+def test_iter_json_array_streams_items(tmp_path: Path, chunk_size: int) -> None:
+    items = [
+        {"name": "Arsenal FC", "leagues": ["PL", "CL"], "matchs": [{"data_id": 1}]},
+        {"name": "Paris [SG]", "leagues": [], "matchs": []},
+    ]
+    path = tmp_path / "teams.json"
+    path.write_text(json.dumps(items, indent=2))
+
+    assert list(iter_json_array(path, chunk_size=chunk_size)) == items
+
+
+def test_iter_json_array_rejects_truncated_file(tmp_path: Path) -> None:
+    path = tmp_path / "teams.json"
+    path.write_text('[{"name": "Arsenal FC"}, {"name": ')
+
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(path, chunk_size=8))
@@ -0,0 +1,90 @@
+import asyncio
+from datetime import datetime
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from benchmarks.data import in_memory_teams
+from core.config import settings
+from core.dependencies import matches_data_extraction
+from core.dependencies.matches_data_extraction import (
+    MatchesDataExtractor,
+    process_rate_limiter,
+)
+from models import MatchStatistics
+
+
+def test_process_rate_limiter_shares_quota_between_workers(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 4)
+
+    limiter = process_rate_limiter(3, 10)
+    small_burst = process_rate_limiter(3, 3)
+
+    assert (limiter.rate, limiter.capacity) == (0.75, 2)
+    assert small_burst.capacity == 1
+
+
+def test_fetch_enrichment_data_gathers_requests_within_concurrency(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "ENRICHMENT_CONCURRENCY", 3)
+    monkeypatch.setattr(matches_data_extraction, "data_api_rate_limiter", None)
+    monkeypatch.setattr(matches_data_extraction, "livescore_rate_limiter", None)
+    teams, _ = in_memory_teams(2, 1)
+    to_enrich = {
+        team: (
+            2024,
+            [
+                MatchStatistics(
+                    team_id=team.id,
+                    data_id=100 * team.id + match,  # type: ignore
+                    livescore_id=1000 * team.id + match,  # type: ignore
+                    date=datetime(2024, 9, 1 + match),
+                )
+                for match in range(3)
+            ],
+        )
+        for team in teams
+    }
+    in_flight, most_in_flight = 0, 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, most_in_flight
+        in_flight += 1
+        most_in_flight = max(most_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if "get-statistics" in request.url.path:
+            return httpx.Response(
+                200, json={"Stat": [{"Eid": int(request.url.params["Eid"])}, {}]}
+            )
+        team_id = int(request.url.path.split("/")[-2])
+        return httpx.Response(
+            200,
+            json={
+                "matches": [{"id": team_id, "status": "FINISHED"}],
+                "resultSet": {"count": 1},
+            },
+        )
+
+    app = FastAPI()
+    app.state.config = settings
+    app.state.response_cache = None
+
+    async def fetch() -> dict:
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await extractor.fetch_enrichment_data(to_enrich, client)
+
+    with httpx.Client() as app.state.http_client:
+        extractor = MatchesDataExtractor(current_app=app, session=None)  # type: ignore
+        data = asyncio.run(fetch())
+
+    assert most_in_flight == 3
+    for team, (_, matches) in to_enrich.items():
+        data_df, livescore_matches = data[team]
+        assert data_df["id"].tolist() == [team.data_id]
+        # Statistics in the order of the matches
+        assert livescore_matches == [[{"Eid": m.livescore_id}, {}] for m in matches]
@@ -0,0 +1,62 @@
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from core.pool import PoolMetrics, metered_pool
+
+
+@pytest.fixture
+def metrics() -> PoolMetrics:
+    return PoolMetrics()
+
+
+def test_pool_metrics_count_checkouts_and_waits(
+    tmp_path: Path, metrics: PoolMetrics
+) -> None:
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.sqlite3'}",
+        poolclass=metered_pool(QueuePool, metrics),
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+    metrics.listen(engine)
+
+    with engine.connect() as first, engine.connect() as second:
+        first.execute(text("SELECT 1"))
+        second.execute(text("SELECT 1"))
+        assert metrics.snapshot(engine.pool)["overflow"] == 1
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+
+    with engine.connect():
+        pass
+
+    statistics = metrics.snapshot(engine.pool)
+    assert statistics["checkouts"] == 4
+    assert (statistics["waits"], statistics["timeouts"]) == (1, 1)
+    assert statistics["in_use"] == 0
+    assert statistics["peak_in_use"] == 2
+    assert statistics["connections"] == 2
+    assert statistics["size"] == 1
+    assert statistics["checkout_ms_max"] >= 50
+
+
+def test_pool_metrics_survive_dispose(tmp_path: Path, metrics: PoolMetrics) -> None:
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.sqlite3'}",
+        poolclass=metered_pool(QueuePool, metrics),
+    )
+    metrics.listen(engine)
+    with engine.connect():
+        pass
+    engine.dispose()
+
+    with engine.connect():
+        pass
+
+    assert metrics.snapshot(engine.pool)["checkouts"] == 2
+    assert metrics.connections == 2
@@ -0,0 +1,52 @@
+import itertools
+
+from benchmarks.data import in_memory_teams
+from core.prediction_matrix import build_prediction_matrix
+from predictor import Predictor
+
+
+def test_build_prediction_matrix_matches_analytic_simulations():
+    teams, statistics = in_memory_teams(5, 38)
+    team_statistics = {team: statistics[team.id] for team in teams}  # type: ignore
+
+    matrix = build_prediction_matrix(1, teams, team_statistics)
+
+    assert matrix.teams == [team.id for team in teams]
+    assert matrix.status == "COMPLETE"
+    for i, j in itertools.product(range(len(teams)), repeat=2):
+        if i == j:
+            assert matrix.home_win[i][j] is None
+            assert matrix.over_2_5[i][j] is None
+            continue
+        predictor = Predictor(teams[i], teams[j])
+        predictor.home_stats = team_statistics[teams[i]]
+        predictor.away_stats = team_statistics[teams[j]]
+        prediction = predictor.simulate(mode="analytic")
+        over_2_5 = next(
+            threshold.over
+            for threshold in prediction.global_threshold_goals
+            if threshold.threshold == 2.5
+        )
+        assert (
+            matrix.home_win[i][j],
+            matrix.draw[i][j],
+            matrix.away_win[i][j],
+            matrix.btts[i][j],
+            matrix.over_2_5[i][j],
+        ) == (
+            prediction.home_win,
+            prediction.draw,
+            prediction.away_win,
+            prediction.btts,
+            over_2_5,
+        )
+
+
+def test_build_prediction_matrix_partial():
+    teams, statistics = in_memory_teams(2, 10)
+    team_statistics = {team: statistics[team.id] for team in teams}  # type: ignore
+
+    matrix = build_prediction_matrix(1, teams, team_statistics, partial=True)
+
+    assert matrix.status == "PARTIAL"
+    assert matrix.draw == [[None, matrix.draw[0][1]], [matrix.draw[1][0], None]]
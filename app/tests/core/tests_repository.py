@@ -0,0 +1,148 @@
+import asyncio
+from collections.abc import Callable
+from datetime import date, datetime, time
+from typing import Any
+
+import pytest
+from sqlalchemy import Connection, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import Session
+
+from core.repository import (
+    ENRICHED_STATUSES,
+    season_window,
+    teams_matches,
+    teams_with_competitions,
+    teams_with_pending_matches,
+)
+from models import Competition, CompetitionType, MatchStatistics, MatchStatus
+from tests.conftest import SQLITE_MATCHES, SQLITE_TEAMS
+
+NOW = datetime(2030, 1, 1)
+
+
+def _statements(database: AsyncEngine, query: Callable[..., Any], *args: Any) -> int:
+    """Number of statements run by ``query`` on the ``database``"""
+    statements = 0
+
+    def count(*args: Any) -> None:
+        nonlocal statements
+        statements += 1
+
+    async def run() -> None:
+        async with database.connect() as connection:
+            await connection.run_sync(lambda sync: query(Session(sync), *args))
+
+    event.listen(database.sync_engine, "before_cursor_execute", count)
+    try:
+        asyncio.run(run())
+    finally:
+        event.remove(database.sync_engine, "before_cursor_execute", count)
+    return statements
+
+
+def _touch_competitions(session: Session, team_ids: list[int]) -> None:
+    for team in teams_with_competitions(session, team_ids):
+        assert [c.name for c in team._competitions]
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        # Teams, then their competitions in one go
+        (_touch_competitions, 2),
+        (lambda session, team_ids: teams_matches(session, team_ids, before=NOW), 1),
+        (
+            lambda session, team_ids: teams_with_pending_matches(
+                session, NOW, team_ids, competitions_since=NOW.date()
+            ),
+            1,
+        ),
+    ],
+    ids=["teams_with_competitions", "teams_matches", "teams_with_pending_matches"],
+)
+def test_queries_run_a_fixed_number_of_statements(
+    database: AsyncEngine, query: Callable[[Session, list[int]], Any], expected: int
+) -> None:
+    for n_teams in (1, SQLITE_TEAMS):
+        team_ids = list(range(1, n_teams + 1))
+
+        assert _statements(database, query, team_ids) == expected
+
+
+def _league(start_date: date) -> Competition:
+    return Competition(
+        name="Synthetic League",
+        data_id="SYN",
+        place_code="syn",
+        place_name="Synthetica",
+        type_=CompetitionType.LEAGUE,
+        start_date=start_date,
+    )
+
+
+@pytest.mark.parametrize(
+    ("start_date", "end"),
+    [
+        (date(2024, 8, 16), datetime(2025, 8, 16)),
+        (date(2024, 2, 29), datetime(2025, 2, 28)),
+    ],
+)
+def test_season_window_lasts_a_year(start_date: date, end: datetime) -> None:
+    assert season_window(_league(start_date)) == (
+        datetime.combine(start_date, time()),
+        end,
+    )
+
+
+def _match_dates(database: AsyncEngine, **filters: Any) -> list[datetime]:
+    async def run() -> dict[int, list[MatchStatistics]]:
+        async with database.connect() as connection:
+            return await connection.run_sync(
+                lambda sync: teams_matches(Session(sync), [1, 2], **filters)
+            )
+
+    matches = asyncio.run(run())
+    assert [m.date for m in matches[1]] == [m.date for m in matches[2]]
+    return [m.date for m in matches[1]]
+
+
+def test_teams_matches_filters(database: AsyncEngine) -> None:
+    dates = _match_dates(database)
+    # Weekly matches of the synthetic league, a season started on the 16th of August
+    second_week = datetime(2024, 8, 23, 15)
+
+    assert len(dates) == SQLITE_MATCHES and dates == sorted(dates)
+    assert _match_dates(database, since=second_week, before=dates[4]) == dates[1:4]
+    assert _match_dates(database, statuses=ENRICHED_STATUSES) == dates
+    assert _match_dates(database, statuses=(MatchStatus.NO_DATA,)) == []
+    # Restricted to the season of the competition, along with the other filters
+    assert _match_dates(database, competition=_league(date(2024, 9, 1))) == dates[3:]
+    assert (
+        _match_dates(database, before=dates[5], competition=_league(date(2024, 9, 1)))
+        == dates[3:5]
+    )
+    assert _match_dates(database, competition=_league(date(2025, 9, 1))) == []
+
+
+def test_teams_matches_use_the_team_date_index(database: AsyncEngine) -> None:
+    plans = []
+
+    def explain(connection: Connection, cursor, statement, parameters, *args) -> None:
+        if statement.startswith("SELECT matchstatistics"):
+            plans.append(
+                connection.exec_driver_sql(
+                    f"EXPLAIN QUERY PLAN {statement}", parameters
+                ).all()
+            )
+
+    event.listen(database.sync_engine, "before_cursor_execute", explain)
+    try:
+        _match_dates(database, since=datetime(2024, 9, 1), before=NOW)
+    finally:
+        event.remove(database.sync_engine, "before_cursor_execute", explain)
+
+    [plan] = plans
+    assert "ix_matchstatistics_team_id_date" in str(plan)
+    # Rows already in the order of the index
+    assert "TEMP B-TREE" not in str(plan)
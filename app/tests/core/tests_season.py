@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.data import in_memory_teams
+from core.season import season_simulation, season_table, shared_competitions
+from models import Competition, CompetitionType, MatchSide, MatchStatus
+from predictor import Predictor
+
+FINISHED, NOT_STARTED, NO_DATA = (
+    MatchStatus.FINISHED,
+    MatchStatus.NOT_STARTED,
+    MatchStatus.NO_DATA,
+)
+HOME, AWAY = MatchSide.HOME, MatchSide.AWAY
+
+
+def _matches(rows: list[tuple]) -> pd.DataFrame:
+    return pd.DataFrame.from_records(
+        rows,
+        columns=["team_id", "data_id", "status", "side", "goal_for", "goal_against"],
+    )
+
+
+def test_season_table_pairs_the_matches_of_the_teams() -> None:
+    teams, statistics = in_memory_teams(3, 10)
+    team_statistics = {team: statistics[team.id] for team in teams}  # type: ignore
+    matches = _matches(
+        [
+            # Played, 2-0 for the first team at home
+            (1, 10, FINISHED, HOME, 2, 0),
+            (2, 10, FINISHED, AWAY, 0, 2),
+            # Played, only enriched for the third team yet
+            (2, 11, NO_DATA, None, None, None),
+            (3, 11, FINISHED, AWAY, 1, 1),
+            # Postponed, the third team at home
+            (1, 12, NO_DATA, None, None, None),
+            (3, 12, NOT_STARTED, HOME, None, None),
+            # Still to come, side unknown
+            (3, 13, NO_DATA, None, None, None),
+            (2, 13, NO_DATA, None, None, None),
+            # Against a team of another competition
+            (1, 14, FINISHED, HOME, 5, 0),
+        ]
+    )
+
+    table = season_table(teams, matches, team_statistics)
+
+    assert table.points.tolist() == [3, 1, 1]
+    assert table.goal_difference.tolist() == [2, -2, 0]
+    assert table.goals_for.tolist() == [2, 1, 1]
+    assert table.home.tolist() == [2, 1]
+    assert table.away.tolist() == [0, 2]
+
+    home_grid, away_grid = Predictor.xg_grid(list(team_statistics.values()))
+    np.testing.assert_allclose(
+        table.home_xg, [home_grid[2, 0], (home_grid[1, 2] + away_grid[2, 1]) / 2]
+    )
+    np.testing.assert_allclose(
+        table.away_xg, [away_grid[2, 0], (away_grid[1, 2] + home_grid[2, 1]) / 2]
+    )
+
+
+def test_season_simulation_orders_teams_by_current_table() -> None:
+    teams, statistics = in_memory_teams(3, 10)
+    team_statistics = {team: statistics[team.id] for team in teams}  # type: ignore
+    matches = _matches([(1, 10, FINISHED, HOME, 0, 1), (2, 10, FINISHED, AWAY, 1, 0)])
+    table = season_table(teams, matches, team_statistics)
+    positions = np.array([[0, 0, 4], [4, 0, 0], [0, 4, 0]])
+
+    result = season_simulation(
+        1, teams, table, positions, np.array([0, 12, 4]), 4, seed=5
+    )
+
+    assert [team.team_id for team in result.teams] == [2, 3, 1]
+    assert result.teams[0].positions == [100, 0, 0]
+    assert result.teams[0].expected_points == 3
+    assert result.remaining_matches == 0
+    assert result.status == "COMPLETE"
+
+
+def test_shared_competitions_of_teams_playing_in_two_leagues() -> None:
+    teams, _ = in_memory_teams(4, 1)
+    [league] = teams[0]._competitions
+    europe = Competition(
+        name="Synthetic Europe",
+        data_id="SYE",
+        type_=CompetitionType.LEAGUE,
+        place_code="eur",
+        place_name="Europe",
+    )
+    europe.id = 2
+
+    # One team in two leagues, its matches in each one told apart by the opponent
+    teams[0]._competitions = [league, europe]
+    assert shared_competitions(league.id, teams) == []  # type: ignore
+    assert shared_competitions(europe.id, [teams[0]]) == []
+
+    # Two of them, their matches in either league look alike
+    teams[1]._competitions = [league, europe]
+    assert shared_competitions(league.id, teams) == [europe.id]  # type: ignore
@@ -0,0 +1,152 @@
+import asyncio
+import os
+import time
+from collections.abc import Generator
+
+import numpy as np
+import pytest
+
+from core.config import settings
+from core.simulation_executor import SimulationExecutor, SimulationExecutorSaturated
+from predictor import Bracket, SeasonTable
+from predictor.bracket import simulate_bracket
+from predictor.engine import score_matrices
+from predictor.season import simulate_season
+
+
+@pytest.fixture
+def executor() -> Generator[SimulationExecutor]:
+    executor = SimulationExecutor(max_workers=2, max_pending=2, timeout=30)
+    yield executor
+    executor.shutdown()
+
+
+def test_simulation_executor_splits_batches_across_processes(
+    executor: SimulationExecutor,
+) -> None:
+    home_xg, away_xg = np.array([0.5, 1.5, 2.5]), np.array([1.0, 1.0, 0.2])
+
+    scores = asyncio.run(executor.score_matrices(home_xg, away_xg, 1000, "monte_carlo"))
+
+    assert scores.shape == (3, 6, 6)
+    assert (scores.sum(axis=(1, 2)) == 1000).all()
+    # Higher home xG, more home wins
+    home_wins = [np.tril(match_scores, -1).sum() for match_scores in scores]
+    assert home_wins == sorted(home_wins)
+    assert executor.pending == 0
+
+
+def test_simulation_executor_seeded_results_match_in_process(
+    executor: SimulationExecutor,
+) -> None:
+    home_xg, away_xg = np.array([0.5, 1.5, 2.5]), np.array([1.0, 1.0, 0.2])
+
+    def rngs() -> list[np.random.Generator]:
+        return [np.random.default_rng(seed) for seed in (1, 2, 3)]
+
+    scores = asyncio.run(
+        executor.score_matrices(home_xg, away_xg, 1000, "monte_carlo", rngs())
+    )
+
+    assert np.array_equal(
+        scores, score_matrices(home_xg, away_xg, 1000, "monte_carlo", rng=rngs())
+    )
+
+
+def test_simulation_executor_refuses_jobs_past_max_pending(
+    executor: SimulationExecutor,
+) -> None:
+    xg = np.ones(2)
+
+    async def run() -> None:
+        first = asyncio.create_task(
+            executor.score_matrices(xg, xg, 100_000, "monte_carlo")
+        )
+        await asyncio.sleep(0)
+        with pytest.raises(SimulationExecutorSaturated):
+            await executor.score_matrices(xg[:1], xg[:1], 10, "monte_carlo")
+        # Analytic simulations do not use the pool
+        await executor.score_matrices(xg, xg, 10, "analytic")
+        await first
+
+    asyncio.run(run())
+    assert executor.pending == 0
+
+
+def test_simulation_executor_times_out_jobs() -> None:
+    executor = SimulationExecutor(max_workers=1, max_pending=4, timeout=0.001)
+    xg = np.ones(1)
+    try:
+        with pytest.raises(TimeoutError):
+            asyncio.run(executor.score_matrices(xg, xg, 10**6, "monte_carlo"))
+        # Still running in its process
+        assert executor.pending == 1
+
+        deadline = time.monotonic() + 30
+        while executor.pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert executor.pending == 0
+    finally:
+        executor.shutdown()
+
+
+def test_simulation_executor_shares_cores_between_api_workers(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(os, "cpu_count", lambda: 16)
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 4)
+
+    executor = SimulationExecutor(max_workers=None, max_pending=64, timeout=30)
+    executor.shutdown()
+    # More cores than pending jobs
+    monkeypatch.setattr(os, "cpu_count", lambda: 512)
+    large_host = SimulationExecutor(max_workers=None, max_pending=64, timeout=30)
+    large_host.shutdown()
+
+    assert executor.max_workers == 4
+    assert large_host.max_workers == 64
+
+
+def test_simulation_executor_allows_a_simulation_on_every_process() -> None:
+    with pytest.raises(ValueError, match=r"\[2\] pending jobs"):
+        SimulationExecutor(max_workers=4, max_pending=2, timeout=30)
+
+
+def test_simulation_executor_seasons_match_in_process(
+    executor: SimulationExecutor,
+) -> None:
+    home, away = np.nonzero(~np.eye(4, dtype=bool))
+    table = SeasonTable(
+        points=np.array([30, 29, 28, 27]),
+        goal_difference=np.array([0, 0, 0, 0]),
+        goals_for=np.array([10, 10, 10, 10]),
+        home=home,
+        away=away,
+        home_xg=np.full(len(home), 1.5),
+        away_xg=np.full(len(home), 1.0),
+    )
+    executor.chunk_memory = 20_000
+
+    positions, points = asyncio.run(executor.simulate_season(table, 2000, seed=1))
+
+    expected = simulate_season(table, table.chunks(2000, 1, memory=20_000))
+    assert np.array_equal(positions, expected[0])
+    assert np.array_equal(points, expected[1])
+    assert executor.pending == 0
+
+
+def test_simulation_executor_brackets_match_in_process(
+    executor: SimulationExecutor,
+) -> None:
+    advance = np.array([[0.5, 0.6, 0.7, 0.8]]).T @ np.ones((1, 4))
+    bracket = Bracket(
+        list(range(4)), np.where(np.eye(4), 0.5, advance / (advance + advance.T))
+    )
+    executor.chunk_memory = 5000
+
+    wins, simulated = asyncio.run(executor.simulate_bracket(bracket, 2000, seed=1))
+
+    expected = simulate_bracket(bracket, bracket.chunks(2000, 1, memory=5000))
+    assert np.array_equal(wins, expected[0])
+    assert simulated == expected[1] == 2000
+    assert executor.pending == 0
@@ -0,0 +1,190 @@
+import asyncio
+import random
+from collections.abc import Generator, Mapping
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import Engine, create_engine, update
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from benchmarks.data import enriched_match, in_memory_teams, synthetic_teams
+from core.dependencies.team_statistics import TeamStatisticsStore
+from core.enrichment import EnrichmentWorker
+from core.repository import teams_with_competitions
+from core.statistics import (
+    load_team_statistics,
+    save_team_statistics,
+    team_statistics_cache,
+)
+from models import MatchStatistics, MatchStatus, Team, TeamStatisticsRecord
+from predictor import GlobalStatistics, RunningGlobalStatistics
+from tests.conftest import SQLITE_MATCHES, SQLITE_TEAMS
+
+KEY = (1, 2024, "1")
+
+
+@pytest.fixture
+def engine() -> Generator[Engine]:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    SQLModel.metadata.create_all(engine)
+    team_statistics_cache.clear()
+    yield engine
+    engine.dispose()
+
+
+def _running(n_matches: int, seed: int = 0) -> RunningGlobalStatistics:
+    rng = random.Random(seed)
+    [team] = synthetic_teams(1, n_matches, seed)
+    return RunningGlobalStatistics.from_matches(
+        [enriched_match(rng, 1, match) for match in team["matchs"]]
+    )
+
+
+def test_load_team_statistics_without_record(engine: Engine) -> None:
+    with Session(engine) as session:
+        assert load_team_statistics(session, KEY) is None
+
+
+def test_saved_team_statistics_are_loaded_back(engine: Engine) -> None:
+    running = _running(10)
+
+    with Session(engine) as session:
+        saved = save_team_statistics(session, KEY, running)
+        session.commit()
+    team_statistics_cache.clear()
+    with Session(engine) as session:
+        loaded = load_team_statistics(session, KEY)
+
+    assert saved == running.to_statistics()
+    assert loaded == saved
+
+
+def test_cached_team_statistics_follow_updates_of_other_processes(
+    engine: Engine,
+) -> None:
+    with Session(engine) as session:
+        cached = save_team_statistics(session, KEY, _running(10))
+        session.commit()
+    with Session(engine) as session:
+        assert load_team_statistics(session, KEY) is cached
+
+        # The worker of another process applied new matches
+        updated = _running(20)
+        session.exec(
+            update(TeamStatisticsRecord).values(  # type: ignore
+                statistics=updated.model_dump(mode="json"),
+                updated_at=datetime(2030, 1, 1),
+            )
+        )
+        session.commit()
+
+        assert load_team_statistics(session, KEY) == updated.to_statistics()
+
+
+def test_rolled_back_team_statistics_are_not_served(engine: Engine) -> None:
+    committed = _running(10)
+    with Session(engine) as session:
+        save_team_statistics(session, KEY, committed)
+        session.commit()
+    with Session(engine) as session:
+        save_team_statistics(session, KEY, _running(20))
+        session.rollback()
+
+        assert load_team_statistics(session, KEY) == committed.to_statistics()
+
+
+def _app(queued: list[dict[int, int]]) -> FastAPI:
+    """Application whose enrichment worker records the teams queued"""
+    app = FastAPI()
+    app.state.enrichment_worker = EnrichmentWorker(app, interval=3600)
+
+    def enqueue(seasons: Mapping[int, int]) -> None:
+        queued.append(dict(seasons))
+
+    app.state.enrichment_worker.enqueue = enqueue  # type: ignore[method-assign]
+    return app
+
+
+def _get_teams_statistics(
+    database: AsyncEngine, app: FastAPI, teams: dict[Team, int]
+) -> tuple[dict[Team, GlobalStatistics], set[Team]]:
+    async def get() -> tuple[dict[Team, GlobalStatistics], set[Team]]:
+        async with AsyncSession(database, expire_on_commit=False) as session:
+            result = await TeamStatisticsStore(app, session).get_teams_statistics(teams)
+            await session.commit()
+            return result
+
+    return asyncio.run(get())
+
+
+def _teams(database: AsyncEngine) -> list[Team]:
+    team_ids = range(1, SQLITE_TEAMS + 1)
+
+    async def load() -> list[Team]:
+        async with AsyncSession(database) as session:
+            return await session.run_sync(teams_with_competitions, team_ids)  # type: ignore
+
+    return asyncio.run(load())
+
+
+def test_team_statistics_store_aggregates_then_serves_records(
+    database: AsyncEngine,
+) -> None:
+    _, expected = in_memory_teams(SQLITE_TEAMS, SQLITE_MATCHES)
+    teams = _teams(database)
+    queued: list[dict[int, int]] = []
+    app = _app(queued)
+
+    team_statistics_cache.clear()
+    statistics, stale = _get_teams_statistics(database, app, dict.fromkeys(teams, 2024))
+    team_statistics_cache.clear()
+    stored, _ = _get_teams_statistics(database, app, dict.fromkeys(teams, 2024))
+
+    assert stale == set() and queued == []
+    for team, team_statistics in statistics.items():
+        # Summed in another order from the database frames
+        for side in ("home_statistics", "away_statistics"):
+            assert getattr(team_statistics, side).model_dump() == pytest.approx(
+                getattr(expected[team.id], side).model_dump()  # type: ignore
+            )
+    assert stored == statistics
+
+    async def records() -> int:
+        async with AsyncSession(database) as session:
+            return len((await session.exec(select(TeamStatisticsRecord))).all())
+
+    assert asyncio.run(records()) == SQLITE_TEAMS
+
+
+def test_team_statistics_store_queues_stale_teams(database: AsyncEngine) -> None:
+    teams = _teams(database)
+    queued: list[dict[int, int]] = []
+
+    async def no_data() -> None:
+        async with AsyncSession(database) as session:
+            await session.exec(
+                update(MatchStatistics)  # type: ignore
+                .where(MatchStatistics.team_id == 2)  # type: ignore
+                .values(status=MatchStatus.NO_DATA)
+            )
+            await session.commit()
+
+    asyncio.run(no_data())
+    team_statistics_cache.clear()
+    statistics, stale = _get_teams_statistics(
+        database, _app(queued), dict.fromkeys(teams[:3], 2024)
+    )
+
+    assert queued == [{2: 2024}]
+    assert stale == {teams[1]}
+    # Served without its matches still to enrich, and not stored
+    assert statistics[teams[1]].matches_played == 0
+    assert statistics[teams[0]].matches_played == SQLITE_MATCHES
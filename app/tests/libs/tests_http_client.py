@@ -0,0 +1,69 @@
+import asyncio
+import threading
+from collections.abc import Generator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from libs.http_client import (
+    ConnectionMetrics,
+    create_async_http_client,
+    create_http_client,
+)
+
+OPTIONS = {
+    "timeout": 5,
+    "connect_timeout": 5,
+    "max_connections": 2,
+    "max_keepalive_connections": 2,
+    "http2": False,
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def server_url() -> Generator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_http_client_reuses_connections(server_url: str) -> None:
+    metrics = ConnectionMetrics()
+    with create_http_client(metrics, **OPTIONS) as client:
+        for _ in range(3):
+            assert client.get(server_url).status_code == 200
+
+    assert metrics.snapshot() == {
+        "requests": 3,
+        "connections": 1,
+        "reused": 2,
+        "reuse_ratio": 0.6667,
+    }
+
+
+def test_async_http_client_shares_metrics(server_url: str) -> None:
+    metrics = ConnectionMetrics()
+
+    async def run() -> None:
+        async with create_async_http_client(metrics, **OPTIONS) as client:
+            for _ in range(2):
+                assert (await client.get(server_url)).status_code == 200
+
+    asyncio.run(run())
+
+    assert (metrics.requests, metrics.connections) == (2, 1)
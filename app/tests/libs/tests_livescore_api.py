@@ -0,0 +1,80 @@
+import asyncio
+from collections.abc import Generator
+
+import httpx
+import pytest
+
+from libs.livescore_api import LiveScoreApiService
+
+STATISTICS = [{"Fls": 10, "Shon": 4}, {"Fls": 12, "Shon": 2}]
+
+
+@pytest.fixture
+def service() -> Generator[LiveScoreApiService]:
+    with httpx.Client() as client:
+        yield LiveScoreApiService(
+            api_key="first",
+            host="livescore.test",
+            client=client,
+            api_keys_spare=["second", "third"],
+        )
+
+
+def _client(over_quota: set[str], keys: list[str]) -> httpx.AsyncClient:
+    """Client answering 429 to the keys over quota, recording the keys used"""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        key = request.headers["x-rapidapi-key"]
+        keys.append(key)
+        # Concurrent requests are all sent before the first answer
+        await asyncio.sleep(0.01)
+        if key in over_quota:
+            return httpx.Response(429, json={"message": "Too many requests"})
+        return httpx.Response(200, json={"Stat": STATISTICS})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_async_request_rotates_keys_over_quota(service: LiveScoreApiService) -> None:
+    keys: list[str] = []
+
+    async def run() -> list[dict[str, int]]:
+        async with _client({"first", "second"}, keys) as client:
+            return await service.async_get_match_statistics(client, 1)
+
+    assert asyncio.run(run()) == STATISTICS
+    assert keys == ["first", "second", "third"]
+    # Later requests go straight to the key left
+    assert service._api_key == "third"
+
+
+def test_async_request_fails_once_every_key_is_over_quota(
+    service: LiveScoreApiService,
+) -> None:
+    keys: list[str] = []
+
+    async def run() -> None:
+        async with _client({"first", "second", "third"}, keys) as client:
+            await service.async_get_match_statistics(client, 1)
+
+    with pytest.raises(Exception, match=r"Request failed \[429\]"):
+        asyncio.run(run())
+    assert keys == ["first", "second", "third"]
+
+
+def test_concurrent_requests_over_quota_rotate_once(
+    service: LiveScoreApiService,
+) -> None:
+    keys: list[str] = []
+
+    async def run() -> list[list[dict[str, int]]]:
+        async with _client({"first"}, keys) as client:
+            return await asyncio.gather(
+                *(service.async_get_match_statistics(client, i) for i in range(3))
+            )
+
+    assert asyncio.run(run()) == [STATISTICS] * 3
+    # Requests sent with the first key retried with the second one only
+    assert keys.count("first") == 3
+    assert keys.count("second") == 3
+    assert service._api_key == "second"
@@ -0,0 +1,50 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from libs.rate_limiter import TokenBucket
+
+
+def test_token_bucket_allows_bursts_then_spaces_requests() -> None:
+    bucket = TokenBucket(rate=10, capacity=3)
+
+    delays = [bucket._reserve() for _ in range(5)]
+
+    assert delays[:3] == [0, 0, 0]
+    assert delays[3:] == pytest.approx([0.1, 0.2], abs=0.01)
+
+
+def test_token_bucket_refills_at_its_rate() -> None:
+    bucket = TokenBucket(rate=100, capacity=2)
+    for _ in range(2):
+        bucket._reserve()
+
+    time.sleep(0.05)
+
+    # Refilled up to its capacity only
+    assert [bucket._reserve() for _ in range(3)] == pytest.approx(
+        [0, 0, 0.01], abs=0.005
+    )
+
+
+def test_token_bucket_is_shared_by_event_loops() -> None:
+    bucket = TokenBucket(rate=50, capacity=1)
+
+    def acquire_all() -> None:
+        async def run() -> None:
+            await asyncio.gather(*(bucket.acquire() for _ in range(3)))
+
+        asyncio.run(run())
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=acquire_all) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 6 requests, the first one from the burst then one every 20ms. Each thread
+    # would be done within 40ms with a bucket of its own
+    assert time.perf_counter() - start >= 0.09
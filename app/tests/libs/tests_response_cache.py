@@ -0,0 +1,40 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from libs.response_cache import ResponseCache, ResponseCacheMiss
+
+
+def test_response_cache_is_addressed_by_endpoint_and_params(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path / "responses.sqlite3")
+    cache.set("stats", {"Eid": "1", "Category": "soccer"}, {"Stat": [1]})
+
+    assert cache.get("stats", {"Category": "soccer", "Eid": "1"}) == {"Stat": [1]}
+    assert cache.get("stats", {"Eid": "2", "Category": "soccer"}) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Responses survive the process
+    cache.close()
+    assert ResponseCache(tmp_path / "responses.sqlite3").get(
+        "stats", {"Eid": "1", "Category": "soccer"}
+    ) == {"Stat": [1]}
+
+
+def test_response_cache_expiry_and_offline_mode(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = ResponseCache(tmp_path / "responses.sqlite3")
+    cache.set("matches", None, {"matches": []}, ttl=60)
+    cache.set("finished", None, {"matches": [1]})
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+
+    assert cache.get("matches") is None
+    assert cache.get("finished") == {"matches": [1]}
+
+    cache.offline = True
+    assert cache.get("matches") == {"matches": []}
+    with pytest.raises(ResponseCacheMiss):
+        cache.get("unknown")
@@ -0,0 +1,102 @@
+import os
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from libs.tracing import (
+    Histogram,
+    TimingMiddleware,
+    render_metrics,
+    request_duration,
+    span,
+    traced,
+)
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    histogram = Histogram("test_seconds", "Test durations", ("stage",), (0.1, 1))
+    histogram.observe(0.05, "db")
+    histogram.observe(0.5, "db")
+    histogram.observe(5, "db")
+
+    lines = histogram.render()
+    assert lines[:2] == [
+        "# HELP test_seconds Test durations",
+        "# TYPE test_seconds histogram",
+    ]
+    assert lines[2:] == [
+        'test_seconds_bucket{stage="db",le="0.1"} 1',
+        'test_seconds_bucket{stage="db",le="1"} 2',
+        'test_seconds_bucket{stage="db",le="+Inf"} 3',
+        'test_seconds_sum{stage="db"} 5.55',
+        'test_seconds_count{stage="db"} 3',
+    ]
+
+
+def test_metrics_are_labelled_by_worker_process() -> None:
+    request_duration.clear()
+    request_duration.observe(0.5, "GET", "/teams/{team_id}", "200")
+
+    pid = os.getpid()
+    assert (
+        f'http_request_duration_seconds_count{{method="GET",route="/teams/{{team_id}}",'
+        f'status="200",pid="{pid}"}} 1'
+    ) in render_metrics().splitlines()
+
+
+def _app(**options) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(TimingMiddleware, **options)
+
+    @traced("compute")
+    def compute() -> int:
+        return 1
+
+    @app.get("/teams/{team_id}")
+    async def team(team_id: int) -> dict[str, int]:
+        with span("db"):
+            pass
+        with span("db"):
+            pass
+        return {"id": team_id, "value": compute()}
+
+    return app
+
+
+def test_timing_middleware_adds_server_timing_per_stage() -> None:
+    request_duration.clear()
+    with TestClient(_app()) as client:
+        response = client.get("/teams/1")
+        client.get("/teams/2")
+
+    assert response.json() == {"id": 1, "value": 1}
+    stages = [
+        entry.split(";")[0] for entry in response.headers["Server-Timing"].split(", ")
+    ]
+    assert stages == ["db", "compute", "total"]
+    assert "db;dur=" in response.headers["Server-Timing"]
+    assert 'desc="x2"' in response.headers["Server-Timing"]
+    # Requests are counted by route template, not by path
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/teams/{team_id}",status="200"} 2'
+        in request_duration.render()
+    )
+
+
+def test_timing_middleware_dumps_slow_requests_profiles(tmp_path: Path) -> None:
+    app = _app(profile_dir=tmp_path, profile_sample_rate=1, profile_threshold=0)
+    with TestClient(app) as client:
+        client.get("/teams/1")
+
+    [profile] = tmp_path.iterdir()
+    assert profile.name.endswith(".prof")
+    assert "-GET-teams_1-" in profile.name
+
+
+def test_timing_middleware_skips_fast_requests_profiles(tmp_path: Path) -> None:
+    app = _app(profile_dir=tmp_path, profile_sample_rate=1, profile_threshold=60)
+    with TestClient(app) as client:
+        client.get("/teams/1")
+
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,92 @@
+import datetime
+import random
+
+import pandas as pd
+import pytest
+
+from models import MatchResult, MatchSide, MatchStatistics, MatchStatus
+from predictor import Predictor, RunningGlobalStatistics
+from predictor.aggregates import AGGREGATION_COLUMNS
+
+
+def _match(rng: random.Random, with_xg: bool = True) -> MatchStatistics:
+    goal_for, goal_against = rng.randint(0, 4), rng.randint(0, 4)
+    return MatchStatistics(
+        date=datetime.datetime(2024, 9, 1),
+        data_id=rng.randint(1, 10**6),
+        livescore_id=None,
+        transfermarkt_id=None,
+        status=MatchStatus.FINISHED,
+        side=rng.choice([MatchSide.HOME, MatchSide.AWAY]),
+        result=(
+            MatchResult.WIN
+            if goal_for > goal_against
+            else MatchResult.DRAW
+            if goal_for == goal_against
+            else MatchResult.LOSE
+        ),
+        goal_for=goal_for,
+        goal_against=goal_against,
+        fouls=rng.randint(5, 20),
+        shots=rng.randint(5, 25),
+        shots_off_goal=rng.randint(0, 10),
+        shots_on_goal=rng.randint(1, 10),
+        possession=rng.randint(30, 70),
+        livescore_xg=rng.uniform(0.2, 3) if with_xg else None,
+    )
+
+
+def test_running_statistics_match_dataframe_aggregation() -> None:
+    rng = random.Random(7)
+    matches = [_match(rng, with_xg=i % 3 != 0) for i in range(40)]
+
+    running = RunningGlobalStatistics.from_matches(matches).to_statistics()
+    expected = Predictor._transform_data(
+        pd.DataFrame([m.model_dump(mode="json") for m in matches])
+    )
+
+    for side in ("home_statistics", "away_statistics"):
+        running_side = getattr(running, side)
+        expected_side = getattr(expected, side)
+        for field in ("matches_played", "wins", "draws", "losses", "goals_for"):
+            assert getattr(running_side, field) == getattr(expected_side, field)
+        assert running_side.possession == pytest.approx(expected_side.possession)
+        assert running_side.external_xg == pytest.approx(expected_side.external_xg)
+    assert running.xg == pytest.approx(expected.xg)
+
+
+def test_running_statistics_add_and_remove_match() -> None:
+    rng = random.Random(3)
+    matches = [_match(rng) for _ in range(10)]
+    running = RunningGlobalStatistics.from_matches(matches[:-1])
+
+    running.add_match(matches[-1])
+    assert running == RunningGlobalStatistics.from_matches(matches)
+
+    running.remove_match(matches[-1])
+    assert (
+        running.home_statistics.matches_played + running.away_statistics.matches_played
+        == 9
+    )
+    assert running.to_statistics().goals_for == sum(
+        m.goal_for or 0 for m in matches[:-1]
+    )
+
+
+def test_running_statistics_from_frame_match_from_matches() -> None:
+    rng = random.Random(11)
+    matches = [_match(rng, with_xg=i % 4 != 0) for i in range(30)]
+    frame = pd.DataFrame.from_records(
+        [tuple(getattr(m, column) for column in AGGREGATION_COLUMNS) for m in matches],
+        columns=list(AGGREGATION_COLUMNS),
+    )
+
+    from_frame = RunningGlobalStatistics.from_frame(frame)
+    from_matches = RunningGlobalStatistics.from_matches(matches)
+    for side in ("home_statistics", "away_statistics"):
+        assert getattr(from_frame, side).model_dump() == pytest.approx(
+            getattr(from_matches, side).model_dump()
+        )
+    assert RunningGlobalStatistics.from_frame(
+        frame.iloc[:0]
+    ) == RunningGlobalStatistics.from_matches([])
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from predictor.bracket import (
+    Bracket,
+    advance_probabilities,
+    simulate_bracket,
+)
+
+
+def _advance(n_teams: int) -> np.ndarray:
+    """Chances of teams with an xG growing with their index"""
+    xg = np.linspace(0.8, 2.0, n_teams)
+    home_xg = np.add.outer(xg, -xg / 2) + 0.8
+    return advance_probabilities(home_xg, home_xg.T - 0.2)
+
+
+def test_advance_probabilities_sum_to_one_for_each_pair() -> None:
+    advance = _advance(6)
+
+    np.testing.assert_allclose(advance + advance.T, 1, atol=1e-9)
+    np.testing.assert_allclose(np.diag(advance), 0.5, atol=1e-9)
+    # Better teams more likely to get through
+    assert (np.diff(advance[:, 0]) > 0).all()
+
+
+def test_advance_probabilities_without_xg_go_to_penalties() -> None:
+    advance = advance_probabilities(np.zeros((2, 2)), np.full((2, 2), np.nan))
+
+    np.testing.assert_allclose(advance, 0.5)
+
+
+def test_bracket_needs_a_power_of_2_slots() -> None:
+    with pytest.raises(ValueError):
+        Bracket([0, 1, 2], _advance(3))
+    with pytest.raises(ValueError):
+        Bracket([0], _advance(1))
+
+
+def test_bracket_probabilities() -> None:
+    bracket = Bracket(list(range(8)), _advance(8))
+
+    wins = bracket.probabilities()
+
+    assert wins.shape == (8, 3)
+    # As many winners as matches in each round
+    np.testing.assert_allclose(wins.sum(axis=0), [4, 2, 1])
+    assert (np.diff(wins, axis=1) <= 0).all()
+    assert wins[:, -1].argmax() == 7
+
+
+def test_bracket_byes_go_through() -> None:
+    bracket = Bracket([0, None, None, None, 1, 2, 3, None], _advance(4))
+
+    wins = bracket.probabilities()
+
+    assert np.array_equal(wins[:, 0], [1, 0, 1, 0, *wins[4:6, 0], 1, 0])
+    np.testing.assert_allclose(wins.sum(axis=0), [4, 2, 1])
+    # The bye of the second round leaves the first team in the final
+    assert wins[0, 1] == 1
+
+
+def test_simulate_bracket_matches_probabilities() -> None:
+    bracket = Bracket([0, None, *range(1, 6), None], _advance(6))
+
+    wins, simulated = simulate_bracket(bracket, bracket.chunks(50_000, seed=0))
+
+    assert simulated == 50_000
+    assert (wins.sum(axis=0) == [4 * 50_000, 2 * 50_000, 50_000]).all()
+    np.testing.assert_allclose(wins / simulated, bracket.probabilities(), atol=0.01)
+
+
+def test_simulate_bracket_same_seed_same_brackets_whatever_the_sharding() -> None:
+    bracket = Bracket(list(range(8)), _advance(8))
+    chunks = bracket.chunks(3000, seed=7, memory=10_000)
+    assert len(chunks) > 2
+
+    wins, _ = simulate_bracket(bracket, chunks)
+    sharded = [simulate_bracket(bracket, chunks[i::2])[0] for i in range(2)]
+
+    assert np.array_equal(wins, sharded[0] + sharded[1])
+
+
+def test_simulate_bracket_stops_after_budget() -> None:
+    bracket = Bracket(list(range(8)), _advance(8))
+    chunks = bracket.chunks(3000, seed=7, memory=10_000)
+
+    wins, simulated = simulate_bracket(bracket, chunks, budget=0)
+
+    # At least the first chunk, whatever the budget
+    assert simulated == chunks[0][0]
+    assert wins[:, -1].sum() == simulated
@@ -0,0 +1,159 @@
+import numpy as np
+import pytest
+
+from predictor.engine import (
+    ADAPTIVE_CHUNK_SIZE,
+    MAX_GOALS,
+    build_prediction,
+    poisson_score_matrix,
+    score_matrices,
+    simulate_scores,
+    simulate_scores_adaptive,
+    standard_error,
+)
+
+XG_PAIRS = [(1.6, 1.1), (0.4, 2.7), (3.2, 0.2), (1.0, 1.0)]
+
+
+def test_simulate_scores_histogram() -> None:
+    scores = simulate_scores(1.6, 1.1, 20000)
+
+    assert scores.shape == (MAX_GOALS + 1, MAX_GOALS + 1)
+    assert scores.sum() == 20000
+
+
+def test_simulate_scores_caps_goals() -> None:
+    scores = simulate_scores(30.0, 0.0, 1000)
+
+    assert scores[MAX_GOALS, 0] == 1000
+
+
+def test_simulate_scores_seeded_generator_is_reproducible() -> None:
+    first = simulate_scores(1.6, 1.1, 5000, rng=np.random.default_rng(42))
+    second = simulate_scores(1.6, 1.1, 5000, rng=np.random.default_rng(42))
+
+    assert np.array_equal(first, second)
+    assert not np.array_equal(
+        first, simulate_scores(1.6, 1.1, 5000, rng=np.random.default_rng(43))
+    )
+
+
+def test_score_matrices_streams_per_pair_ignore_the_batch() -> None:
+    home_xg, away_xg = np.array(XG_PAIRS).T
+    seeds = [7, 8, 9, 10]
+
+    batch = score_matrices(
+        home_xg,
+        away_xg,
+        2000,
+        "monte_carlo",
+        rng=[np.random.default_rng(seed) for seed in seeds],
+    )
+    alone = score_matrices(
+        home_xg[2:3], away_xg[2:3], 2000, "monte_carlo", rng=[np.random.default_rng(9)]
+    )
+
+    assert batch.shape == (4, MAX_GOALS + 1, MAX_GOALS + 1)
+    assert np.array_equal(batch[2], alone[0])
+
+
+def test_standard_error_of_the_least_certain_percentage() -> None:
+    scores = np.zeros((MAX_GOALS + 1, MAX_GOALS + 1), dtype=int)
+    scores[1, 0] = 50
+    scores[0, 1] = 50
+
+    # Home win and away win are 50/50 over 100 draws
+    assert standard_error(scores) == pytest.approx(5.0)
+
+
+@pytest.mark.parametrize("tolerance", [2.0, 0.5, 0.25])
+def test_simulate_scores_adaptive_stops_within_tolerance(tolerance: float) -> None:
+    scores = simulate_scores_adaptive(1.6, 1.1, tolerance, rng=np.random.default_rng(1))
+
+    assert standard_error(scores) <= tolerance
+    assert scores.sum() >= ADAPTIVE_CHUNK_SIZE
+    # Close to the 0.25 / tolerance² draws needed by a probability of 50%
+    assert scores.sum() < 1.5 * 2500 / tolerance**2 + ADAPTIVE_CHUNK_SIZE
+
+
+def test_simulate_scores_adaptive_is_capped() -> None:
+    scores = simulate_scores_adaptive(1.6, 1.1, 0.01, max_iterations=3000)
+
+    assert scores.sum() == 3000
+
+
+def test_adaptive_prediction_reports_iterations_and_error() -> None:
+    scores = score_matrices(
+        np.array([1.6, 3.0]),
+        np.array([1.1, 0.2]),
+        0,
+        "adaptive",
+        rng=[np.random.default_rng(1), np.random.default_rng(2)],
+        tolerance=1.0,
+    )
+
+    for match_scores in scores:
+        prediction = build_prediction(match_scores)
+        assert prediction.iterations == match_scores.sum()
+        assert prediction.standard_error is not None
+        assert prediction.standard_error <= 1.0
+    assert build_prediction(poisson_score_matrix(1.6, 1.1)).iterations is None
+
+
+def test_build_prediction() -> None:
+    scores = np.zeros((MAX_GOALS + 1, MAX_GOALS + 1), dtype=int)
+    scores[2, 1] = 50
+    scores[1, 1] = 30
+    scores[0, 3] = 20
+
+    prediction = build_prediction(scores)
+
+    assert (prediction.home_win, prediction.draw, prediction.away_win) == (50, 30, 20)
+    assert prediction.btts == 80
+    assert [
+        (t.threshold, t.below, t.over) for t in prediction.global_threshold_goals
+    ] == [
+        (0.5, 0, 100),
+        (1.5, 0, 100),
+        (2.5, 30, 70),
+        (3.5, 100, 0),
+    ]
+    assert [t.over for t in prediction.home_threshold_goals] == [80, 50, 0, 0]
+    assert [t.over for t in prediction.away_threshold_goals] == [100, 20, 20, 0]
+    assert [(s.score, s.probability) for s in prediction.exact_score] == [
+        ("2-1", 50),
+        ("1-1", 30),
+        ("0-3", 20),
+    ]
+
+
+def test_poisson_score_matrix() -> None:
+    matrix = poisson_score_matrix(np.array([1.6, 0.0]), np.array([1.1, 2.0]))
+
+    assert matrix.shape == (2, MAX_GOALS + 1, MAX_GOALS + 1)
+    assert np.allclose(matrix.sum(axis=(1, 2)), 1)
+    assert matrix[1, 1:].sum() == 0
+
+
+@pytest.mark.parametrize(("home_xg", "away_xg"), XG_PAIRS)
+def test_analytic_agrees_with_monte_carlo(home_xg: float, away_xg: float) -> None:
+    iterations = 200000
+    scores = simulate_scores(
+        home_xg, away_xg, iterations, rng=np.random.default_rng(42)
+    )
+    matrix = poisson_score_matrix(home_xg, away_xg)
+
+    assert np.allclose(scores / iterations, matrix, atol=0.005)
+
+    sampled = build_prediction(scores)
+    exact = build_prediction(matrix)
+    for field in ("home_win", "draw", "away_win", "btts"):
+        assert abs(getattr(sampled, field) - getattr(exact, field)) <= 1
+    for kind in ("global", "home", "away"):
+        for sampled_goals, exact_goals in zip(
+            getattr(sampled, f"{kind}_threshold_goals"),
+            getattr(exact, f"{kind}_threshold_goals"),
+            strict=True,
+        ):
+            assert abs(sampled_goals.below - exact_goals.below) <= 1
+            assert abs(sampled_goals.over - exact_goals.over) <= 1
@@ -0,0 +1,111 @@
+import random
+
+import numpy as np
+import pytest
+
+from benchmarks.data import in_memory_teams
+from predictor import (
+    GlobalStatistics,
+    GlobalStatsFrame,
+    Predictor,
+    TeamStatistics,
+    TeamStatsFrame,
+)
+from predictor.frames import round_as_python
+
+METRICS = (
+    "goal_per_match",
+    "shot_per_match",
+    "shots_on_goal_per_match",
+    "shots_on_goal_for_goal",
+    "shot_accuracy",
+    "shot_quality",
+    "attack_efficiency_ratio",
+    "probability_of_goal_per_shot",
+    "xg",
+)
+
+
+def _statistics(rng: random.Random) -> TeamStatistics:
+    matches = rng.randint(1, 19)
+    shots_on_goal = rng.randint(matches, 6 * matches)
+    return TeamStatistics(
+        matches_played=matches,
+        wins=rng.randint(0, matches),
+        draws=0,
+        losses=0,
+        goals_for=rng.randint(matches, 3 * matches),
+        goals_against=rng.randint(0, 3 * matches),
+        fouls=rng.randint(5 * matches, 20 * matches),
+        shots=shots_on_goal + rng.randint(0, 10 * matches),
+        shots_off_goal=rng.randint(0, 10 * matches),
+        shots_on_goal=shots_on_goal,
+        possession=rng.uniform(0.3, 0.7),
+        external_xg=rng.uniform(0.2, 3) if rng.random() < 0.7 else None,
+    )
+
+
+@pytest.fixture
+def statistics() -> list[GlobalStatistics]:
+    rng = random.Random(3)
+    return [
+        GlobalStatistics(
+            home_statistics=_statistics(rng), away_statistics=_statistics(rng)
+        )
+        for _ in range(2000)
+    ]
+
+
+def test_team_stats_frame_metrics_are_identical(
+    statistics: list[GlobalStatistics],
+) -> None:
+    teams = [team.home_statistics for team in statistics]
+    frame = TeamStatsFrame.from_statistics(teams)
+
+    for metric in METRICS:
+        expected = np.array([getattr(team, metric) for team in teams])
+        assert np.array_equal(getattr(frame, metric), expected), metric
+
+
+def test_global_stats_frame_is_identical(statistics: list[GlobalStatistics]) -> None:
+    frame = GlobalStatsFrame.from_statistics(statistics)
+
+    assert np.array_equal(frame.xg, [team.xg for team in statistics])
+    assert np.array_equal(frame.wins, [team.wins for team in statistics])
+    assert np.array_equal(frame.possession, [team.possession for team in statistics])
+
+
+def test_team_stats_frame_without_matches_is_nan() -> None:
+    rng = random.Random(0)
+    teams = [
+        _statistics(rng),
+        _statistics(rng).model_copy(update={"matches_played": 0}),
+    ]
+
+    xg = TeamStatsFrame.from_statistics(teams).xg
+
+    assert xg[0] == teams[0].xg
+    assert np.isnan(xg[1])
+
+
+def test_round_as_python_uses_exact_values_at_boundaries() -> None:
+    # 1.005 is slightly below its decimal value, 1.015 slightly above it
+    values = np.array([1.005, 1.015, 2.5, 0.123])
+
+    rounded = round_as_python(values, 2, lambda i: float(values[i]))
+
+    assert rounded.tolist() == [round(float(value), 2) for value in values]
+
+
+def test_batch_simulation_xg_is_identical(statistics: list[GlobalStatistics]) -> None:
+    teams, _ = in_memory_teams(len(statistics), 1)
+    predictors = []
+    for i in range(0, len(statistics), 2):
+        predictor = Predictor(teams[i], teams[i + 1])
+        predictor.home_stats, predictor.away_stats = statistics[i], statistics[i + 1]
+        predictors.append(predictor)
+
+    xg = Predictor.batch_simulation_xg(predictors, "monte_carlo")
+
+    expected = [predictor.simulation_xg("monte_carlo") for predictor in predictors]
+    assert np.array_equal(xg, expected)
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from predictor import season
+from predictor.season import SeasonTable, draw_goals, simulate_season
+
+
+def _table(home_xg: float = 1.4, away_xg: float = 1.1) -> SeasonTable:
+    """Four teams level on points, each one still to play the others home and away"""
+    home, away = np.nonzero(~np.eye(4, dtype=bool))
+    return SeasonTable(
+        points=np.array([30, 30, 28, 10]),
+        goal_difference=np.array([5, 5, -2, -8]),
+        goals_for=np.array([20, 20, 15, 8]),
+        home=home,
+        away=away,
+        home_xg=np.full(len(home), home_xg),
+        away_xg=np.full(len(home), away_xg),
+    )
+
+
+def test_draw_goals_follow_poisson() -> None:
+    xg = np.array([0.0, 0.4, 1.6, 3.5])
+
+    goals = draw_goals(xg, 200_000, np.random.default_rng(0))
+
+    assert goals.shape == (200_000, 4)
+    assert (goals[:, 0] == 0).all()
+    np.testing.assert_allclose(goals.mean(axis=0), xg, atol=0.02)
+    np.testing.assert_allclose(goals.var(axis=0), xg, atol=0.05)
+
+
+def test_season_chunks_fit_memory() -> None:
+    table = _table()
+    size = table.chunk_size(memory=100_000)
+
+    chunks = table.chunks(10_000, seed=0, memory=100_000)
+
+    assert len(chunks) == -(-10_000 // size)
+    assert sum(iterations for iterations, _ in chunks) == 10_000
+    assert all(iterations <= size for iterations, _ in chunks)
+
+
+def test_simulate_season_without_fixtures_keeps_the_table() -> None:
+    table = SeasonTable(
+        points=np.array([30, 30, 28]),
+        goal_difference=np.array([5, 5, -2]),
+        goals_for=np.array([18, 20, 15]),
+        home=np.array([]),
+        away=np.array([]),
+        home_xg=np.array([]),
+        away_xg=np.array([]),
+    )
+
+    positions, points = simulate_season(table, table.chunks(100, seed=0))
+
+    # Level on points and goal difference, more goals scored first
+    assert np.array_equal(positions, [[0, 100, 0], [100, 0, 0], [0, 0, 100]])
+    assert np.array_equal(points, [3000, 3000, 2800])
+
+
+def test_simulate_season_positions() -> None:
+    table = _table()
+
+    positions, points = simulate_season(table, table.chunks(5000, seed=0))
+
+    assert (positions.sum(axis=0) == 5000).all()
+    assert (positions.sum(axis=1) == 5000).all()
+    # 6 matches left, the last team cannot catch up with the others
+    assert positions[3, 3] == 5000
+    assert positions[0, 0] > positions[2, 0]
+    assert (points >= 5000 * table.points).all()
+    assert (points <= 5000 * (table.points + 18)).all()
+
+
+def test_simulate_season_same_seed_same_seasons_whatever_the_sharding() -> None:
+    table = _table()
+    chunks = table.chunks(3000, seed=7, memory=50_000)
+    assert len(chunks) > 2
+
+    positions, points = simulate_season(table, chunks)
+    sharded = [simulate_season(table, chunks[i::2]) for i in range(2)]
+
+    assert np.array_equal(positions, sharded[0][0] + sharded[1][0])
+    assert np.array_equal(points, sharded[0][1] + sharded[1][1])
+
+
+def test_simulate_season_large_leagues_counted_the_same(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    table = _table()
+    monkeypatch.setattr(season, "MAX_INCIDENCE_SIZE", 0)
+    counted = _table()
+    assert table.incidence is not None and counted.incidence is None
+
+    chunks = table.chunks(1000, seed=3)
+
+    for expected, result in zip(
+        simulate_season(table, chunks), simulate_season(counted, chunks), strict=True
+    ):
+        assert np.array_equal(expected, result)